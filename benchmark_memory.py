@@ -0,0 +1,132 @@
+"""
+Benchmark the memory of a large project pull with and without compact dtypes.
+
+Pulls every project in a date range of the SQLite benchmark file (see
+benchmark_sqlite.py, which builds it) into a DataFrame, once with the default
+dtypes and once with DBConnector(compact_dtypes=True). Each pull runs in its own
+process so its peak RSS can be measured, and the per-column memory of both
+frames is reported.
+
+Usage:
+  python benchmark_memory.py --db /tmp/benchmark_projects.db --rows 1000000
+"""
+
+import os
+import sys
+import json
+import time
+import resource
+import argparse
+import subprocess
+from datetime import timedelta
+
+from src.db_connector import DBConnector
+from src.queries import SQLITE, projects_by_date_statement
+from src.compact_frames import ARROW_STRINGS, compact_dataframe, frame_memory, memory_report
+from benchmark_sqlite import FIRST_DAY, build_database
+
+
+def peak_rss_mb():
+    """
+    Get this process's peak resident set size in MB (ru_maxrss is in KiB on Linux).
+    """
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def pull(db_path, days, compact):
+    """
+    Pull the projects of the first `days` days, returning the frame and the seconds it took.
+    """
+    db = DBConnector(db_type='sqlite', sqlite_path=db_path, sqlite_mode='ro', compact_dtypes=compact)
+    if not db.connect():
+        raise SystemExit(1)
+    params = {'day_start': SQLITE.day_start(FIRST_DAY.strftime("%Y-%m-%d")),
+              'day_end': SQLITE.day_start((FIRST_DAY + timedelta(days=days)).strftime("%Y-%m-%d"))}
+    start = time.perf_counter()
+    df = db.query_to_dataframe(projects_by_date_statement('sqlite'), params)
+    elapsed = time.perf_counter() - start
+    db.disconnect()
+    return df, elapsed
+
+
+def run_child(db_path, days, compact):
+    """
+    Pull once in this process and print its measurements as JSON.
+    """
+    baseline = peak_rss_mb()
+    df, elapsed = pull(db_path, days, compact)
+    print(json.dumps({
+        'rows': len(df),
+        'seconds': round(elapsed, 2),
+        'frame_mb': round(frame_memory(df) / 1e6, 1),
+        'peak_rss_mb': round(peak_rss_mb(), 1),
+        'baseline_rss_mb': round(baseline, 1)
+    }))
+
+
+def measure(db_path, days, compact):
+    """
+    Pull in a fresh process and return its measurements (rows, seconds, frame_mb, peak_rss_mb, baseline_rss_mb).
+
+    Raises:
+        RuntimeError: If the pull failed
+    """
+    completed = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--db', db_path, '--pull-days', str(days),
+         '--child', 'compact' if compact else 'default'],
+        capture_output=True, text=True
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stdout + completed.stderr)
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the memory of a large pull with compact dtypes')
+    parser.add_argument('--db', type=str, default='benchmark_projects.db',
+                        help='Benchmark database file (built if missing)')
+    parser.add_argument('--rows', type=int, default=1_000_000,
+                        help='Number of projects when building the file (default: 1000000)')
+    parser.add_argument('--days', type=int, default=730,
+                        help='Number of days the projects are spread over when building (default: 730)')
+    parser.add_argument('--pull-days', type=int, default=None,
+                        help='Pull the projects of this many days from the start (default: all of them)')
+    parser.add_argument('--child', choices=('default', 'compact'), default=None,
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    pull_days = args.pull_days or args.days
+
+    if args.child:
+        run_child(args.db, pull_days, args.child == 'compact')
+        return 0
+
+    if not os.path.exists(args.db):
+        print(f"Building {args.db} with {args.rows:,} projects over {args.days} days...")
+        build_database(args.db, args.rows, args.days)
+
+    results = {}
+    for mode in ('default', 'compact'):
+        try:
+            results[mode] = measure(args.db, pull_days, mode == 'compact')
+        except RuntimeError as e:
+            print(e)
+            return 1
+
+    print(f"Arrow-backed strings: {'yes' if ARROW_STRINGS else 'no (pyarrow not installed)'}")
+    print(f"\n{'dtypes':<8} {'rows':>10} {'seconds':>8} {'frame MB':>9} {'peak RSS MB':>12} {'pull RSS MB':>12}")
+    for mode, result in results.items():
+        print(f"{mode:<8} {result['rows']:>10,} {result['seconds']:>8.2f} {result['frame_mb']:>9.1f} "
+              f"{result['peak_rss_mb']:>12.1f} {result['peak_rss_mb'] - result['baseline_rss_mb']:>12.1f}")
+    default, compact = results['default'], results['compact']
+    print(f"\nPeak RSS {1 - compact['peak_rss_mb'] / default['peak_rss_mb']:.0%} lower, "
+          f"frame {1 - compact['frame_mb'] / default['frame_mb']:.0%} smaller with compact dtypes.")
+
+    # Per-column breakdown on a sample, compacted the same way
+    sample, _ = pull(args.db, min(pull_days, 30), False)
+    print(f"\nPer column ({len(sample):,} row sample):")
+    print(memory_report(sample, compact_dataframe(sample)))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,144 @@
+"""
+Benchmark the SQLite connection profiles of DBConnector on a large HackathonProjects file.
+
+Builds (once) a SQLite file with millions of synthetic projects spread over many
+days, then runs the pipeline's read queries through each profile:
+- default: plain sqlite:///path, SQLite's default page cache and no mmap
+- ro: read-only URI mode with the tuned cache_size/mmap_size/temp_store PRAGMAs
+- immutable: like ro, but without file locking (for snapshot files)
+
+Usage:
+  python benchmark_sqlite.py --rows 2000000 --db /tmp/benchmark_projects.db
+"""
+
+import os
+import time
+import random
+import sqlite3
+import argparse
+from datetime import datetime, timedelta
+
+import numpy as np
+from sqlalchemy import create_engine
+
+from src.db_connector import DBConnector, dispose_engines
+from src.queries import SQLITE_PROJECTS, project_schema, day_params, projects_by_date_statement, daily_counts_statement
+
+FIRST_DAY = datetime(2023, 1, 1)
+TRACKS = ["AI/ML", "Web", "Mobile", "FinTech", "Health", "Climate", "Gov/Policy", "Education", "Data/Analytics"]
+WORDS = ("agent assistant pipeline dashboard tracker planner coach search graph vision voice map "
+         "health climate finance learning community data model chat bot stream sensor").split()
+
+
+def build_database(path, rows, days, seed=0):
+    """
+    Create the benchmark database with `rows` projects spread evenly over `days` days.
+    """
+    if os.path.exists(path):
+        os.remove(path)
+    SQLITE_PROJECTS.create(create_engine(f"sqlite:///{path}"))
+
+    rng = random.Random(seed)
+    connection = sqlite3.connect(path)
+    connection.execute("CREATE INDEX IF NOT EXISTS IX_HackathonProjects_CompletedAt ON HackathonProjects(CompletedAt)")
+
+    def project_rows():
+        for i in range(rows):
+            completed_at = FIRST_DAY + timedelta(days=i % days, seconds=rng.randrange(86400))
+            words = rng.sample(WORDS, 12)
+            yield (
+                f"{words[0].title()} {words[1].title()} {i}",
+                f"Team {i % 5000}",
+                "Ada Lovelace, Alan Turing",
+                " ".join(words) + ". " + " ".join(rng.sample(WORDS, 20)) + ".",
+                "Python, React, PostgreSQL",
+                f"https://github.com/example/project-{i}",
+                f"https://example.com/demo/{i}",
+                rng.choice(TRACKS),
+                None,
+                round(rng.uniform(50, 100), 1),
+                f"Sundai {completed_at:%Y-%m-%d}",
+                completed_at.strftime("%Y-%m-%d %H:%M:%S"),
+                completed_at.strftime("%Y-%m-%d %H:%M:%S"),
+            )
+
+    with connection:
+        connection.executemany(
+            "INSERT INTO HackathonProjects (ProjectName, TeamName, TeamMembers, Description, TechStack, RepoUrl, "
+            "DemoUrl, Track, Prize, JudgesScore, HackathonName, CompletedAt, CreatedAt) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            project_rows()
+        )
+    connection.execute("ANALYZE")
+    connection.close()
+
+
+def time_queries(db, dates, counts_runs):
+    """
+    Run the per-date pulls and the daily count aggregation, returning their latencies in seconds.
+    """
+    schema = project_schema(db)
+    by_date = []
+    for date_str in dates:
+        start = time.perf_counter()
+        db.query_to_dataframe(projects_by_date_statement('sqlite'), day_params(schema, date_str))
+        by_date.append(time.perf_counter() - start)
+
+    counts = []
+    for _ in range(counts_runs):
+        start = time.perf_counter()
+        db.query_to_dataframe(daily_counts_statement('sqlite', False, False, False))
+        counts.append(time.perf_counter() - start)
+    return by_date, counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark SQLite connection profiles on a large projects file')
+    parser.add_argument('--db', type=str, default='benchmark_projects.db',
+                        help='Benchmark database file (built if missing)')
+    parser.add_argument('--rows', type=int, default=2_000_000,
+                        help='Number of projects when building the file (default: 2000000)')
+    parser.add_argument('--days', type=int, default=730,
+                        help='Number of days the projects are spread over (default: 730)')
+    parser.add_argument('--queries', type=int, default=200,
+                        help='Number of per-date pulls per profile (default: 200)')
+    parser.add_argument('--counts-runs', type=int, default=5,
+                        help='Number of daily count aggregations per profile (default: 5)')
+    parser.add_argument('--rebuild', action='store_true',
+                        help='Rebuild the database file even if it exists')
+    args = parser.parse_args()
+
+    if args.rebuild or not os.path.exists(args.db):
+        print(f"Building {args.db} with {args.rows:,} projects over {args.days} days...")
+        start = time.perf_counter()
+        build_database(args.db, args.rows, args.days)
+        print(f"Built in {time.perf_counter() - start:.1f}s ({os.path.getsize(args.db) / 1e6:.0f} MB)")
+
+    rng = random.Random(1)
+    dates = [(FIRST_DAY + timedelta(days=rng.randrange(args.days))).strftime("%Y-%m-%d") for _ in range(args.queries)]
+
+    profiles = {
+        'default': lambda: DBConnector(connection_string=f"sqlite:///{args.db}"),
+        'ro': lambda: DBConnector(db_type='sqlite', sqlite_path=args.db, sqlite_mode='ro'),
+        'immutable': lambda: DBConnector(db_type='sqlite', sqlite_path=args.db, sqlite_mode='immutable'),
+    }
+
+    print(f"\n{'profile':<10} {'by-date p50 ms':>15} {'by-date p95 ms':>15} {'counts p50 ms':>14} {'total s':>9}")
+    for name, make_connector in profiles.items():
+        db = make_connector()
+        if not db.connect():
+            return 1
+        # Warm-up, so every profile starts from the same OS page cache
+        time_queries(db, dates[:10], 1)
+        start = time.perf_counter()
+        by_date, counts = time_queries(db, dates, args.counts_runs)
+        total = time.perf_counter() - start
+        db.disconnect()
+        dispose_engines()
+        print(f"{name:<10} {np.percentile(by_date, 50) * 1000:>15.2f} {np.percentile(by_date, 95) * 1000:>15.2f} "
+              f"{np.percentile(counts, 50) * 1000:>14.1f} {total:>9.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
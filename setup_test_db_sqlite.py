@@ -13,6 +13,8 @@ import random
 import sqlite3
 from faker import Faker
 
+from src.schema import SQLITE_DAILY_COUNTS_DDL, SQLITE_SEARCH_INDEX_DDL
+
 try:
     # Optional: load .env if present
     from dotenv import load_dotenv
@@ -54,6 +56,14 @@ def ensure_table(cursor):
     cursor.execute("CREATE INDEX IF NOT EXISTS IX_HackathonProjects_CompletedAt ON HackathonProjects(CompletedAt)")
     cursor.execute("CREATE INDEX IF NOT EXISTS IX_HackathonProjects_Hackathon ON HackathonProjects(HackathonName)")
 
+    # Per-day count rollup maintained by triggers (see src/schema.py)
+    for statement in SQLITE_DAILY_COUNTS_DDL:
+        cursor.execute(statement)
+
+    # Full-text search index over project text (see src/schema.py)
+    for statement in SQLITE_SEARCH_INDEX_DDL:
+        cursor.execute(statement)
+
 def random_project(faker: Faker, hackathon_name: str):
     adjectives = ["Quantum", "Swift", "Nebula", "Ripple", "Beacon", "Delta", "Nimbus", "Fusion", "Astra", "Pulse"]
     nouns = ["Vision", "Bridge", "Hub", "Forge", "Stream", "Pilot", "Sphere", "Link", "Lab", "Canvas"]
@@ -0,0 +1,285 @@
+import os
+import sys
+import math
+import pandas as pd
+from typing import List, Dict, Any, Optional, Tuple, Literal, Union
+from dotenv import load_dotenv
+from sqlalchemy import event, text, inspect
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.sql.expression import Executable
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine
+
+# Add the parent directory to the path to import the module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Import after adding to path
+from src.db_connector import (SQLITE_MODES, sqlite_url, sqlite_pragmas, _register_sqlite_functions,
+                              _sqlite_pragma_listener, _statement)
+from src.compact_frames import CHUNK_ROWS, read_compact
+from src.query_log import install_query_log
+
+# Load environment variables from .env file
+load_dotenv()
+
+# Async driver for each database type
+ASYNC_DRIVERS = {
+    'postgresql': 'postgresql+asyncpg',
+    'sqlite': 'sqlite+aiosqlite'
+}
+
+class AsyncDBConnector:
+    """
+    An asyncio counterpart of DBConnector built on SQLAlchemy's async engine (asyncpg or aiosqlite).
+    
+    Every call checks a connection out of the engine's pool for its own duration, so one
+    connector can serve many concurrent queries (e.g. asyncio.gather over several dates).
+    """
+    
+    def __init__(self,
+                 host: Optional[str] = None,
+                 database: Optional[str] = None,
+                 user: Optional[str] = None,
+                 password: Optional[str] = None,
+                 port: Optional[int] = None,
+                 connection_string: Optional[str] = None,
+                 db_type: Literal['postgresql', 'sqlite'] = 'postgresql',
+                 sqlite_path: Optional[str] = None,
+                 connect_timeout: Optional[float] = None,
+                 statement_timeout: Optional[float] = None,
+                 pool_size: int = 5,
+                 sqlite_mode: Optional[Literal['rw', 'ro', 'immutable']] = None,
+                 compact_dtypes: Optional[bool] = None):
+        """
+        Initialize the async connector with connection parameters.
+        If parameters are not provided, they will be loaded from environment variables.
+        
+        Args:
+            host: Database host address
+            database: Database name
+            user: Database user
+            password: Database password
+            port: Database port
+            connection_string: Direct connection string (overrides other parameters if provided);
+                a synchronous driver in it is replaced with the async one
+            db_type: Type of database to connect to ('postgresql' or 'sqlite')
+            sqlite_path: Path to SQLite database file (only used if db_type is 'sqlite')
+            connect_timeout: Seconds to wait for a connection (PostgreSQL) or a database lock (SQLite)
+            statement_timeout: Seconds after which PostgreSQL cancels a running statement
+            pool_size: Number of pooled connections shared by concurrent queries
+            sqlite_mode: SQLite access mode (see DBConnector)
+            compact_dtypes: Load query results with memory-compact dtypes (see DBConnector)
+        """
+        self.db_type = db_type
+        
+        if self.db_type == 'postgresql':
+            self.host = host or os.environ.get("DB_HOST")
+            self.database = database or os.environ.get("DB_NAME")
+            self.user = user or os.environ.get("DB_USER")
+            self.password = password or os.environ.get("DB_PASSWORD")
+            self.port = port or os.environ.get("DB_PORT", 5432)
+        elif self.db_type == 'sqlite':
+            self.sqlite_path = sqlite_path or os.environ.get("SQLITE_PATH", "hackathon_projects.db")
+            self.sqlite_mode = sqlite_mode or os.environ.get("SQLITE_MODE", "rw")
+            if self.sqlite_mode not in SQLITE_MODES:
+                raise ValueError(f"Unsupported SQLite mode: {self.sqlite_mode}")
+        else:
+            raise ValueError(f"Unsupported database type: {self.db_type}")
+        
+        self.connection_string = connection_string
+        self.connect_timeout = connect_timeout
+        self.statement_timeout = statement_timeout
+        self.pool_size = pool_size
+        if compact_dtypes is None:
+            compact_dtypes = os.environ.get("COMPACT_DTYPES", "false").lower() == "true"
+        self.compact_dtypes = compact_dtypes
+        
+        self.engine: Optional[AsyncEngine] = None
+    
+    def _async_url(self) -> str:
+        """
+        Build the async connection URL.
+        """
+        if self.connection_string:
+            url = make_url(self.connection_string)
+            backend = url.get_backend_name()
+            if backend not in ASYNC_DRIVERS:
+                raise ValueError(f"Unsupported database type: {backend}")
+            return url.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+        if self.db_type == 'postgresql':
+            return f"{ASYNC_DRIVERS['postgresql']}://{self.user}:{self.password}@{self.host}:{self.port}/{self.database}"
+        return sqlite_url(self.sqlite_path, self.sqlite_mode, driver=ASYNC_DRIVERS['sqlite'])
+    
+    def _connect_args(self, conn_str: str) -> Dict[str, Any]:
+        """
+        Build driver connect arguments for the configured timeouts.
+        
+        Args:
+            conn_str: SQLAlchemy connection string
+        
+        Returns:
+            Dictionary of DBAPI connect arguments
+        """
+        connect_args = {}
+        if conn_str.startswith('sqlite'):
+            if self.connect_timeout is not None:
+                connect_args['timeout'] = self.connect_timeout
+        elif conn_str.startswith('postgresql'):
+            if self.connect_timeout is not None:
+                connect_args['timeout'] = max(1, math.ceil(self.connect_timeout))
+            if self.statement_timeout is not None:
+                connect_args['server_settings'] = {
+                    'statement_timeout': str(max(1, int(self.statement_timeout * 1000)))
+                }
+        return connect_args
+    
+    async def connect(self) -> bool:
+        """
+        Create the async engine and check that the database is reachable.
+        
+        Returns:
+            bool: True if connection is successful, False otherwise
+        """
+        try:
+            conn_str = self._async_url()
+            engine_options = {'connect_args': self._connect_args(conn_str)}
+            if conn_str.startswith('postgresql'):
+                engine_options['pool_size'] = self.pool_size
+            self.engine = create_async_engine(conn_str, **engine_options)
+            if self.engine.dialect.name == 'sqlite':
+                event.listen(self.engine.sync_engine, "connect", _register_sqlite_functions)
+                if not self.connection_string:
+                    event.listen(self.engine.sync_engine, "connect",
+                                 _sqlite_pragma_listener(sqlite_pragmas(self.sqlite_mode)))
+            install_query_log(self.engine.sync_engine)
+            
+            async with self.engine.connect() as connection:
+                await connection.execute(text("SELECT 1"))
+            return True
+        except (SQLAlchemyError, OSError, ImportError) as e:
+            print(f"Error connecting to {self.db_type} database: {e}")
+            if self.engine:
+                await self.engine.dispose()
+            self.engine = None
+            return False
+    
+    async def disconnect(self) -> None:
+        """
+        Close every pooled connection.
+        """
+        if self.engine:
+            await self.engine.dispose()
+        self.engine = None
+    
+    async def __aenter__(self) -> "AsyncDBConnector":
+        if not await self.connect():
+            raise ConnectionError(f"Could not connect to the {self.db_type} database")
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.disconnect()
+    
+    async def _ensure_engine(self) -> bool:
+        return self.engine is not None or await self.connect()
+    
+    async def execute_query(self, query: Union[str, Executable], params: Optional[Dict[str, Any]] = None) -> List[Tuple]:
+        """
+        Execute a SQL query with optional parameters.
+        
+        Args:
+            query: SQL query string or SQLAlchemy Core statement
+            params: Dictionary of parameters for the query
+        
+        Returns:
+            List of tuples containing the query results or empty list if no results/error
+        """
+        try:
+            if not await self._ensure_engine():
+                return []
+            
+            async with self.engine.connect() as connection:
+                result = await connection.execute(_statement(query), params or {})
+                if result.returns_rows:
+                    return result.fetchall()
+                await connection.commit()
+                return []
+        except SQLAlchemyError as e:
+            print(f"Error executing query: {e}")
+            return []
+    
+    async def query_to_dataframe(self, query: Union[str, Executable], params: Optional[Dict[str, Any]] = None) -> Optional[pd.DataFrame]:
+        """
+        Execute a query and return the results as a pandas DataFrame.
+        
+        Args:
+            query: SQL query string or SQLAlchemy Core statement
+            params: Dictionary of parameters for the query
+        
+        Returns:
+            DataFrame containing the query results or None if error
+        """
+        try:
+            if not await self._ensure_engine():
+                return None
+            
+            async with self.engine.connect() as connection:
+                # pandas needs a synchronous connection; run_sync hands it one over the async driver
+                if self.compact_dtypes:
+                    return await connection.run_sync(
+                        lambda sync_connection: read_compact(pd.read_sql_query(
+                            _statement(query), sync_connection, params=params or {}, chunksize=CHUNK_ROWS))
+                    )
+                return await connection.run_sync(
+                    lambda sync_connection: pd.read_sql_query(_statement(query), sync_connection, params=params or {})
+                )
+        except SQLAlchemyError as e:
+            print(f"Error executing query to dataframe: {e}")
+            return None
+    
+    async def bulk_insert(self, table: str, data_list: List[Dict[str, Any]]) -> bool:
+        """
+        Insert multiple rows of data into a table in one transaction.
+        
+        Args:
+            table: Table name
+            data_list: List of dictionaries with column names as keys and values to insert
+        
+        Returns:
+            bool: True if bulk insertion was successful, False otherwise
+        """
+        if not data_list:
+            return True
+        
+        try:
+            if not await self._ensure_engine():
+                return False
+            
+            columns = data_list[0].keys()
+            column_str = ", ".join(columns)
+            value_str = ", ".join(f":{col}" for col in columns)
+            query = f"INSERT INTO {table} ({column_str}) VALUES ({value_str})"
+            
+            # A list of parameter sets runs as a single executemany
+            async with self.engine.begin() as connection:
+                await connection.execute(text(query), data_list)
+            return True
+        except SQLAlchemyError as e:
+            print(f"Error during bulk insert: {e}")
+            return False
+    
+    async def list_tables(self) -> List[str]:
+        """
+        List all tables in the current database.
+        
+        Returns:
+            List of table names or empty list if error
+        """
+        try:
+            if not await self._ensure_engine():
+                return []
+            
+            async with self.engine.connect() as connection:
+                return await connection.run_sync(lambda sync_connection: inspect(sync_connection).get_table_names())
+        except SQLAlchemyError as e:
+            print(f"Error listing tables: {e}")
+            return []
@@ -0,0 +1,288 @@
+"""
+Regenerate LinkedIn posts for every day in a date range.
+
+One fetch thread pulls upcoming dates over a single database connection while a
+pool of workers generates posts, so database reads overlap the LLM calls. Each
+finished date is recorded in a checkpoint manifest; re-running the same command
+after an interruption skips the dates that are already done.
+
+Usage:
+  python backfill.py --start 2025-06-01 --end 2025-08-31 --workers 4
+"""
+
+import os
+import sys
+import json
+import queue
+import argparse
+import threading
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+
+from dotenv import load_dotenv
+from openai import OpenAI
+
+# Add the parent directory to the path to import the module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Import after adding to path
+from src.utils import PROJECT_ROOT, parse_date, write_text_atomic
+from src.data_pull import create_db_connector, query_daily_counts, get_projects_by_date, deduplicate_projects
+from src.project_summary import generate_linkedin_post
+from src.metrics import flush_metrics
+
+load_dotenv()
+
+DEFAULT_MANIFEST_PATH = os.path.join(PROJECT_ROOT, "backfill_manifest.json")
+
+# Statuses that count as finished when resuming; empty dates are checked again, since
+# projects can still be submitted (today) or imported late
+COMPLETE_STATUSES = ("done",)
+
+
+class BackfillManifest:
+    """
+    Thread-safe checkpoint of per-date backfill results, persisted after every update.
+    """
+
+    def __init__(self, path=DEFAULT_MANIFEST_PATH):
+        """
+        Load the manifest from disk if it exists.
+
+        Args:
+            path: JSON file the manifest is persisted to
+        """
+        self.path = path
+        self.dates = {}
+        self._lock = threading.Lock()
+
+        if os.path.exists(path):
+            try:
+                with open(path) as f:
+                    self.dates = json.load(f).get("dates", {})
+            except (OSError, ValueError) as e:
+                print(f"Error loading backfill manifest from {path}: {e}")
+
+    def is_complete(self, date_str):
+        """
+        Check whether a date finished in an earlier run.
+
+        Args:
+            date_str: Date string in YYYY-MM-DD format
+
+        Returns:
+            bool: True if the date does not need to be processed again
+        """
+        with self._lock:
+            return self.dates.get(date_str, {}).get("status") in COMPLETE_STATUSES
+
+    def mark(self, date_str, status, **details):
+        """
+        Record the result for a date and persist the manifest.
+
+        Args:
+            date_str: Date string in YYYY-MM-DD format
+            status: 'done', 'empty' or 'failed'
+            **details: Extra JSON-serializable information to store with the result
+
+        Raises:
+            OSError: If the manifest could not be written
+        """
+        with self._lock:
+            self.dates[date_str] = {
+                "status": status,
+                "finished_at": datetime.now().isoformat(timespec='seconds'),
+                **details
+            }
+            write_text_atomic(self.path, json.dumps({"dates": self.dates}, indent=2, sort_keys=True))
+
+
+def dates_between(start_date, end_date):
+    """
+    List every date in an inclusive range.
+
+    Args:
+        start_date: First date in YYYY-MM-DD format
+        end_date: Last date in YYYY-MM-DD format
+
+    Returns:
+        List of YYYY-MM-DD strings
+    """
+    current = parse_date(start_date)
+    last = parse_date(end_date)
+    dates = []
+    while current <= last:
+        dates.append(current.strftime("%Y-%m-%d"))
+        current += timedelta(days=1)
+    return dates
+
+
+def run_backfill(start_date, end_date, workers=4, max_projects=20, mock=False, force=False,
+                 manifest_path=DEFAULT_MANIFEST_PATH, output_dir=PROJECT_ROOT, compress=False, group_themes=True):
+    """
+    Generate posts for every date in a range, resuming from the checkpoint manifest.
+
+    Args:
+        start_date: First date in YYYY-MM-DD format
+        end_date: Last date in YYYY-MM-DD format
+        workers: Number of concurrent post generations
+        max_projects: Maximum number of projects to include per post
+        mock: If True, generate mock posts without using the OpenAI API
+        force: If True, regenerate dates the manifest marks as complete
+        manifest_path: Path of the checkpoint manifest
+        output_dir: Directory the linkedin_post_YYYY_MM_DD.txt files are written to
+        compress: If True, compress the project text in each prompt (see prompt_compression)
+        group_themes: If True, organize each post by project theme (see theme_clustering)
+
+    Returns:
+        Dictionary mapping each status to the number of dates that ended with it in this run
+    """
+    manifest = BackfillManifest(manifest_path)
+    all_dates = dates_between(start_date, end_date)
+    pending = [d for d in all_dates if force or not manifest.is_complete(d)]
+    skipped = len(all_dates) - len(pending)
+
+    print(f"Backfilling {len(pending)} dates from {start_date} to {end_date} "
+          f"({skipped} already complete) with {workers} workers...")
+
+    client = None
+    if not mock:
+        OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+        if not OPENAI_API_KEY:
+            print("Warning: OPENAI_API_KEY environment variable not set. Falling back to mock mode.")
+            mock = True
+        else:
+            client = OpenAI(api_key=OPENAI_API_KEY)
+
+    # Bounded so the fetcher stays only a few dates ahead of the workers
+    fetched = queue.Queue(maxsize=workers * 2)
+    summary = {}
+    summary_lock = threading.Lock()
+
+    def record(date_str, status, **details):
+        try:
+            manifest.mark(date_str, status, **details)
+        except Exception as e:
+            # The worker keeps draining the queue; an unsaved date is redone on the next run
+            print(f"Error saving backfill manifest for {date_str}: {e}")
+            status = "failed"
+        with summary_lock:
+            summary[status] = summary.get(status, 0) + 1
+            print(f"  {date_str}: {status}")
+
+    def fetch_dates():
+        # DBConnector is not thread-safe, so a single thread owns the connection
+        db = create_db_connector(verbose=False, read_only=True)
+        fetched_count = 0
+        error = "Project fetch stopped before this date"
+        try:
+            if not db.connect():
+                print("Failed to connect to the database.")
+                error = "Database connection failed"
+                return
+            # One rollup read tells empty days apart from failed pulls
+            counts_df = query_daily_counts(db, start_date, end_date)
+            days_with_projects = set(counts_df['date']) if counts_df is not None else set(pending)
+            for date_str in pending:
+                if date_str not in days_with_projects:
+                    fetched.put((date_str, None))
+                else:
+                    projects_df = get_projects_by_date(date_str, verbose=False, db=db)
+                    fetched.put((date_str, projects_df if projects_df is not None else RuntimeError("Project pull failed")))
+                fetched_count += 1
+        except Exception as e:
+            print(f"Project fetch stopped: {e}")
+        finally:
+            db.disconnect()
+            # Dates that were never fetched are failures, so they are retried and the run exits non-zero
+            for date_str in pending[fetched_count:]:
+                fetched.put((date_str, RuntimeError(error)))
+            for _ in range(workers):
+                fetched.put(None)
+
+    def generate_posts():
+        while True:
+            item = fetched.get()
+            if item is None:
+                return
+            date_str, projects_df = item
+            try:
+                if isinstance(projects_df, Exception):
+                    raise projects_df
+                if projects_df is None or projects_df.empty:
+                    record(date_str, "empty", projects=0)
+                    continue
+                projects_df, collapsed = deduplicate_projects(projects_df, verbose=False)
+                run_stats = {}
+                linkedin_post = generate_linkedin_post(client, projects_df, date_str, max_projects, mock=mock,
+                                                       run_stats=run_stats, compress=compress,
+                                                       group_themes=group_themes)
+                # A mock post written because the API call failed is not a finished date
+                if run_stats.get('fallback'):
+                    raise RuntimeError("OpenAI request failed; only a mock post was generated")
+                output_file = os.path.join(output_dir, f"linkedin_post_{date_str.replace('-', '_')}.txt")
+                write_text_atomic(output_file, linkedin_post)
+                record(date_str, "done", projects=len(projects_df), duplicates=collapsed, output=output_file)
+            except Exception as e:
+                record(date_str, "failed", error=str(e))
+
+    fetcher = threading.Thread(target=fetch_dates, name="backfill-fetch", daemon=True)
+    fetcher.start()
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="backfill-generate") as pool:
+        for _ in range(workers):
+            pool.submit(generate_posts)
+    fetcher.join()
+
+    return summary
+
+
+def main():
+    """
+    Command-line interface for backfilling posts over a date range.
+    """
+    parser = argparse.ArgumentParser(description='Generate LinkedIn posts for every day in a date range')
+    parser.add_argument('--start', type=parse_date, required=True,
+                        help='First date in YYYY-MM-DD format')
+    parser.add_argument('--end', type=parse_date, default=None,
+                        help='Last date in YYYY-MM-DD format (default: today)')
+    parser.add_argument('--workers', type=int, default=4,
+                        help='Number of concurrent post generations (default: 4)')
+    parser.add_argument('--max-projects', type=int, default=20,
+                        help='Maximum number of projects to include in each post (default: 20)')
+    parser.add_argument('--mock', action='store_true',
+                        help='Generate mock LinkedIn posts without using the OpenAI API')
+    parser.add_argument('--compress', action='store_true',
+                        help='Compress project descriptions to their key sentences to shorten the prompts')
+    parser.add_argument('--no-themes', action='store_true',
+                        help='List projects in creation order instead of grouping them by theme')
+    parser.add_argument('--force', action='store_true',
+                        help='Regenerate dates already marked complete in the manifest')
+    parser.add_argument('--manifest', type=str, default=DEFAULT_MANIFEST_PATH,
+                        help='Checkpoint manifest path (default: backfill_manifest.json in the project root)')
+    parser.add_argument('--use-sqlite', action='store_true',
+                        help='Use SQLite database instead of PostgreSQL')
+    parser.add_argument('--sqlite-path', type=str, default='../hackathon_projects.db',
+                        help='Path to SQLite database file (default: ../hackathon_projects.db)')
+    args = parser.parse_args()
+
+    if args.use_sqlite:
+        os.environ["USE_SQLITE"] = "true"
+        os.environ["SQLITE_PATH"] = args.sqlite_path
+
+    start_date = args.start.strftime("%Y-%m-%d")
+    end_date = (args.end or datetime.now()).strftime("%Y-%m-%d")
+    if start_date > end_date:
+        print(f"Error: Start date {start_date} is after end date {end_date}.")
+        return 1
+
+    summary = run_backfill(start_date, end_date, workers=max(1, args.workers), max_projects=args.max_projects,
+                           mock=args.mock, force=args.force, manifest_path=args.manifest,
+                           compress=args.compress, group_themes=not args.no_themes)
+    flush_metrics()
+
+    print("\nBackfill summary: " + (", ".join(f"{count} {status}" for status, count in sorted(summary.items())) or "nothing to do"))
+    return 1 if summary.get("failed") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,209 @@
+"""
+Per-project blurbs, memoized so regenerating a post only summarizes new or changed projects.
+
+In incremental mode a post is written in two steps: each project is first
+summarized into a short structured blurb, then the post is composed from the
+blurbs instead of the full project text. Blurbs are cached by project id and a
+hash of the project's content (and the model), so after a late submission only
+the new project needs a blurb call, and the compose prompt stays small.
+
+The cache is a JSON file, BLURB_CACHE_PATH (default: cache/blurbs.json in the
+repository root).
+"""
+
+import os
+import sys
+import json
+import hashlib
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import pandas as pd
+
+# Add the parent directory to the path to import the module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Import after adding to path
+from src.utils import PROJECT_ROOT, write_text_atomic
+from src.metrics import CACHE_HITS, CACHE_MISSES
+
+DEFAULT_BLURB_CACHE_PATH = os.getenv("BLURB_CACHE_PATH", os.path.join(PROJECT_ROOT, "cache", "blurbs.json"))
+MAX_CACHED_BLURBS = 5000
+MAX_WORKERS = 4
+
+# Bump whenever the blurb prompt changes, so cached blurbs are rewritten
+BLURB_VERSION = "1"
+
+# Project fields a blurb is written from; a change to any of them invalidates the blurb
+BLURB_FIELDS = ("title", "preview", "description", "techStack", "track", "prize", "githubUrl", "demoUrl")
+
+BLURB_SYSTEM_PROMPT = """You summarize one project built by the Sundai tech community, for a community manager
+who will write a LinkedIn post about many projects. Reply with exactly three short lines:
+What: what the project does, in one sentence
+For: who it helps
+Standout: its most interesting technical or product aspect
+Only use facts from the project details."""
+
+
+def blurb_key(project, model):
+    """
+    Build the cache key of a project's blurb: its id plus a hash of its content, the model and BLURB_VERSION.
+
+    Args:
+        project: Dictionary of one project's fields
+        model: Model the blurb is written with
+    """
+    content = json.dumps([None if pd.isna(value) else str(value)
+                          for value in (project.get(field) for field in BLURB_FIELDS)])
+    digest = hashlib.sha1(f"{BLURB_VERSION}|{model}|{content}".encode()).hexdigest()[:16]
+    return f"{project.get('id') or project.get('title')}:{digest}"
+
+
+def blurb_prompt(project):
+    """
+    Build the user message asking for one project's blurb.
+    """
+    lines = [f"Project: {project.get('title') or 'Untitled Project'}"]
+    for field, label in (("preview", "Preview"), ("description", "Description"), ("techStack", "Tech stack"),
+                         ("track", "Track"), ("prize", "Prize")):
+        value = project.get(field)
+        if value is not None and not pd.isna(value) and str(value).strip():
+            lines.append(f"{label}: {value}")
+    return "\n".join(lines)
+
+
+class BlurbCache:
+    """
+    Thread-safe JSON file of blurbs keyed by blurb_key.
+    """
+
+    def __init__(self, path=DEFAULT_BLURB_CACHE_PATH, max_entries=MAX_CACHED_BLURBS):
+        """
+        Args:
+            path: JSON file of the cached blurbs
+            max_entries: Maximum number of blurbs kept; the oldest are dropped first
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self._entries = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._entries is None:
+            try:
+                with open(self.path) as f:
+                    self._entries = json.load(f)
+            except FileNotFoundError:
+                self._entries = {}
+            except (OSError, ValueError) as e:
+                print(f"Warning: Ignoring unreadable blurb cache {self.path}: {e}")
+                self._entries = {}
+        return self._entries
+
+    def get(self, key):
+        with self._lock:
+            entry = self._load().get(key)
+        return entry['blurb'] if entry else None
+
+    def put_many(self, blurbs):
+        """
+        Store several blurbs and save the file.
+
+        Args:
+            blurbs: Dictionary of blurb_key to blurb text
+        """
+        if not blurbs:
+            return
+        with self._lock:
+            entries = self._load()
+            created_at = datetime.now().isoformat(timespec='seconds')
+            for key, blurb in blurbs.items():
+                entries[key] = {'blurb': blurb, 'created_at': created_at}
+            if len(entries) > self.max_entries:
+                oldest = sorted(entries, key=lambda k: entries[k]['created_at'])[:len(entries) - self.max_entries]
+                for key in oldest:
+                    del entries[key]
+            try:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                write_text_atomic(self.path, json.dumps(entries))
+            except OSError as e:
+                print(f"Warning: Could not save blurb cache to {self.path}: {e}")
+
+
+# Shared by every generation in the process
+BLURB_CACHE = BlurbCache()
+
+
+def get_blurbs(projects_df, write_blurb, model, cache=BLURB_CACHE, max_workers=MAX_WORKERS, timeout=None):
+    """
+    Get the blurb of every project, writing only the ones that are not cached.
+
+    Args:
+        projects_df: DataFrame containing project data
+        write_blurb: Function taking a blurb_prompt string and returning the blurb text
+            (it is called concurrently for the missing blurbs)
+        model: Model the blurbs are written with (part of the cache key)
+        cache: BlurbCache
+        max_workers: Maximum number of blurbs written at once
+        timeout: Optional seconds allowed for writing all the missing blurbs; blurbs not
+            written by then are skipped (write_blurb should time out within it too)
+
+    Returns:
+        List of blurbs in row order; None where writing a blurb failed or was skipped
+    """
+    projects = projects_df.to_dict('records')
+    keys = [blurb_key(project, model) for project in projects]
+    blurbs = [cache.get(key) for key in keys]
+
+    missing = [position for position, blurb in enumerate(blurbs) if blurb is None]
+    CACHE_HITS.inc(len(projects) - len(missing), cache="blurbs")
+    CACHE_MISSES.inc(len(missing), cache="blurbs")
+    if not missing:
+        return blurbs
+
+    print(f"Writing blurbs for {len(missing)} of {len(projects)} projects ({len(projects) - len(missing)} cached)...")
+
+    def write(position):
+        try:
+            return write_blurb(blurb_prompt(projects[position])).strip() or None
+        except Exception as e:
+            print(f"Error writing blurb for {projects[position].get('title')}: {e}")
+            return None
+
+    pool = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(missing))), thread_name_prefix="blurb")
+    futures = [pool.submit(write, position) for position in missing]
+    done, not_done = wait(futures, timeout=timeout)
+    # Don't wait for the calls still running; blurbs not started yet are never sent
+    pool.shutdown(wait=False, cancel_futures=True)
+    written = [future.result() if future in done else None for future in futures]
+    if not_done:
+        print(f"Blurb budget of {timeout:.1f}s ran out; {len(not_done)} projects keep their own text.")
+
+    for position, blurb in zip(missing, written):
+        blurbs[position] = blurb
+    cache.put_many({keys[position]: blurb for position, blurb in zip(missing, written) if blurb})
+    return blurbs
+
+
+def with_blurbs(projects_df, blurbs):
+    """
+    Replace each project's preview/description with its blurb, for formatting the compose prompt.
+
+    Projects without a blurb keep their own text.
+
+    Args:
+        projects_df: DataFrame containing project data
+        blurbs: List of blurbs (or None) in row order, from get_blurbs
+
+    Returns:
+        A new DataFrame with the same rows
+    """
+    projects_df = projects_df.copy()
+    has_blurb = pd.Series([blurb is not None for blurb in blurbs], index=projects_df.index)
+    if 'preview' in projects_df.columns:
+        projects_df['preview'] = projects_df['preview'].astype(object).where(~has_blurb, None)
+    description = projects_df['description'] if 'description' in projects_df.columns else pd.Series(None, index=projects_df.index)
+    projects_df['description'] = [blurb if blurb is not None else original
+                                  for blurb, original in zip(blurbs, description.astype(object))]
+    return projects_df
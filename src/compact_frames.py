@@ -0,0 +1,145 @@
+"""
+Memory-compact dtypes for large project pulls.
+
+pandas loads every string column as Python objects and every number as a 64-bit
+value. On the projects table that wastes most of a pull's memory: Track,
+HackathonName and Prize repeat heavily, and TeamMembers/TechStack are long
+strings. compact_dataframe maps each column to a smaller dtype:
+- strings that repeat (at most CATEGORY_MAX_UNIQUE_RATIO unique values), and columns
+  that are entirely missing, become categoricals
+- other strings become Arrow-backed strings when pyarrow is installed, and stay objects otherwise
+- integers are downcast to the smallest integer type that holds them, and floats
+  to float32 when that loses nothing
+
+DBConnector(compact_dtypes=True) (or COMPACT_DTYPES=true) reads query results in
+chunks and compacts each chunk as it arrives, so the full object-dtype frame is
+never held in memory at once.
+"""
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import (infer_dtype, is_bool_dtype, is_float_dtype, is_integer_dtype, is_object_dtype,
+                              union_categoricals)
+
+try:
+    import pyarrow  # noqa: F401
+    ARROW_STRINGS = True
+except ImportError:
+    ARROW_STRINGS = False
+
+# Rows read and compacted at a time by read_compact
+CHUNK_ROWS = 50_000
+# Largest share of distinct values for which a string column becomes a categorical
+CATEGORY_MAX_UNIQUE_RATIO = 0.5
+
+
+def compact_series(series):
+    """
+    Convert a column to its compact dtype (see the module docstring).
+
+    Args:
+        series: pandas Series
+
+    Returns:
+        The converted Series, or the original one if no smaller dtype applies
+    """
+    if is_bool_dtype(series.dtype):
+        return series
+    if is_integer_dtype(series.dtype):
+        return pd.to_numeric(series, downcast='integer')
+    if is_float_dtype(series.dtype):
+        downcast = series.astype(np.float32)
+        if np.array_equal(downcast.to_numpy(np.float64), series.to_numpy(np.float64), equal_nan=True):
+            return downcast
+        return series
+    if not is_object_dtype(series.dtype):
+        return series
+    kind = infer_dtype(series, skipna=True)
+    if kind == 'empty' and len(series):
+        # Entirely missing (e.g. Prize on most days): codes of -1 take one byte per row
+        return series.astype('category')
+    if kind != 'string':
+        return series
+
+    present = series.count()
+    if series.nunique() <= CATEGORY_MAX_UNIQUE_RATIO * present:
+        return series.astype('category')
+    if ARROW_STRINGS:
+        return series.astype('string[pyarrow]')
+    return series
+
+
+def compact_dataframe(df):
+    """
+    Convert every column of a DataFrame to its compact dtype.
+
+    Args:
+        df: pandas DataFrame
+
+    Returns:
+        A new DataFrame with the same rows and columns
+    """
+    return pd.DataFrame({column: compact_series(df[column]) for column in df.columns}, index=df.index)
+
+
+def _concat_column(parts):
+    """
+    Concatenate one column of several compacted chunks, keeping it compact.
+    """
+    if all(isinstance(part.dtype, pd.CategoricalDtype) for part in parts):
+        return pd.Series(union_categoricals(parts), name=parts[0].name)
+    # Chunks compacted to different kinds (e.g. a categorical and Arrow strings) are redone on the whole column
+    if len({str(part.dtype) for part in parts}) > 1 and any(
+            isinstance(part.dtype, pd.CategoricalDtype) or str(part.dtype) == 'string' for part in parts):
+        return compact_series(pd.concat([part.astype(object) for part in parts], ignore_index=True))
+    return pd.concat(parts, ignore_index=True)
+
+
+def read_compact(chunks):
+    """
+    Compact query results chunk by chunk and combine them.
+
+    Args:
+        chunks: Iterable of DataFrames, e.g. pd.read_sql_query(..., chunksize=CHUNK_ROWS)
+
+    Returns:
+        A single compacted DataFrame (empty, without columns, if there were no chunks)
+    """
+    frames = [compact_dataframe(chunk) for chunk in chunks]
+    if not frames:
+        return pd.DataFrame()
+    if len(frames) == 1:
+        return frames[0].reset_index(drop=True)
+    return pd.DataFrame({column: _concat_column([frame[column].reset_index(drop=True) for frame in frames])
+                         for column in frames[0].columns})
+
+
+def frame_memory(df):
+    """
+    Get the memory used by a DataFrame in bytes, including the strings it references.
+    """
+    return int(df.memory_usage(deep=True, index=False).sum())
+
+
+def memory_report(original_df, compact_df):
+    """
+    Describe the memory of each column before and after compaction.
+
+    Args:
+        original_df: DataFrame as loaded
+        compact_df: The same rows after compact_dataframe
+
+    Returns:
+        Multi-line string with one row per column and a total
+    """
+    before = original_df.memory_usage(deep=True, index=False)
+    after = compact_df.memory_usage(deep=True, index=False)
+    lines = [f"{'column':<16} {'dtype':>10} {'compact dtype':>16} {'MB':>9} {'compact MB':>11}"]
+    for column in original_df.columns:
+        lines.append(f"{column:<16} {str(original_df[column].dtype):>10} {str(compact_df[column].dtype):>16} "
+                     f"{before[column] / 1e6:>9.2f} {after[column] / 1e6:>11.2f}")
+    total_before, total_after = before.sum(), after.sum()
+    reduction = 1 - total_after / total_before if total_before else 0.0
+    lines.append(f"{'total':<16} {'':>10} {'':>16} {total_before / 1e6:>9.2f} {total_after / 1e6:>11.2f}"
+                 f"  ({reduction:.0%} smaller)")
+    return "\n".join(lines)
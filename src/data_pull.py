@@ -1,167 +1,302 @@
 import sys
 import os
+import re
+import json
+import time
+import asyncio
 import argparse
 from dotenv import load_dotenv
 import pandas as pd
-from datetime import datetime, timedelta
+from datetime import datetime
+from sqlalchemy.engine import make_url
 
 # Add the parent directory to the path to import the module
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # Import after adding to path
 from src.db_connector import DBConnector
+from src.async_db_connector import AsyncDBConnector
 from src.utils import parse_date
+from src.schema import daily_counts_table, has_search_index
+from src.queries import (
+    project_schema, day_params, projects_by_date_statement, daily_counts_statement,
+    fingerprint_statement, search_statement, track_counts_statement, prize_winners_statement,
+    highlighted_projects_statement
+)
+from src.near_duplicates import MinHasher, LSHIndex
+from src.metrics import DB_QUERY_LATENCY, ROWS_FETCHED, PROMPT_FIELD_TOKENS, CACHE_HITS, CACHE_MISSES
+from src.result_cache import PROJECTS_CACHE, RECENT_DATE_TTL, ttl_for_date
+from src.prompt_compression import DEFAULT_MAX_TOKENS_PER_PROJECT, compress_projects
+from src.theme_clustering import select_across_themes
+from src.compact_frames import compact_dataframe, memory_report
 
 load_dotenv()
 
-def get_projects_by_date(date_str, verbose=True):
+def timed_dataframe_query(db, name, query, params=None):
+    """
+    Run a query into a DataFrame, recording its latency and row count in the metrics.
+    
+    Args:
+        db: Connected DBConnector
+        name: Query name used as the metrics label
+        query: SQL query string or SQLAlchemy Core statement
+        params: Optional query parameters
+        
+    Returns:
+        DataFrame containing the query results or None if error
+    """
+    start = time.perf_counter()
+    df = db.query_to_dataframe(query, params)
+    DB_QUERY_LATENCY.observe(time.perf_counter() - start, query=name)
+    if df is not None:
+        ROWS_FETCHED.inc(len(df), query=name)
+    return df
+
+def create_db_connector(verbose=True, timeout=None, read_only=False):
+    """
+    Create a DBConnector for the configured backend (USE_SQLITE selects SQLite over PostgreSQL).
+    
+    Args:
+        verbose: If True, print status messages
+        timeout: Optional seconds allowed for connecting and for each statement
+        read_only: If True, open SQLite read-only (SQLITE_MODE=immutable opens snapshot files
+            without locking); writers get the read-write WAL mode
+        
+    Returns:
+        DBConnector instance (not yet connected)
+    """
+    use_sqlite = os.getenv("USE_SQLITE", "false").lower() == "true"
+    
+    if use_sqlite:
+        if verbose:
+            print("Using SQLite database connection...")
+        return DBConnector(
+            db_type='sqlite',
+            sqlite_path=os.getenv("SQLITE_PATH", "hackathon_projects.db"),
+            connect_timeout=timeout,
+            statement_timeout=timeout,
+            sqlite_mode=(os.getenv("SQLITE_MODE") or "ro") if read_only else "rw"
+        )
+    
+    if verbose:
+        print("Using PostgreSQL database connection...")
+    return DBConnector(
+        host=os.getenv("DB_HOST") or "34.148.221.200",
+        database=os.getenv("DB_NAME") or "sundai_db",
+        user=os.getenv("DB_USER") or "readonly",
+        password=os.getenv("DB_PASS") or "readonly",
+        port=5432,
+        connect_timeout=timeout,
+        statement_timeout=timeout
+    )
+
+def create_async_db_connector(verbose=True, timeout=None, pool_size=5):
+    """
+    Create an AsyncDBConnector for the configured backend (see create_db_connector).
+    
+    Args:
+        verbose: If True, print status messages
+        timeout: Optional seconds allowed for connecting and for each statement
+        pool_size: Number of pooled connections shared by concurrent queries
+        
+    Returns:
+        AsyncDBConnector instance (not yet connected)
+    """
+    db = create_db_connector(verbose, timeout, read_only=True)
+    if db.db_type == 'sqlite':
+        return AsyncDBConnector(db_type='sqlite', sqlite_path=db.sqlite_path, sqlite_mode=db.sqlite_mode,
+                                connect_timeout=timeout, statement_timeout=timeout,
+                                compact_dtypes=db.compact_dtypes)
+    return AsyncDBConnector(host=db.host, database=db.database, user=db.user, password=db.password,
+                            port=db.port, connect_timeout=timeout, statement_timeout=timeout,
+                            pool_size=pool_size, compact_dtypes=db.compact_dtypes)
+
+def database_label(db):
+    """
+    Identify the database a (sync or async) connector points at, without credentials.
+    
+    Args:
+        db: DBConnector or AsyncDBConnector (connected or not)
+        
+    Returns:
+        String such as 'sqlite:/path/to/file.db' or 'postgresql://host:5432/name'
+    """
+    if getattr(db, 'connection_string', None):
+        return make_url(db.connection_string).render_as_string(hide_password=True)
+    if db.db_type == 'sqlite':
+        return f"sqlite:{os.path.abspath(db.sqlite_path)}"
+    return f"postgresql://{db.host}:{db.port}/{db.database}"
+
+def cache_projects(cache_key, date_str, projects_df, data_fingerprint=None):
+    """
+    Store a date's pull in the result cache (empty pulls only briefly, in case projects arrive late).
+    """
+    ttl = ttl_for_date(date_str) if not projects_df.empty else RECENT_DATE_TTL
+    PROJECTS_CACHE.put(cache_key, projects_df, ttl, data_fingerprint)
+
+def query_daily_counts(db, start_date=None, end_date=None):
+    """
+    Query per-day project counts, reading the rollup table when it is available.
+    
+    Falls back to a GROUP BY over the project table if the rollup has not been
+    created (see schema.py).
+    
+    Args:
+        db: Connected DBConnector instance
+        start_date: First day to include (YYYY-MM-DD), or None for no lower bound
+        end_date: Last day to include (YYYY-MM-DD), or None for no upper bound
+        
+    Returns:
+        DataFrame with 'date' and 'project_count' columns, ordered by date, or None if error
+    """
+    schema = project_schema(db)
+    use_rollup = daily_counts_table(db) in db.list_tables()
+    query = daily_counts_statement(schema.name, use_rollup, start_date is not None, end_date is not None)
+    
+    params = {}
+    if start_date is not None:
+        params['start_date'] = schema.rollup_day(start_date) if use_rollup else schema.day_start(start_date)
+    if end_date is not None:
+        params['end_date'] = schema.rollup_day(end_date) if use_rollup else schema.day_end(end_date)
+    
+    counts_df = timed_dataframe_query(db, 'daily_counts', query, params)
+    if counts_df is not None:
+        counts_df['date'] = counts_df['date'].astype(str)
+    return counts_df
+
+def print_date_hints(db):
+    """
+    Print the range of project dates and the busiest dates, to help pick a date with projects.
+    
+    Args:
+        db: Connected DBConnector instance
+    """
+    counts_df = query_daily_counts(db)
+    
+    if counts_df is None or counts_df.empty:
+        return
+    
+    print(f"Project creation dates range from {counts_df['date'].iloc[0]} to {counts_df['date'].iloc[-1]}")
+    
+    # Suggest some dates that have projects
+    top_dates = counts_df.sort_values('project_count', ascending=False, kind='stable').head(5)
+    print("\nDates with the most projects:")
+    for date, count in top_dates.itertuples(index=False):
+        print(f"  - {date}: {count} projects")
+
+def get_project_counts_by_day(start_date=None, end_date=None, verbose=False):
+    """
+    Get the number of projects created on each day of a date range.
+    
+    Args:
+        start_date: First day to include (YYYY-MM-DD), or None for no lower bound
+        end_date: Last day to include (YYYY-MM-DD), or None for no upper bound
+        verbose: If True, print status messages
+        
+    Returns:
+        Dictionary mapping YYYY-MM-DD strings to project counts (days without projects are omitted),
+        or None if error
+    """
+    for value in (start_date, end_date):
+        if value is not None:
+            try:
+                datetime.strptime(value, "%Y-%m-%d")
+            except ValueError:
+                if verbose:
+                    print(f"Error: Invalid date format '{value}'. Please use YYYY-MM-DD format.")
+                return None
+    
+    db = create_db_connector(verbose, read_only=True)
+    if not db.connect():
+        if verbose:
+            print("Failed to connect to the database.")
+        return None
+    
+    try:
+        counts_df = query_daily_counts(db, start_date, end_date)
+        if counts_df is None:
+            return None
+        return {date: int(count) for date, count in counts_df.itertuples(index=False)}
+    finally:
+        db.disconnect()
+
+def get_projects_by_date(date_str, verbose=True, db=None, timeout=None, use_cache=True, data_fingerprint=None):
     """
     Fetch projects from the database that were created on a specific date.
     
+    Pulls are read through the result cache (see result_cache), so a repeat lookup
+    does not connect to the database.
+    
     Args:
         date_str: Date string in YYYY-MM-DD format
         verbose: If True, print status messages
+        db: Optional connected DBConnector to reuse; it is left open. If None, a
+            connection is opened for this call and closed afterwards.
+        timeout: Optional seconds allowed for connecting and for each query (ignored when db is given)
+        use_cache: If False, always query the database (the result still refreshes the cache)
+        data_fingerprint: Optional current result of get_date_fingerprint; a cached pull is
+            only used if it was stored for the same fingerprint
         
     Returns:
         DataFrame containing projects or None if error/not found
     """
-    # Parse the date
+    # Validate the date
     try:
-        target_date = datetime.strptime(date_str, "%Y-%m-%d")
+        datetime.strptime(date_str, "%Y-%m-%d")
     except ValueError:
         if verbose:
             print(f"Error: Invalid date format '{date_str}'. Please use YYYY-MM-DD format.")
         return None
     
-    # Calculate next day for query range
-    next_day = target_date + timedelta(days=1)
-    next_day_str = next_day.strftime("%Y-%m-%d")
-    
     if verbose:
         print(f"Fetching projects created on {date_str}...")
     
-    # Determine which database to use
-    use_sqlite = os.getenv("USE_SQLITE", "false").lower() == "true"
-    
-    if use_sqlite:
-        if verbose:
-            print("Using SQLite database connection...")
-        db = DBConnector(
-            db_type='sqlite',
-            sqlite_path=os.getenv("SQLITE_PATH", "hackathon_projects.db")
-        )
-    else:
-        if verbose:
-            print("Using PostgreSQL database connection...")
-        db = DBConnector(
-            host=os.getenv("DB_HOST") or "34.148.221.200",
-            database=os.getenv("DB_NAME") or "sundai_db",
-            user=os.getenv("DB_USER") or "readonly",
-            password=os.getenv("DB_PASS") or "readonly",
-            port=5432
-        )
+    source_db = db or create_db_connector(verbose=False)
+    cache_key = PROJECTS_CACHE.key(database_label(source_db), date_str, source_db.compact_dtypes)
+    if use_cache:
+        projects_df = PROJECTS_CACHE.get(cache_key, data_fingerprint)
+        if projects_df is not None:
+            CACHE_HITS.inc(cache="projects")
+            if projects_df.empty:
+                if verbose:
+                    print(f"No projects found with creation date {date_str} (cached).")
+                return None
+            if verbose:
+                print(f"Found {len(projects_df)} projects created on {date_str} (cached).")
+            return projects_df
+        CACHE_MISSES.inc(cache="projects")
     
-    # Connect to the database
-    if not db.connect():
-        if verbose:
-            print("Failed to connect to the database.")
-        return None
+    owns_connection = db is None
+    if owns_connection:
+        db = create_db_connector(verbose, timeout, read_only=True)
+        
+        # Connect to the database
+        if not db.connect():
+            if verbose:
+                print("Failed to connect to the database.")
+            return None
     
     try:
         # Find the appropriate table based on database type
-        tables = db.list_tables()
+        schema = project_schema(db)
         
-        if getattr(db, 'db_type', 'postgresql') == 'sqlite':
-            target_table = 'HackathonProjects'
-        else:
-            target_table = 'Project'
-            
-        if target_table not in tables:
+        if schema.table.name not in db.list_tables():
             if verbose:
-                print(f"{target_table} table not found in the database.")
+                print(f"{schema.table.name} table not found in the database.")
             return None
         
         # Query for projects created on the specified date
-        if getattr(db, 'db_type', 'postgresql') == 'sqlite':
-            query = f"""
-            SELECT 
-                ProjectID as project_id, 
-                ProjectName as project_name, 
-                TeamName as team_name, 
-                TeamMembers as team_members,
-                Description as description, 
-                TechStack as tech_stack,
-                RepoUrl as repo_url, 
-                DemoUrl as demo_url, 
-                Track as track, 
-                Prize as prize,
-                HackathonName as hackathon_name, 
-                CompletedAt as createdAt
-            FROM HackathonProjects 
-            WHERE date(CompletedAt) = '{date_str}'
-            ORDER BY CompletedAt
-            """
-        else:
-            query = f"""
-            SELECT * 
-            FROM "Project" 
-            WHERE "createdAt" >= '{date_str} 00:00:00' 
-            AND "createdAt" < '{next_day_str} 00:00:00'
-            ORDER BY "createdAt"
-            """
+        projects_df = timed_dataframe_query(db, 'projects_by_date', projects_by_date_statement(schema.name),
+                                            day_params(schema, date_str))
         
-        projects_df = db.query_to_dataframe(query)
+        if projects_df is not None:
+            cache_projects(cache_key, date_str, projects_df, data_fingerprint)
         
         if projects_df is None or projects_df.empty:
             if verbose:
                 print(f"No projects found with creation date {date_str}.")
                 
-                # Get the date range of projects
-                if getattr(db, 'db_type', 'postgresql') == 'sqlite':
-                    date_range_query = """
-                    SELECT 
-                        MIN(CompletedAt) as earliest_date,
-                        MAX(CompletedAt) as latest_date
-                    FROM HackathonProjects
-                    """
-                else:
-                    date_range_query = """
-                    SELECT 
-                        MIN("createdAt") as earliest_date,
-                        MAX("createdAt") as latest_date
-                    FROM "Project"
-                    """
-                
-                date_range = db.execute_query(date_range_query)
-                
-                if date_range:
-                    earliest, latest = date_range[0]
-                    print(f"Project creation dates range from {earliest} to {latest}")
-                    
-                    # Suggest some dates that have projects
-                    if getattr(db, 'db_type', 'postgresql') == 'sqlite':
-                        sample_dates_query = """
-                        SELECT DISTINCT DATE(CompletedAt) as creation_date, COUNT(*) as project_count
-                        FROM HackathonProjects
-                        GROUP BY DATE(CompletedAt)
-                        ORDER BY project_count DESC
-                        LIMIT 5
-                        """
-                    else:
-                        sample_dates_query = """
-                        SELECT DISTINCT DATE("createdAt") as creation_date, COUNT(*) as project_count
-                        FROM "Project"
-                        GROUP BY DATE("createdAt")
-                        ORDER BY project_count DESC
-                        LIMIT 5
-                        """
-                    
-                    sample_dates = db.execute_query(sample_dates_query)
-                    
-                    if sample_dates:
-                        print("\nDates with the most projects:")
-                        for date, count in sample_dates:
-                            print(f"  - {date}: {count} projects")
+                print_date_hints(db)
             
             return None
         
@@ -171,18 +306,438 @@ def get_projects_by_date(date_str, verbose=True):
         return projects_df
     
     finally:
-        # Disconnect when done
+        # Disconnect when done, unless the caller owns the connection
+        if owns_connection:
+            db.disconnect()
+            if verbose:
+                print("Disconnected from the database.")
+
+async def get_projects_by_dates_async(dates, db=None, timeout=None, max_concurrency=5, use_cache=True):
+    """
+    Fetch the projects for several dates concurrently over one connection pool.
+    
+    Dates found in the result cache are not queried; if all are, no connection is made.
+    
+    Args:
+        dates: Iterable of date strings in YYYY-MM-DD format
+        db: Optional AsyncDBConnector to reuse; it is left open. If None, one is
+            created for this call and disposed afterwards.
+        timeout: Optional seconds allowed for connecting and for each query (ignored when db is given)
+        max_concurrency: Maximum number of queries in flight at once
+        use_cache: If False, query every date (the results still refresh the cache)
+        
+    Returns:
+        Dictionary mapping each date to its DataFrame of projects (empty if none),
+        or to None if the date is invalid or its query failed
+    """
+    dates = list(dates)
+    owns_connection = db is None
+    if owns_connection:
+        db = create_async_db_connector(verbose=False, timeout=timeout, pool_size=max_concurrency)
+    source = database_label(db)
+    
+    results = {}
+    misses = []
+    for date_str in dates:
+        try:
+            datetime.strptime(date_str, "%Y-%m-%d")
+        except ValueError:
+            results[date_str] = None
+            continue
+        cached = PROJECTS_CACHE.get(PROJECTS_CACHE.key(source, date_str, db.compact_dtypes)) if use_cache else None
+        if cached is not None:
+            CACHE_HITS.inc(cache="projects")
+            results[date_str] = cached
+        else:
+            if use_cache:
+                CACHE_MISSES.inc(cache="projects")
+            misses.append(date_str)
+    
+    if not misses:
+        return {date_str: results[date_str] for date_str in dates}
+    
+    if owns_connection and not await db.connect():
+        results.update({date_str: None for date_str in misses})
+        return {date_str: results[date_str] for date_str in dates}
+    
+    semaphore = asyncio.Semaphore(max_concurrency)
+    schema = project_schema(db)
+    query = projects_by_date_statement(schema.name)
+    
+    async def fetch(date_str):
+        async with semaphore:
+            start = time.perf_counter()
+            df = await db.query_to_dataframe(query, day_params(schema, date_str))
+            DB_QUERY_LATENCY.observe(time.perf_counter() - start, query='projects_by_date')
+            if df is not None:
+                ROWS_FETCHED.inc(len(df), query='projects_by_date')
+                cache_projects(PROJECTS_CACHE.key(source, date_str, db.compact_dtypes), date_str, df)
+            return df
+    
+    try:
+        fetched = await asyncio.gather(*(fetch(date_str) for date_str in misses))
+        results.update(zip(misses, fetched))
+        return {date_str: results[date_str] for date_str in dates}
+    finally:
+        if owns_connection:
+            await db.disconnect()
+
+def get_date_fingerprint(date_str, db=None, timeout=None):
+    """
+    Fingerprint the projects for a date with a single aggregate query: row count,
+    latest timestamp and a checksum over every row's columns.
+    
+    Args:
+        date_str: Date string in YYYY-MM-DD format
+        db: Optional connected DBConnector to reuse; it is left open
+        timeout: Optional seconds allowed for connecting and for the query (ignored when db is given)
+        
+    Returns:
+        Dictionary with 'row_count', 'max_timestamp' and 'column_hash', or None if error
+    """
+    try:
+        datetime.strptime(date_str, "%Y-%m-%d")
+    except ValueError:
+        return None
+    
+    owns_connection = db is None
+    if owns_connection:
+        db = create_db_connector(verbose=False, timeout=timeout, read_only=True)
+        if not db.connect():
+            return None
+    
+    try:
+        schema = project_schema(db)
+        
+        start = time.perf_counter()
+        result = db.execute_query(fingerprint_statement(schema.name), day_params(schema, date_str))
+        DB_QUERY_LATENCY.observe(time.perf_counter() - start, query='fingerprint')
+        if not result:
+            return None
+        
+        row_count, max_timestamp, column_hash = result[0]
+        return {
+            'row_count': int(row_count),
+            'max_timestamp': str(max_timestamp) if max_timestamp is not None else None,
+            'column_hash': str(column_hash)
+        }
+    
+    finally:
+        if owns_connection:
+            db.disconnect()
+
+def _fts5_match_expression(query):
+    """
+    Turn free text into an FTS5 MATCH expression, quoting each term so punctuation
+    in the user's query is not parsed as FTS5 syntax.
+    
+    Args:
+        query: Free-text search query
+        
+    Returns:
+        FTS5 MATCH expression (all terms must match)
+    """
+    terms = [term.replace('"', '""') for term in query.split()]
+    return " ".join(f'"{term}"' for term in terms if term)
+
+def search_projects(query, date_range=None, limit=20, verbose=True):
+    """
+    Full-text search over project titles, descriptions and tech stacks, ranked by relevance.
+    
+    Uses the FTS5 table on SQLite and the GIN-indexed tsvector column on PostgreSQL
+    (create them with schema.py).
+    
+    Args:
+        query: Free-text search query, e.g. "health" or "LangChain agents"
+        date_range: Optional (start_date, end_date) tuple of YYYY-MM-DD strings, both inclusive;
+            either bound may be None
+        limit: Maximum number of projects to return
+        verbose: If True, print status messages
+        
+    Returns:
+        DataFrame of matching projects ordered by relevance (best first) with a 'rank' column,
+        or None if error/not found
+    """
+    if not query or not query.strip():
+        if verbose:
+            print("Error: Search query is empty.")
+        return None
+    
+    start_date, end_date = date_range or (None, None)
+    for value in (start_date, end_date):
+        if value is not None:
+            try:
+                datetime.strptime(value, "%Y-%m-%d")
+            except ValueError:
+                if verbose:
+                    print(f"Error: Invalid date format '{value}'. Please use YYYY-MM-DD format.")
+                return None
+    
+    if verbose:
+        print(f"Searching projects for '{query}'...")
+    
+    db = create_db_connector(verbose, read_only=True)
+    
+    if not db.connect():
+        if verbose:
+            print("Failed to connect to the database.")
+        return None
+    
+    try:
+        if not has_search_index(db):
+            if verbose:
+                print("Search index not found in the database. Run schema.py to create it.")
+            return None
+        
+        schema = project_schema(db)
+        search_query = search_statement(schema.name, start_date is not None, end_date is not None)
+        
+        params = {
+            'query': _fts5_match_expression(query) if schema.name == 'sqlite' else query,
+            'limit': limit
+        }
+        if start_date is not None:
+            params['start_date'] = schema.day_start(start_date)
+        if end_date is not None:
+            params['end_date'] = schema.day_end(end_date)
+        
+        projects_df = timed_dataframe_query(db, 'search', search_query, params)
+        
+        if projects_df is None or projects_df.empty:
+            if verbose:
+                print(f"No projects found matching '{query}'.")
+            return None
+        
+        if verbose:
+            print(f"Found {len(projects_df)} projects matching '{query}'.")
+        
+        return projects_df.reset_index(drop=True)
+    
+    finally:
         db.disconnect()
         if verbose:
             print("Disconnected from the database.")
 
-def format_projects_for_prompt(projects_df, max_projects=20):
+def get_period_digest(start_date, end_date, max_projects=20, verbose=True, timeout=None):
+    """
+    Summarize the projects of a date range (a weekly or monthly digest) with a few aggregate queries.
+    
+    Counts per day (from the rollup table when available) and per track, and the prize
+    winners, are computed in SQL; full rows are only fetched for the highlighted projects
+    (prize winners first, then the highest judges' scores). Tracks, prizes and scores only
+    exist on SQLite; on PostgreSQL the latest projects are highlighted.
+    
+    Args:
+        start_date: First day in YYYY-MM-DD format
+        end_date: Last day in YYYY-MM-DD format (inclusive)
+        max_projects: Maximum number of highlighted projects (and of prize winners listed)
+        verbose: If True, print status messages
+        timeout: Optional seconds allowed for connecting and for each query
+        
+    Returns:
+        Dictionary with 'start_date', 'end_date', 'project_count', 'daily_counts' (list of
+        (date, count)), 'tracks' (list of (track, count, average score)), 'prize_winners' (list of
+        dictionaries) and 'highlights' (DataFrame), or None if error/not found
+    """
+    for value in (start_date, end_date):
+        try:
+            datetime.strptime(value, "%Y-%m-%d")
+        except ValueError:
+            if verbose:
+                print(f"Error: Invalid date format '{value}'. Please use YYYY-MM-DD format.")
+            return None
+    
+    if verbose:
+        print(f"Summarizing projects created from {start_date} to {end_date}...")
+    
+    db = create_db_connector(verbose, timeout, read_only=True)
+    if not db.connect():
+        if verbose:
+            print("Failed to connect to the database.")
+        return None
+    
+    try:
+        schema = project_schema(db)
+        counts_df = query_daily_counts(db, start_date, end_date)
+        if counts_df is None or counts_df.empty:
+            if verbose:
+                print(f"No projects found from {start_date} to {end_date}.")
+            return None
+        
+        params = {'day_start': schema.day_start(start_date), 'day_end': schema.day_end(end_date)}
+        
+        tracks = []
+        if schema.has_column('track'):
+            tracks_df = timed_dataframe_query(db, 'track_counts', track_counts_statement(schema.name), params)
+            if tracks_df is not None:
+                tracks = [(track, int(count), None if pd.isna(score) else float(score))
+                          for track, count, score in tracks_df.itertuples(index=False)]
+        
+        prize_winners = []
+        if schema.has_column('prize'):
+            winners_df = timed_dataframe_query(db, 'prize_winners', prize_winners_statement(schema.name),
+                                               {**params, 'limit': max_projects})
+            if winners_df is not None:
+                prize_winners = winners_df.to_dict('records')
+        
+        highlights_df = timed_dataframe_query(db, 'highlights', highlighted_projects_statement(schema.name),
+                                              {**params, 'limit': max_projects})
+        if highlights_df is None:
+            return None
+        
+        digest = {
+            'start_date': start_date,
+            'end_date': end_date,
+            'project_count': int(counts_df['project_count'].sum()),
+            'daily_counts': [(date, int(count)) for date, count in counts_df.itertuples(index=False)],
+            'tracks': tracks,
+            'prize_winners': prize_winners,
+            'highlights': highlights_df
+        }
+        if verbose:
+            print(f"Found {digest['project_count']} projects on {len(digest['daily_counts'])} day(s); "
+                  f"highlighting {len(highlights_df)}.")
+        return digest
+    
+    finally:
+        db.disconnect()
+        if verbose:
+            print("Disconnected from the database.")
+
+def _normalize_url(url):
+    """
+    Normalize a URL for duplicate detection (scheme, www., trailing slash and .git are ignored).
+    """
+    if not isinstance(url, str) or not url.strip():
+        return None
+    url = url.strip().lower()
+    url = re.sub(r'^[a-z]+://', '', url)
+    url = re.sub(r'^www\.', '', url)
+    url = re.sub(r'(\.git)?/*$', '', url)
+    return url or None
+
+def _first_column(projects_df, names):
+    """
+    Get the first of several alternative column names present in the DataFrame.
+    """
+    for name in names:
+        if name in projects_df.columns:
+            return name
+    return None
+
+def deduplicate_projects(projects_df, similarity_threshold=0.8, verbose=True):
+    """
+    Collapse resubmitted projects within a day's pull.
+    
+    Rows are duplicates if they share a repo URL or demo URL, or if their descriptions
+    are near-identical (MinHash/LSH over word shingles). Titles alone are not a key, since
+    unrelated projects often reuse generic names. Each group keeps its most recent row.
+    Runs in linear time in the number of rows.
+    
+    Args:
+        projects_df: DataFrame containing project data, ordered by creation time
+        similarity_threshold: Minimum estimated description similarity for a near-duplicate
+        verbose: If True, print how many rows were collapsed
+        
+    Returns:
+        Tuple of (deduplicated DataFrame, number of rows collapsed)
+    """
+    if projects_df is None or len(projects_df) < 2:
+        return projects_df, 0
+    
+    row_count = len(projects_df)
+    parent = list(range(row_count))
+    
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+    
+    def union(i, j):
+        root_i, root_j = find(i), find(j)
+        if root_i != root_j:
+            parent[max(root_i, root_j)] = min(root_i, root_j)
+    
+    # Exact keys
+    key_columns = [
+        (_first_column(projects_df, ['githubUrl', 'repo_url']), _normalize_url),
+        (_first_column(projects_df, ['demoUrl', 'demo_url']), _normalize_url),
+    ]
+    for column, normalize in key_columns:
+        if column is None:
+            continue
+        first_seen = {}
+        for position, value in enumerate(projects_df[column].tolist()):
+            key = normalize(value)
+            if key is None:
+                continue
+            if key in first_seen:
+                union(first_seen[key], position)
+            else:
+                first_seen[key] = position
+    
+    # Near-identical descriptions
+    description_column = _first_column(projects_df, ['description', 'preview'])
+    if description_column is not None:
+        hasher = MinHasher()
+        lsh = LSHIndex(hasher.num_perm)
+        for position, description in enumerate(projects_df[description_column].tolist()):
+            if not isinstance(description, str) or not description.strip():
+                continue
+            signature = hasher.signature(description)
+            for match_position, _ in lsh.query(signature, similarity_threshold):
+                union(match_position, position)
+            lsh.add(position, signature)
+    
+    # Keep the latest row of each group
+    latest = {}
+    for position in range(row_count):
+        latest[find(position)] = position
+    keep_positions = sorted(latest.values())
+    collapsed = row_count - len(keep_positions)
+    
+    if verbose and collapsed:
+        print(f"Collapsed {collapsed} duplicate project rows ({row_count} -> {len(keep_positions)}).")
+    
+    return projects_df.iloc[keep_positions].reset_index(drop=True), collapsed
+
+def prompt_row_positions(projects_df, max_projects=20, themes=None):
+    """
+    Get the positions of the rows format_projects_for_prompt lists, in prompt order.
+    
+    Args:
+        projects_df: DataFrame containing project data
+        max_projects: Maximum number of projects to include
+        themes: Optional list of theme_clustering.ThemeCluster over projects_df's rows
+        
+    Returns:
+        Tuple of (list of row positions, dictionary of prompt index to theme heading)
+    """
+    if not themes:
+        return list(range(min(len(projects_df), max_projects))), {}
+    selected = select_across_themes(themes, max_projects)
+    positions = []
+    theme_headings = {}
+    for index, theme in enumerate(themes):
+        if selected[index]:
+            theme_headings[len(positions)] = f"Theme: {theme.name} ({len(theme)} projects in total)"
+            positions.extend(selected[index])
+    return positions, theme_headings
+
+def format_projects_for_prompt(projects_df, max_projects=20, compress=False,
+                               max_tokens_per_project=DEFAULT_MAX_TOKENS_PER_PROJECT, themes=None):
     """
     Format project data for the GPT prompt.
     
     Args:
         projects_df: DataFrame containing project data
         max_projects: Maximum number of projects to include
+        compress: If True, reduce the preview (or description) each project lists to its most
+            central sentences (see prompt_compression) and report the token reduction
+        max_tokens_per_project: Token cap per project when compressing
+        themes: Optional list of theme_clustering.ThemeCluster over projects_df's rows; projects
+            are then listed under their theme, and the limit takes projects from every theme in turn
         
     Returns:
         String with formatted project data
@@ -192,13 +747,27 @@ def format_projects_for_prompt(projects_df, max_projects=20):
     
     # Limit the number of projects to avoid token limits
     if len(projects_df) > max_projects:
-        print(f"Limiting to {max_projects} projects for the prompt.")
-        projects_df = projects_df.head(max_projects)
+        if themes:
+            print(f"Limiting to {max_projects} projects for the prompt, taken from all {len(themes)} themes.")
+        else:
+            print(f"Limiting to {max_projects} projects for the prompt.")
+    positions, theme_headings = prompt_row_positions(projects_df, max_projects, themes)
+    projects_df = projects_df.iloc[positions]
+    
+    if compress:
+        projects_df, tokens_before, tokens_after = compress_projects(projects_df, max_tokens_per_project)
+        PROMPT_FIELD_TOKENS.inc(tokens_before, stage="original")
+        PROMPT_FIELD_TOKENS.inc(tokens_after, stage="compressed")
+        if tokens_before:
+            print(f"Compressed project text from ~{tokens_before} to ~{tokens_after} tokens "
+                  f"({1 - tokens_after / tokens_before:.0%} smaller).")
     
     formatted_projects = []
     
-    for idx, project in projects_df.iterrows():
+    for idx, (_, project) in enumerate(projects_df.iterrows()):
         project_info = []
+        if idx in theme_headings:
+            project_info.append(theme_headings[idx])
         project_info.append(f"Project #{idx+1}: {project.get('title', 'Untitled Project')}")
         
         # Add preview/description
@@ -219,6 +788,31 @@ def format_projects_for_prompt(projects_df, max_projects=20):
     
     return "\n\n".join(formatted_projects)
 
+def format_digest_summary(digest):
+    """
+    Format the aggregate part of a period digest (see get_period_digest) for the GPT prompt.
+    
+    Args:
+        digest: Dictionary from get_period_digest
+        
+    Returns:
+        String with one line per statistic
+    """
+    build_days = len(digest['daily_counts'])
+    lines = [f"Projects created: {digest['project_count']} on {build_days} build day{'s' if build_days != 1 else ''}"]
+    if digest['daily_counts']:
+        busiest_date, busiest_count = max(digest['daily_counts'], key=lambda day: day[1])
+        lines.append(f"Busiest day: {busiest_date} with {busiest_count} projects")
+    if digest['tracks']:
+        lines.append("Projects per track: " + ", ".join(
+            f"{track} {count}" for track, count, _ in digest['tracks']))
+    if digest['prize_winners']:
+        lines.append("Prize winners: " + "; ".join(
+            f"{winner['title']} ({winner['prize']}, {winner['track']})" if pd.notna(winner.get('track'))
+            else f"{winner['title']} ({winner['prize']})"
+            for winner in digest['prize_winners']))
+    return "\n".join(lines)
+
 def save_projects_to_csv(projects_df, date_str=None, output_file=None):
     """
     Save projects DataFrame to a CSV file.
@@ -263,13 +857,35 @@ def main():
                         help='Output CSV file path (default: ../projects_YYYY_MM_DD.csv)')
     parser.add_argument('--quiet', action='store_true',
                         help='Suppress status messages')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Query the database even if the pull is cached')
+    parser.add_argument('--counts', action='store_true',
+                        help='Print per-day project counts as JSON instead of pulling projects')
+    parser.add_argument('--start-date', type=str, default=None,
+                        help='First day for --counts in YYYY-MM-DD format (default: no lower bound)')
+    parser.add_argument('--end-date', type=str, default=None,
+                        help='Last day for --counts in YYYY-MM-DD format (default: no upper bound)')
+    parser.add_argument('--compact-dtypes', action='store_true',
+                        help='Load the pull with categorical, Arrow string and downcast numeric columns')
+    parser.add_argument('--memory-report', action='store_true',
+                        help="Print each column's memory as pulled and with compact dtypes")
     args = parser.parse_args()
     
+    if args.compact_dtypes:
+        os.environ["COMPACT_DTYPES"] = "true"
+    
+    if args.counts:
+        counts = get_project_counts_by_day(args.start_date, args.end_date, verbose=not args.quiet)
+        if counts is None:
+            return 1
+        print(json.dumps(counts))
+        return 0
+    
     # Use provided date or default to today
     date_str = args.date or datetime.now().strftime("%Y-%m-%d")
     
     # Get projects for the specified date
-    projects_df = get_projects_by_date(date_str, verbose=not args.quiet)
+    projects_df = get_projects_by_date(date_str, verbose=not args.quiet, use_cache=not args.no_cache)
     
     if projects_df is not None and not projects_df.empty:
         # Save to CSV
@@ -278,9 +894,14 @@ def main():
         if not args.quiet:
             # Display project summary
             print("\nProject Summary:")
-            summary_df = projects_df[['id', 'title', 'createdAt', 'status']].copy()
-            summary_df['createdAt'] = summary_df['createdAt'].dt.strftime('%Y-%m-%d %H:%M:%S')
+            summary_columns = [column for column in ['id', 'title', 'createdAt', 'status'] if column in projects_df.columns]
+            summary_df = projects_df[summary_columns].copy()
+            summary_df['createdAt'] = pd.to_datetime(summary_df['createdAt']).dt.strftime('%Y-%m-%d %H:%M:%S')
             print(summary_df)
+        
+        if args.memory_report:
+            print("\nMemory:")
+            print(memory_report(projects_df, compact_dataframe(projects_df)))
     else:
         if not args.quiet:
             print("No projects found or error occurred.")
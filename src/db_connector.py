@@ -1,14 +1,128 @@
 import os
+import math
+import zlib
+import threading
+import urllib.parse
 import pandas as pd
 from typing import List, Dict, Any, Optional, Tuple, Union, Literal
 from dotenv import load_dotenv
-from sqlalchemy import create_engine, text, inspect
+from sqlalchemy import create_engine, event, text, inspect
 from sqlalchemy.engine import Engine, Connection
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.sql.expression import Executable
+
+from src.compact_frames import CHUNK_ROWS, read_compact
+from src.query_log import install_query_log
 
 # Load environment variables from .env file
 load_dotenv()
 
+# SQLite access modes: 'rw' (read-write, WAL journal), 'ro' (read-only) and 'immutable'
+# (read-only without any locking, for snapshot files nothing writes to while they are open)
+SQLITE_MODES = ('rw', 'ro', 'immutable')
+# Page cache (KiB) and memory-mapped I/O size (bytes) for each SQLite connection
+SQLITE_CACHE_SIZE_KIB = int(os.getenv("SQLITE_CACHE_SIZE_KIB", 64 * 1024))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", 256 * 1024 * 1024))
+
+def _register_sqlite_functions(dbapi_connection, connection_record) -> None:
+    """
+    Register helper SQL functions on each new SQLite connection.
+    
+    crc32(value) hashes a value's text form, so row checksums can be computed in a
+    single aggregate query (PostgreSQL has md5() built in).
+    """
+    dbapi_connection.create_function(
+        "crc32", 1,
+        lambda value: None if value is None else zlib.crc32(str(value).encode()),
+        deterministic=True
+    )
+
+def sqlite_url(path: str, mode: str = 'rw', driver: str = 'sqlite') -> str:
+    """
+    Build the SQLAlchemy URL of a SQLite file opened in one of SQLITE_MODES.
+    
+    Args:
+        path: Database file path
+        mode: 'rw', 'ro' or 'immutable'
+        driver: SQLAlchemy dialect+driver (e.g. 'sqlite+aiosqlite')
+        
+    Returns:
+        Connection string; read-only modes use a file: URI
+    """
+    if mode == 'rw':
+        return f"{driver}:///{path}"
+    uri_path = urllib.parse.quote(os.path.abspath(path))
+    options = "mode=ro&immutable=1" if mode == 'immutable' else "mode=ro"
+    return f"{driver}:///file:{uri_path}?{options}&uri=true"
+
+def sqlite_pragmas(mode: str = 'rw') -> Tuple[Tuple[str, Any], ...]:
+    """
+    Get the PRAGMAs applied to every SQLite connection opened in a mode.
+    
+    Readers get a large page cache, memory-mapped I/O and in-memory temp tables;
+    writers also switch the file to WAL, so readers are not blocked while they write.
+    """
+    pragmas = (
+        ('cache_size', -SQLITE_CACHE_SIZE_KIB),
+        ('mmap_size', SQLITE_MMAP_SIZE),
+        ('temp_store', 'MEMORY'),
+    )
+    if mode == 'rw':
+        pragmas += (('journal_mode', 'WAL'), ('synchronous', 'NORMAL'))
+    return pragmas
+
+def _sqlite_pragma_listener(pragmas: Tuple[Tuple[str, Any], ...]):
+    """
+    Build a connect listener that applies PRAGMAs to each new pooled SQLite connection.
+    """
+    def apply_pragmas(dbapi_connection, connection_record) -> None:
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas:
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+    return apply_pragmas
+
+# Engines shared by every DBConnector with the same URL and connect arguments, so their
+# connection pools and compiled-statement caches outlive individual connect/disconnect cycles
+_engines: Dict[Tuple[str, str], Engine] = {}
+_engines_lock = threading.Lock()
+
+def _shared_engine(conn_str: str, connect_args: Dict[str, Any],
+                   pragmas: Tuple[Tuple[str, Any], ...] = ()) -> Engine:
+    """
+    Get the shared engine for a connection string, connect arguments and SQLite PRAGMAs,
+    creating it on first use.
+    """
+    key = (conn_str, repr(sorted(connect_args.items())), repr(pragmas))
+    with _engines_lock:
+        engine = _engines.get(key)
+        if engine is None:
+            engine = create_engine(conn_str, connect_args=connect_args)
+            if engine.dialect.name == 'sqlite':
+                event.listen(engine, "connect", _register_sqlite_functions)
+                if pragmas:
+                    event.listen(engine, "connect", _sqlite_pragma_listener(pragmas))
+            install_query_log(engine)
+            _engines[key] = engine
+        return engine
+
+def dispose_engines() -> None:
+    """
+    Close every pooled connection of the shared engines.
+    """
+    with _engines_lock:
+        for engine in _engines.values():
+            engine.dispose()
+        _engines.clear()
+
+def _statement(query: Union[str, Executable]) -> Executable:
+    """
+    Wrap raw SQL strings in text(); SQLAlchemy Core statements are used as they are.
+    """
+    return text(query) if isinstance(query, str) else query
+
 class DBConnector:
     """
     A class for connecting to and interacting with databases (PostgreSQL or SQLite) using SQLAlchemy.
@@ -22,7 +136,11 @@ class DBConnector:
                  port: Optional[int] = None,
                  connection_string: Optional[str] = None,
                  db_type: Literal['postgresql', 'sqlite'] = 'postgresql',
-                 sqlite_path: Optional[str] = None):
+                 sqlite_path: Optional[str] = None,
+                 connect_timeout: Optional[float] = None,
+                 statement_timeout: Optional[float] = None,
+                 sqlite_mode: Optional[Literal['rw', 'ro', 'immutable']] = None,
+                 compact_dtypes: Optional[bool] = None):
         """
         Initialize the SQLAlchemy connector with connection parameters.
         If parameters are not provided, they will be loaded from environment variables.
@@ -36,6 +154,12 @@ class DBConnector:
             connection_string: Direct connection string (overrides other parameters if provided)
             db_type: Type of database to connect to ('postgresql' or 'sqlite')
             sqlite_path: Path to SQLite database file (only used if db_type is 'sqlite')
+            connect_timeout: Seconds to wait for a connection (PostgreSQL) or a database lock (SQLite)
+            statement_timeout: Seconds after which PostgreSQL cancels a running statement
+            sqlite_mode: SQLite access mode, 'rw', 'ro' or 'immutable' (default: SQLITE_MODE or 'rw');
+                every mode applies the tuned PRAGMAs from sqlite_pragmas()
+            compact_dtypes: If True, query_to_dataframe loads results with categorical, Arrow string and
+                downcast numeric columns (see compact_frames); default: the COMPACT_DTYPES env variable
         """
         self.db_type = db_type
         
@@ -47,10 +171,18 @@ class DBConnector:
             self.port = port or os.environ.get("DB_PORT", 5432)
         elif self.db_type == 'sqlite':
             self.sqlite_path = sqlite_path or os.environ.get("SQLITE_PATH", "hackathon_projects.db")
+            self.sqlite_mode = sqlite_mode or os.environ.get("SQLITE_MODE", "rw")
+            if self.sqlite_mode not in SQLITE_MODES:
+                raise ValueError(f"Unsupported SQLite mode: {self.sqlite_mode}")
         else:
             raise ValueError(f"Unsupported database type: {self.db_type}")
         
         self.connection_string = connection_string
+        self.connect_timeout = connect_timeout
+        self.statement_timeout = statement_timeout
+        if compact_dtypes is None:
+            compact_dtypes = os.environ.get("COMPACT_DTYPES", "false").lower() == "true"
+        self.compact_dtypes = compact_dtypes
         
         self.engine = None
         self.connection = None
@@ -69,9 +201,10 @@ class DBConnector:
             elif self.db_type == 'postgresql':
                 conn_str = f"postgresql://{self.user}:{self.password}@{self.host}:{self.port}/{self.database}"
             elif self.db_type == 'sqlite':
-                conn_str = f"sqlite:///{self.sqlite_path}"
+                conn_str = sqlite_url(self.sqlite_path, self.sqlite_mode)
             
-            self.engine = create_engine(conn_str)
+            pragmas = sqlite_pragmas(self.sqlite_mode) if self.db_type == 'sqlite' and not self.connection_string else ()
+            self.engine = _shared_engine(conn_str, self._connect_args(conn_str), pragmas)
             self.connection = self.engine.connect()
             self.inspector = inspect(self.engine)
             return True
@@ -79,24 +212,44 @@ class DBConnector:
             print(f"Error connecting to {self.db_type} database: {e}")
             return False
     
+    def _connect_args(self, conn_str: str) -> Dict[str, Any]:
+        """
+        Build driver connect arguments for the configured timeouts.
+        
+        Args:
+            conn_str: SQLAlchemy connection string
+            
+        Returns:
+            Dictionary of DBAPI connect arguments
+        """
+        connect_args = {}
+        if conn_str.startswith('sqlite'):
+            if self.connect_timeout is not None:
+                connect_args['timeout'] = self.connect_timeout
+        elif conn_str.startswith('postgresql'):
+            if self.connect_timeout is not None:
+                # libpq only accepts whole seconds
+                connect_args['connect_timeout'] = max(1, math.ceil(self.connect_timeout))
+            if self.statement_timeout is not None:
+                connect_args['options'] = f"-c statement_timeout={max(1, int(self.statement_timeout * 1000))}"
+        return connect_args
+    
     def disconnect(self) -> None:
         """
-        Close the database connection.
+        Close the database connection (returning it to the shared engine's pool).
         """
         if self.connection:
             self.connection.close()
-        if self.engine:
-            self.engine.dispose()
         self.connection = None
         self.engine = None
         self.inspector = None
     
-    def execute_query(self, query: str, params: Optional[Dict[str, Any]] = None) -> List[Tuple]:
+    def execute_query(self, query: Union[str, Executable], params: Optional[Dict[str, Any]] = None) -> List[Tuple]:
         """
         Execute a SQL query with optional parameters.
         
         Args:
-            query: SQL query string
+            query: SQL query string or SQLAlchemy Core statement
             params: Dictionary of parameters for the query
             
         Returns:
@@ -107,7 +260,7 @@ class DBConnector:
                 if not self.connect():
                     return []
             
-            result = self.connection.execute(text(query), params or {})
+            result = self.connection.execute(_statement(query), params or {})
             
             if result.returns_rows:
                 return result.fetchall()
@@ -120,12 +273,38 @@ class DBConnector:
                 self.connection.rollback()
             return []
     
-    def query_to_dataframe(self, query: str, params: Optional[Dict[str, Any]] = None) -> Optional[pd.DataFrame]:
+    def execute_statements(self, statements: List[str]) -> bool:
+        """
+        Execute several statements (e.g. DDL) in a single transaction.
+        
+        Args:
+            statements: List of SQL statement strings, executed in order
+            
+        Returns:
+            bool: True if every statement succeeded, False otherwise (the transaction is rolled back)
+        """
+        try:
+            if not self.connection:
+                if not self.connect():
+                    return False
+            
+            for statement in statements:
+                self.connection.execute(text(statement))
+            
+            self.connection.commit()
+            return True
+        except SQLAlchemyError as e:
+            print(f"Error executing statements: {e}")
+            if self.connection:
+                self.connection.rollback()
+            return False
+    
+    def query_to_dataframe(self, query: Union[str, Executable], params: Optional[Dict[str, Any]] = None) -> Optional[pd.DataFrame]:
         """
         Execute a query and return the results as a pandas DataFrame.
         
         Args:
-            query: SQL query string
+            query: SQL query string or SQLAlchemy Core statement
             params: Dictionary of parameters for the query
             
         Returns:
@@ -136,7 +315,11 @@ class DBConnector:
                 if not self.connect():
                     return None
             
-            return pd.read_sql_query(text(query), self.connection, params=params or {})
+            if self.compact_dtypes:
+                # Compact each chunk as it arrives, so the object-dtype rows are never all in memory
+                return read_compact(pd.read_sql_query(_statement(query), self.connection, params=params or {},
+                                                      chunksize=CHUNK_ROWS))
+            return pd.read_sql_query(_statement(query), self.connection, params=params or {})
         except SQLAlchemyError as e:
             print(f"Error executing query to dataframe: {e}")
             return None
@@ -0,0 +1,55 @@
+"""
+Latency budget for a pipeline run.
+
+A Deadline is created once per run (main.py --deadline SECONDS) and each stage
+asks it for a timeout: a share of whatever time is left when the stage starts.
+"""
+
+import time
+from typing import Optional
+
+
+class Deadline:
+    """
+    A fixed end time that pipeline stages split between them.
+    """
+
+    def __init__(self, seconds: Optional[float] = None):
+        """
+        Start the clock.
+
+        Args:
+            seconds: Total budget in seconds, or None for no deadline
+        """
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds if seconds else None
+
+    def remaining(self) -> Optional[float]:
+        """
+        Get the time left in seconds (never negative), or None if there is no deadline.
+        """
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        """
+        Check whether the budget is used up.
+        """
+        return self.expires_at is not None and time.monotonic() >= self.expires_at
+
+    def stage_budget(self, share: float, minimum: float = 0.5) -> Optional[float]:
+        """
+        Get the timeout for a stage as a share of the remaining time.
+
+        Args:
+            share: Fraction of the remaining time the stage may use (0-1)
+            minimum: Lower bound in seconds, so a stage never gets a zero timeout
+
+        Returns:
+            Timeout in seconds, or None if there is no deadline
+        """
+        remaining = self.remaining()
+        if remaining is None:
+            return None
+        return max(minimum, remaining * share)
@@ -0,0 +1,69 @@
+"""
+Store of ready-to-review post drafts, one JSON file per date.
+
+main.py writes a draft whenever it generates (or reuses) the post for a date, and
+the web UI reads drafts/YYYY_MM_DD.json to show it without running the pipeline.
+"""
+
+import os
+import sys
+import json
+from datetime import datetime
+
+# Add the parent directory to the path to import the module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Import after adding to path
+from src.utils import PROJECT_ROOT, write_text_atomic
+
+DEFAULT_DRAFTS_DIR = os.getenv("DRAFTS_DIR", os.path.join(PROJECT_ROOT, "drafts"))
+
+
+def draft_path(date_str, drafts_dir=DEFAULT_DRAFTS_DIR):
+    """
+    Get the draft file path for a date in YYYY-MM-DD format.
+    """
+    return os.path.join(drafts_dir, f"{date_str.replace('-', '_')}.json")
+
+
+def save_draft(date_str, post, data_fingerprint=None, drafts_dir=DEFAULT_DRAFTS_DIR):
+    """
+    Save the draft post for a date.
+
+    Args:
+        date_str: Date string in YYYY-MM-DD format
+        post: Post text
+        data_fingerprint: Dictionary from data_pull.get_date_fingerprint for the data the post was generated from
+        drafts_dir: Directory containing the drafts
+    """
+    os.makedirs(drafts_dir, exist_ok=True)
+    draft = {
+        'date': date_str,
+        'post': post,
+        'project_count': data_fingerprint['row_count'] if data_fingerprint else None,
+        'data_fingerprint': data_fingerprint,
+        'generated_at': datetime.now().isoformat(timespec='seconds')
+    }
+    write_text_atomic(draft_path(date_str, drafts_dir), json.dumps(draft, indent=2))
+
+
+def load_draft(date_str, drafts_dir=DEFAULT_DRAFTS_DIR):
+    """
+    Load the draft for a date.
+
+    Args:
+        date_str: Date string in YYYY-MM-DD format
+        drafts_dir: Directory containing the drafts
+
+    Returns:
+        Draft dictionary, or None if there is no readable draft
+    """
+    path = draft_path(date_str, drafts_dir)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Error reading draft {path}: {e}")
+        return None
@@ -0,0 +1,210 @@
+"""
+Hedged chat completion requests, to cut the tail latency of post generation.
+
+A hedged request is sent once; if it has not answered after the hedge delay (by
+default the 90th percentile of recent request latencies), an identical second
+request is sent and whichever answers first is used, the other being cancelled.
+Only the slowest ~10% of requests are hedged, so the extra cost stays small; a
+budget additionally caps the share of recent requests that may be hedged.
+
+Latencies are kept in a small history file shared by every run (LLM_LATENCY_HISTORY,
+default: llm_latency_history.json in the repository root), since each run makes
+only a few requests. Hedging waits for MIN_SAMPLES latencies before it starts.
+
+Settings (environment variables):
+  LLM_HEDGE_PERCENTILE    latency percentile after which to hedge (default: 90)
+  LLM_HEDGE_MAX_FRACTION  maximum share of recent requests hedged (default: 0.1)
+  LLM_HEDGE_DELAY         fixed hedge delay in seconds, instead of the percentile
+"""
+
+import os
+import sys
+import json
+import time
+import fcntl
+import asyncio
+
+import numpy as np
+from openai import AsyncOpenAI
+
+# Add the parent directory to the path to import the module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Import after adding to path
+from src.utils import PROJECT_ROOT, write_text_atomic
+from src.metrics import LLM_HEDGES
+
+DEFAULT_HISTORY_PATH = os.getenv("LLM_LATENCY_HISTORY", os.path.join(PROJECT_ROOT, "llm_latency_history.json"))
+HISTORY_SIZE = 200
+MIN_SAMPLES = 20
+DEFAULT_PERCENTILE = 90
+DEFAULT_MAX_HEDGE_FRACTION = 0.1
+
+
+class LatencyHistory:
+    """
+    The most recent request latencies, and whether each request was hedged, persisted across runs.
+    """
+
+    def __init__(self, path=DEFAULT_HISTORY_PATH, size=HISTORY_SIZE):
+        """
+        Args:
+            path: JSON file holding the samples, or None to keep them in memory only
+            size: Number of samples kept
+        """
+        self.path = path
+        self.size = size
+        self.samples = self._read() if path else []
+
+    def _read(self):
+        try:
+            with open(self.path) as f:
+                return [(float(latency), bool(hedged)) for latency, hedged in json.load(f)][-self.size:]
+        except FileNotFoundError:
+            return []
+        except (OSError, ValueError, TypeError) as e:
+            print(f"Warning: Ignoring unreadable latency history {self.path}: {e}")
+            return []
+
+    def percentile(self, percentile):
+        """
+        Get a latency percentile in seconds, or None if there are fewer than MIN_SAMPLES samples.
+        """
+        if len(self.samples) < MIN_SAMPLES:
+            return None
+        return float(np.percentile([latency for latency, _ in self.samples], percentile))
+
+    def hedged_fraction(self):
+        """
+        Get the share of the recorded requests that were hedged.
+        """
+        if not self.samples:
+            return 0.0
+        return sum(hedged for _, hedged in self.samples) / len(self.samples)
+
+    def record(self, latency, hedged):
+        """
+        Add a sample, merging it with the samples other runs saved meanwhile.
+
+        Args:
+            latency: Seconds until the answer that was used arrived
+            hedged: True if a second request was sent
+        """
+        if not self.path:
+            self.samples = (self.samples + [(latency, hedged)])[-self.size:]
+            return
+
+        lock_path = self.path + ".lock"
+        try:
+            with open(lock_path, "w") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    self.samples = (self._read() + [(latency, hedged)])[-self.size:]
+                    write_text_atomic(self.path, json.dumps([[round(l, 4), h] for l, h in self.samples]))
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+        except OSError as e:
+            print(f"Warning: Could not save latency history to {self.path}: {e}")
+
+
+class HedgePolicy:
+    """
+    Decides when to send a second request.
+    """
+
+    def __init__(self, percentile=DEFAULT_PERCENTILE, max_hedge_fraction=DEFAULT_MAX_HEDGE_FRACTION,
+                 delay=None, history=None):
+        """
+        Args:
+            percentile: Hedge once a request takes longer than this percentile of recent latencies
+            max_hedge_fraction: Maximum share of recent requests that may be hedged
+            delay: Fixed hedge delay in seconds, used instead of the percentile
+            history: LatencyHistory (default: the shared history file)
+        """
+        self.percentile = percentile
+        self.max_hedge_fraction = max_hedge_fraction
+        self.fixed_delay = delay
+        self.history = history if history is not None else LatencyHistory()
+
+    @classmethod
+    def from_env(cls):
+        """
+        Build the policy from the LLM_HEDGE_* environment variables.
+        """
+        delay = os.getenv("LLM_HEDGE_DELAY")
+        return cls(
+            percentile=float(os.getenv("LLM_HEDGE_PERCENTILE", DEFAULT_PERCENTILE)),
+            max_hedge_fraction=float(os.getenv("LLM_HEDGE_MAX_FRACTION", DEFAULT_MAX_HEDGE_FRACTION)),
+            delay=float(delay) if delay else None
+        )
+
+    def delay(self):
+        """
+        Get the seconds to wait before hedging, or None if this request must not be hedged.
+        """
+        if self.history.hedged_fraction() >= self.max_hedge_fraction:
+            LLM_HEDGES.inc(outcome="over_budget")
+            return None
+        if self.fixed_delay is not None:
+            return self.fixed_delay
+        return self.history.percentile(self.percentile)
+
+
+async def _first_answer(client, request, delay):
+    """
+    Send a request, and a second one if the first takes longer than `delay`.
+
+    Returns:
+        Tuple of (response, True if the second request was sent, True if it answered first)
+    """
+    primary = asyncio.ensure_future(client.chat.completions.create(**request))
+    if delay is None:
+        return await primary, False, False
+
+    done, _ = await asyncio.wait({primary}, timeout=delay)
+    if done:
+        return primary.result(), False, False
+
+    hedge = asyncio.ensure_future(client.chat.completions.create(**request))
+    pending = {primary, hedge}
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            # A failed request only counts if the other one fails too
+            for task in done:
+                if task.exception() is None:
+                    return task.result(), True, task is hedge
+        # Both failed: raise the first request's error
+        return primary.result(), True, False
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+
+def hedged_chat_completion(client, policy, **request):
+    """
+    Create a chat completion, hedging it according to a policy.
+
+    Args:
+        client: OpenAI client; its API key, base URL, timeout and retry settings are reused
+        policy: HedgePolicy
+        **request: Arguments of client.chat.completions.create
+
+    Returns:
+        The chat completion response that arrived first
+    """
+    delay = policy.delay()
+
+    async def run():
+        async with AsyncOpenAI(api_key=client.api_key, organization=client.organization, base_url=client.base_url,
+                               timeout=client.timeout, max_retries=client.max_retries) as async_client:
+            return await _first_answer(async_client, request, delay)
+
+    start = time.perf_counter()
+    response, hedged, hedge_won = asyncio.run(run())
+    if hedged:
+        LLM_HEDGES.inc(outcome="hedge_won" if hedge_won else "primary_won")
+    policy.history.record(time.perf_counter() - start, hedged)
+    return response
@@ -0,0 +1,408 @@
+"""
+Publish a post to several LinkedIn identities at once.
+
+Accounts (a company page, organizer profiles, the community page, ...) are read
+from a JSON file, LINKEDIN_ACCOUNTS (default: linkedin_accounts.json in the
+repository root):
+
+  [
+    {"name": "company", "author": "urn:li:organization:123", "token_env": "COMPANY_ACCESS_TOKEN"},
+    {"name": "organizer", "author": "urn:li:person:abc", "token_env": "ACCESS_TOKEN",
+     "template": "{post}\\n\\nShared from the Sundai organizer team.", "rate_per_minute": 2}
+  ]
+
+Without the file, the single ACCESS_TOKEN/PERSON_URN account is used. Tokens are
+read from the named environment variables so the file holds no secrets.
+
+Posts go out concurrently over one pooled HTTP session. Each account has a token
+bucket, so repeated publishes from one process respect its rate limit, and 429
+responses are retried after their Retry-After delay. Set LINKEDIN_API_BASE to
+point the publisher at a local stub (see stub_servers.py).
+
+Usage:
+  python linkedin_publisher.py --file ../linkedin_post_2025_08_25.txt
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from dotenv import load_dotenv
+
+# Add the parent directory to the path to import the module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Import after adding to path
+from src.utils import PROJECT_ROOT
+from src.metrics import PUBLISH_RESPONSES
+
+load_dotenv()
+
+LINKEDIN_API_BASE = os.getenv("LINKEDIN_API_BASE", "https://api.linkedin.com")
+DEFAULT_ACCOUNTS_PATH = os.getenv("LINKEDIN_ACCOUNTS", os.path.join(PROJECT_ROOT, "linkedin_accounts.json"))
+
+DEFAULT_TIMEOUT = 30
+DEFAULT_RATE_PER_MINUTE = 10
+DEFAULT_BURST = 3
+MAX_RETRY_AFTER = 60
+
+
+def build_post_data(author, text):
+    """
+    Build the ugcPosts request body for a public text post.
+
+    Args:
+        author: Author URN (urn:li:person:... or urn:li:organization:...)
+        text: Post text
+
+    Returns:
+        Dictionary to send as the JSON body
+    """
+    return {
+        "author": author,
+        "lifecycleState": "PUBLISHED",
+        "specificContent": {
+            "com.linkedin.ugc.ShareContent": {
+                "shareCommentary": {
+                    "text": text
+                },
+                "shareMediaCategory": "NONE"
+            }
+        },
+        "visibility": {
+            "com.linkedin.ugc.MemberNetworkVisibility": "PUBLIC"
+        }
+    }
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: `capacity` requests at once, refilled at `rate` per second.
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout=None):
+        """
+        Take one token, waiting for a refill if the bucket is empty.
+
+        Args:
+            timeout: Maximum seconds to wait, or None to wait as long as needed
+
+        Returns:
+            bool: True if a token was taken, False if the timeout ran out first
+        """
+        give_up_at = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return True
+                wait = (1 - self.tokens) / self.rate
+            if give_up_at is not None and now + wait > give_up_at:
+                return False
+            time.sleep(wait)
+
+
+# One bucket per author URN, shared by every publisher in the process
+_buckets = {}
+_buckets_lock = threading.Lock()
+
+
+def _bucket_for(account):
+    with _buckets_lock:
+        bucket = _buckets.get(account.author)
+        if bucket is None:
+            bucket = TokenBucket(account.rate_per_minute / 60.0, account.burst)
+            _buckets[account.author] = bucket
+        return bucket
+
+
+class Account:
+    """
+    A LinkedIn identity to publish as.
+    """
+
+    def __init__(self, name, author, access_token, template=None,
+                 rate_per_minute=DEFAULT_RATE_PER_MINUTE, burst=DEFAULT_BURST):
+        """
+        Args:
+            name: Short name used in reports
+            author: Author URN
+            access_token: OAuth access token allowed to post as the author
+            template: Optional format string with a {post} field to tailor the text for this account
+            rate_per_minute: Sustained number of posts allowed per minute
+            burst: Number of posts allowed back to back
+        """
+        self.name = name
+        self.author = author
+        self.access_token = access_token
+        self.template = template
+        self.rate_per_minute = rate_per_minute
+        self.burst = burst
+
+    def render(self, post):
+        """
+        Get the text to publish for this account.
+        """
+        return self.template.format(post=post) if self.template else post
+
+
+def load_accounts(path=DEFAULT_ACCOUNTS_PATH):
+    """
+    Load the accounts to publish as.
+
+    Args:
+        path: JSON accounts file; if it does not exist, ACCESS_TOKEN/PERSON_URN are used
+
+    Returns:
+        List of Account (empty if none are configured), or None if the file is invalid
+    """
+    if not os.path.exists(path):
+        access_token = os.getenv('ACCESS_TOKEN')
+        person_urn = os.getenv('PERSON_URN')
+        if not access_token or not person_urn:
+            return []
+        return [Account("default", person_urn, access_token)]
+
+    try:
+        with open(path) as f:
+            entries = json.load(f)
+        accounts = []
+        for entry in entries:
+            accounts.append(Account(
+                entry['name'],
+                entry['author'],
+                entry.get('token') or os.getenv(entry.get('token_env', 'ACCESS_TOKEN')),
+                template=entry.get('template'),
+                rate_per_minute=float(entry.get('rate_per_minute', DEFAULT_RATE_PER_MINUTE)),
+                burst=int(entry.get('burst', DEFAULT_BURST))
+            ))
+        return accounts
+    except (OSError, ValueError, TypeError, KeyError) as e:
+        print(f"Error reading LinkedIn accounts from {path}: {e}")
+        return None
+
+
+class PublishResult:
+    """
+    The outcome of publishing to one account.
+    """
+
+    def __init__(self, account, status=None, post_id=None, error=None, attempts=0, elapsed=0.0):
+        self.account = account
+        self.status = status
+        self.post_id = post_id
+        self.error = error
+        self.attempts = attempts
+        self.elapsed = elapsed
+
+    @property
+    def ok(self):
+        return self.status == 201
+
+    def to_dict(self):
+        return {
+            'account': self.account.name,
+            'author': self.account.author,
+            'status': self.status,
+            'post_id': self.post_id,
+            'error': self.error,
+            'attempts': self.attempts,
+            'elapsed_seconds': round(self.elapsed, 3)
+        }
+
+
+class PublishReport:
+    """
+    Aggregated results of one fan-out, in account order.
+    """
+
+    def __init__(self, results):
+        self.results = results
+
+    @property
+    def succeeded(self):
+        return [result for result in self.results if result.ok]
+
+    @property
+    def failed(self):
+        return [result for result in self.results if not result.ok]
+
+    @property
+    def all_succeeded(self):
+        return bool(self.results) and not self.failed
+
+    def to_dict(self):
+        return {
+            'succeeded': len(self.succeeded),
+            'failed': len(self.failed),
+            'results': [result.to_dict() for result in self.results]
+        }
+
+    def print_summary(self):
+        """
+        Print one line per account and the totals.
+        """
+        for result in self.results:
+            outcome = result.post_id or result.error or ""
+            status = result.status if result.status is not None else "error"
+            print(f"  {result.account.name} ({result.account.author}): {status} {outcome} "
+                  f"[{result.attempts} attempt(s), {result.elapsed:.2f}s]")
+        print(f"Published to {len(self.succeeded)} of {len(self.results)} LinkedIn accounts.")
+
+
+class LinkedInPublisher:
+    """
+    Publishes posts to several accounts concurrently over a shared connection pool.
+    """
+
+    def __init__(self, accounts, api_base=None, timeout=DEFAULT_TIMEOUT, max_workers=8, max_retries=2):
+        """
+        Args:
+            accounts: List of Account
+            api_base: LinkedIn API base URL (default: LINKEDIN_API_BASE)
+            timeout: Seconds allowed per account, including rate-limit waits and retries
+            max_workers: Maximum number of posts in flight at once
+            max_retries: Retries after a 429 response
+        """
+        self.accounts = accounts
+        self.url = f"{(api_base or LINKEDIN_API_BASE).rstrip('/')}/v2/ugcPosts"
+        self.timeout = timeout
+        self.max_workers = max(1, min(max_workers, len(accounts) or 1))
+        self.max_retries = max_retries
+
+        # requests' default pool keeps 10 connections per host; size it to the workers instead
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _publish_one(self, account, text):
+        start = time.monotonic()
+        give_up_at = start + self.timeout
+        result = PublishResult(account)
+
+        if not account.access_token:
+            result.error = "no access token"
+            return result
+
+        headers = {
+            "Authorization": f"Bearer {account.access_token}",
+            "Content-Type": "application/json",
+            "X-Restli-Protocol-Version": "2.0.0"
+        }
+        post_data = build_post_data(account.author, text)
+
+        try:
+            while True:
+                if not _bucket_for(account).acquire(timeout=give_up_at - time.monotonic()):
+                    result.error = "rate limit wait exceeded the timeout"
+                    break
+
+                result.attempts += 1
+                response = self.session.post(self.url, headers=headers, json=post_data,
+                                             timeout=max(0.1, give_up_at - time.monotonic()))
+                result.status = response.status_code
+                PUBLISH_RESPONSES.inc(status=response.status_code)
+
+                if response.status_code == 201:
+                    result.post_id = response.headers.get('x-restli-id') or response.headers.get('location')
+                    result.error = None
+                    break
+
+                result.error = response.text[:200]
+                if response.status_code != 429 or result.attempts > self.max_retries:
+                    break
+                try:
+                    retry_after = min(MAX_RETRY_AFTER, float(response.headers.get('retry-after', 1)))
+                except ValueError:
+                    retry_after = 1.0
+                if time.monotonic() + retry_after >= give_up_at:
+                    break
+                time.sleep(retry_after)
+        except requests.RequestException as e:
+            PUBLISH_RESPONSES.inc(status="error")
+            result.error = str(e)
+
+        result.elapsed = time.monotonic() - start
+        return result
+
+    def publish(self, post, texts=None):
+        """
+        Publish a post to every account concurrently.
+
+        Args:
+            post: Post text (tailored per account by its template)
+            texts: Optional dictionary of account name to text, overriding the post for those accounts
+
+        Returns:
+            PublishReport
+        """
+        texts = texts or {}
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="linkedin-publish") as pool:
+            futures = [
+                pool.submit(self._publish_one, account, texts.get(account.name, account.render(post)))
+                for account in self.accounts
+            ]
+            return PublishReport([future.result() for future in futures])
+
+
+def main():
+    """
+    Command-line interface for publishing a saved post to every configured account.
+    """
+    parser = argparse.ArgumentParser(description='Publish a post to all configured LinkedIn accounts')
+    parser.add_argument('--file', type=str, required=True,
+                        help='File containing the post text')
+    parser.add_argument('--accounts', type=str, default=DEFAULT_ACCOUNTS_PATH,
+                        help='JSON accounts file (default: LINKEDIN_ACCOUNTS or linkedin_accounts.json)')
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT,
+                        help=f'Seconds allowed per account (default: {DEFAULT_TIMEOUT})')
+    parser.add_argument('--json', action='store_true',
+                        help='Print the report as JSON')
+    args = parser.parse_args()
+
+    accounts = load_accounts(args.accounts)
+    if not accounts:
+        print("Error: No LinkedIn accounts configured.")
+        return 1
+
+    with open(args.file) as f:
+        post = f.read()
+
+    with LinkedInPublisher(accounts, timeout=args.timeout) as publisher:
+        report = publisher.publish(post)
+
+    if args.json:
+        print(json.dumps(report.to_dict(), indent=2))
+    else:
+        report.print_summary()
+    return 0 if report.all_succeeded else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,324 @@
+"""
+Offline load test of the post pipeline against the local OpenAI and LinkedIn stubs.
+
+N simulated users each loop over the dates given, generating a post and then
+publishing it, and the run reports throughput and latency percentiles per step.
+Two scenarios are supported:
+
+- pipeline: each user runs main.py --dry-run --force as a subprocess (the real
+  database pull, prompt building and OpenAI client), then publishes the post with
+  LinkedInPublisher. The subprocesses write their posts, manifests, drafts, post
+  index, caches and metrics to a scratch state directory, never the repository.
+- web: each user calls a running web server's /api/generate-post and
+  /api/linkedin-post routes, so the Next.js layer is included.
+
+With --start-stubs the stubs run inside this process and the pipeline
+subprocesses are pointed at them through OPENAI_BASE_URL and LINKEDIN_API_BASE;
+for the web scenario, start the web server with the environment printed by
+stub_servers.py instead (and from a scratch copy of the repository, since the
+web server's main.py writes to its own tree).
+
+Usage:
+  python load_test.py --start-stubs --use-sqlite --users 8 --duration 60 --dates 2025-08-25
+  python load_test.py --scenario web --target http://localhost:3000 --users 16 --iterations 10
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import threading
+import subprocess
+from collections import Counter, defaultdict
+
+import numpy as np
+import requests
+
+# Add the parent directory to the path to import the module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Import after adding to path
+from src.utils import PROJECT_ROOT, parse_date
+from src.linkedin_publisher import Account, LinkedInPublisher
+from src.stub_servers import add_stub_arguments, start_stubs_from_args, stub_environment
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_TARGET = "http://localhost:3000"
+DEFAULT_ITERATIONS = 5
+DEFAULT_DEADLINE = 60
+PERCENTILES = (50, 95, 99)
+# Settings that move every file main.py writes, relative to the state directory
+STATE_PATHS = {
+    "RUN_MANIFEST_DIR": "manifests",
+    "DRAFTS_DIR": "drafts",
+    "POST_INDEX_PATH": "post_index.json",
+    "RESULT_CACHE_DIR": os.path.join("cache", "projects"),
+    "BLURB_CACHE_PATH": os.path.join("cache", "blurbs.json"),
+    "LLM_LATENCY_HISTORY": "llm_latency_history.json",
+    "METRICS_PATH": "metrics.prom",
+    "SLOW_QUERY_LOG": os.path.join("logs", "slow_queries.jsonl"),
+}
+
+
+class LoadStats:
+    """
+    Thread-safe latency and outcome samples per step.
+    """
+
+    def __init__(self):
+        self._latencies = defaultdict(list)
+        self._outcomes = defaultdict(Counter)
+        self._lock = threading.Lock()
+
+    def record(self, step, seconds, outcome):
+        """
+        Record one request.
+
+        Args:
+            step: Step name (e.g. "generate")
+            seconds: Request latency
+            outcome: "ok" or a short description of the failure (e.g. "429", "exit 1")
+        """
+        with self._lock:
+            self._latencies[step].append(seconds)
+            self._outcomes[step][str(outcome)] += 1
+
+    def summary(self, elapsed):
+        """
+        Summarize the samples.
+
+        Args:
+            elapsed: Wall-clock seconds the run took
+
+        Returns:
+            Dictionary of step name to count, outcomes, throughput and latency percentiles (ms)
+        """
+        summary = {}
+        with self._lock:
+            for step, latencies in self._latencies.items():
+                outcomes = self._outcomes[step]
+                milliseconds = np.asarray(latencies) * 1000.0
+                summary[step] = {
+                    'requests': len(latencies),
+                    'ok': outcomes.get("ok", 0),
+                    'errors': {outcome: count for outcome, count in sorted(outcomes.items()) if outcome != "ok"},
+                    'throughput_per_second': round(outcomes.get("ok", 0) / elapsed, 3) if elapsed > 0 else 0.0,
+                    'latency_ms': {
+                        **{f"p{p}": round(float(np.percentile(milliseconds, p)), 1) for p in PERCENTILES},
+                        'max': round(float(milliseconds.max()), 1)
+                    }
+                }
+        return summary
+
+
+def print_report(summary, users, elapsed):
+    """
+    Print one line per step.
+    """
+    print(f"\n{users} users, {elapsed:.1f}s")
+    print(f"{'step':<10} {'requests':>8} {'ok':>6} {'ok/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}  errors")
+    for step, stats in summary.items():
+        latency = stats['latency_ms']
+        errors = ", ".join(f"{outcome}: {count}" for outcome, count in stats['errors'].items()) or "-"
+        print(f"{step:<10} {stats['requests']:>8} {stats['ok']:>6} {stats['throughput_per_second']:>8.2f} "
+              f"{latency['p50']:>9.1f} {latency['p95']:>9.1f} {latency['p99']:>9.1f} {latency['max']:>9.1f}  {errors}")
+
+
+def state_environment(state_dir):
+    """
+    Get the environment variables that point main.py's state files into a scratch directory.
+
+    main.py writes its post and project CSV to the parent of its working directory, so
+    the subprocesses run in <state_dir>/src.
+
+    Args:
+        state_dir: Scratch directory (created if missing)
+
+    Returns:
+        Dictionary of environment variables
+    """
+    os.makedirs(os.path.join(state_dir, "src"), exist_ok=True)
+    return {name: os.path.join(state_dir, path) for name, path in STATE_PATHS.items()}
+
+
+def run_pipeline_iteration(user, date_str, stats, env, deadline, publisher, state_dir):
+    """
+    Generate a post with main.py and publish it, recording both steps.
+    """
+    start = time.monotonic()
+    try:
+        completed = subprocess.run(
+            [sys.executable, os.path.join(SRC_DIR, "main.py"), "--date", date_str, "--dry-run", "--force",
+             "--deadline", str(deadline)],
+            cwd=os.path.join(state_dir, "src"), env=env, capture_output=True, text=True, timeout=deadline + 30
+        )
+        outcome = "ok" if completed.returncode == 0 else f"exit {completed.returncode}"
+    except subprocess.TimeoutExpired:
+        outcome = "timeout"
+    stats.record("generate", time.monotonic() - start, outcome)
+    if outcome != "ok":
+        return
+
+    post_file = os.path.join(state_dir, f"linkedin_post_{date_str.replace('-', '_')}.txt")
+    try:
+        with open(post_file) as f:
+            post = f.read()
+    except OSError:
+        stats.record("publish", 0.0, "no post")
+        return
+
+    start = time.monotonic()
+    result = publisher.publish(post).results[0]
+    stats.record("publish", time.monotonic() - start, "ok" if result.ok else (result.status or "error"))
+
+
+def run_web_iteration(session, target, date_str, stats, deadline):
+    """
+    Generate and publish a post through the web API, recording both steps.
+    """
+    start = time.monotonic()
+    try:
+        response = session.post(f"{target}/api/generate-post", json={'date': date_str}, timeout=deadline + 30)
+        body = response.json() if response.ok else {}
+        post = body.get('generatedPost')
+        outcome = "ok" if post else response.status_code
+    except (requests.RequestException, ValueError) as e:
+        body, post, outcome = {}, None, type(e).__name__
+    stats.record("generate", time.monotonic() - start, outcome)
+    if not post:
+        return
+
+    start = time.monotonic()
+    try:
+        response = session.post(f"{target}/api/linkedin-post", json={'text': post, 'postKey': body.get('postKey')},
+                                timeout=60)
+        outcome = "ok" if response.ok else response.status_code
+    except requests.RequestException as e:
+        outcome = type(e).__name__
+    stats.record("publish", time.monotonic() - start, outcome)
+
+
+def run_user(user, args, stats, env, stop_at, state_dir):
+    """
+    Loop one simulated user over the dates until its iterations or the duration run out.
+    """
+    session = requests.Session() if args.scenario == "web" else None
+    # Each user posts as its own author, so the publisher's per-author rate limit does not serialize the users
+    account = Account(f"user-{user}", f"urn:li:person:load-test-{user}", env.get("ACCESS_TOKEN") or "stub",
+                      rate_per_minute=60000, burst=1000)
+    publisher = LinkedInPublisher([account], api_base=env.get("LINKEDIN_API_BASE"))
+
+    try:
+        iteration = 0
+        while (args.iterations is None or iteration < args.iterations) and (stop_at is None or time.monotonic() < stop_at):
+            date_str = args.dates[(user + iteration) % len(args.dates)]
+            if args.scenario == "web":
+                run_web_iteration(session, args.target.rstrip('/'), date_str, stats, args.deadline)
+            else:
+                run_pipeline_iteration(user, date_str, stats, env, args.deadline, publisher, state_dir)
+            iteration += 1
+    finally:
+        publisher.close()
+        if session is not None:
+            session.close()
+
+
+def main():
+    """
+    Command-line interface for running the load test.
+    """
+    parser = argparse.ArgumentParser(description='Load test post generation and publishing against local stubs')
+    parser.add_argument('--scenario', choices=('pipeline', 'web'), default='pipeline',
+                        help='Drive main.py directly or a running web server (default: pipeline)')
+    parser.add_argument('--users', type=int, default=4,
+                        help='Number of concurrent users (default: 4)')
+    parser.add_argument('--iterations', type=int, default=None,
+                        help=f'Posts per user (default: {DEFAULT_ITERATIONS} unless --duration is given)')
+    parser.add_argument('--duration', type=float, default=None,
+                        help='Stop starting new posts after this many seconds')
+    parser.add_argument('--dates', type=str, nargs='+', default=[time.strftime("%Y-%m-%d")],
+                        help='Dates to generate posts for, spread over the users (default: today)')
+    parser.add_argument('--target', type=str, default=DEFAULT_TARGET,
+                        help=f'Web server for the web scenario (default: {DEFAULT_TARGET})')
+    parser.add_argument('--deadline', type=float, default=DEFAULT_DEADLINE,
+                        help=f'Latency budget passed to main.py, in seconds (default: {DEFAULT_DEADLINE})')
+    parser.add_argument('--use-sqlite', action='store_true',
+                        help='Use SQLite instead of PostgreSQL in the pipeline scenario')
+    parser.add_argument('--sqlite-path', type=str, default=os.path.join(PROJECT_ROOT, 'hackathon_projects.db'),
+                        help='Path to SQLite database file')
+    parser.add_argument('--state-dir', type=str, default=None,
+                        help='Directory for the pipeline scenario\'s posts, manifests, drafts and caches '
+                             '(default: a temporary directory removed afterwards)')
+    parser.add_argument('--start-stubs', action='store_true',
+                        help='Run the OpenAI and LinkedIn stubs in this process and point the pipeline at them')
+    parser.add_argument('--json', action='store_true',
+                        help='Print the report as JSON')
+    add_stub_arguments(parser)
+    args = parser.parse_args()
+
+    for date_str in args.dates:
+        if not parse_date(date_str):
+            print(f"Error: Invalid date format '{date_str}'. Please use YYYY-MM-DD.")
+            return 1
+    if args.iterations is None and args.duration is None:
+        args.iterations = DEFAULT_ITERATIONS
+
+    env = dict(os.environ)
+    if args.use_sqlite:
+        env["USE_SQLITE"] = "true"
+        env["SQLITE_PATH"] = os.path.abspath(args.sqlite_path)
+
+    servers = ()
+    if args.start_stubs:
+        servers = start_stubs_from_args(args)
+        env.update(stub_environment(*servers))
+        print(f"OpenAI stub at {env['OPENAI_BASE_URL']}, LinkedIn stub at {env['LINKEDIN_API_BASE']}")
+    elif args.scenario == "pipeline" and not (env.get("OPENAI_BASE_URL") and env.get("LINKEDIN_API_BASE")):
+        # Never load test the real APIs by accident
+        print("Error: Use --start-stubs or set OPENAI_BASE_URL and LINKEDIN_API_BASE to running stubs.")
+        return 1
+    if args.scenario == "web" and args.start_stubs:
+        print("Note: the web server only uses the stubs if it was started with their environment.")
+
+    # Never let load-test runs overwrite the repository's posts or the state later real runs reuse
+    state_dir = None
+    if args.scenario == "pipeline":
+        state_dir = os.path.abspath(args.state_dir or tempfile.mkdtemp(prefix="load_test_"))
+        if os.path.realpath(state_dir) == os.path.realpath(PROJECT_ROOT):
+            print("Error: --state-dir must not be the repository root.")
+            return 1
+        env.update(state_environment(state_dir))
+        print(f"Pipeline state in {state_dir}")
+
+    stats = LoadStats()
+    start = time.monotonic()
+    stop_at = start + args.duration if args.duration else None
+    threads = [
+        threading.Thread(target=run_user, args=(user, args, stats, env, stop_at, state_dir),
+                         name=f"load-user-{user}")
+        for user in range(args.users)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - start
+
+    summary = stats.summary(elapsed)
+    for server in servers:
+        server.shutdown()
+    if state_dir and not args.state_dir:
+        shutil.rmtree(state_dir, ignore_errors=True)
+
+    if args.json:
+        print(json.dumps({'users': args.users, 'elapsed_seconds': round(elapsed, 3), 'steps': summary}, indent=2))
+    else:
+        print_report(summary, args.users, elapsed)
+    return 0 if summary and all(not stats['errors'] for stats in summary.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,16 +1,100 @@
 #!/usr/bin/env python3
 import os
+import re
 import sys
 import argparse
 from datetime import datetime
-import requests
 from dotenv import load_dotenv
 from openai import OpenAI
 
 # Import our modules - updated paths for src directory
-from data_pull import get_projects_by_date, save_projects_to_csv
-from project_summary import generate_linkedin_post
-import post_to_linkedin as linkedin_poster
+from data_pull import (get_projects_by_date, get_date_fingerprint, search_projects, get_period_digest,
+                       deduplicate_projects, save_projects_to_csv)
+from project_summary import PROMPT_VERSION, generate_distinct_linkedin_post
+from utils import PERIODS, period_range, write_text_atomic
+from deadline import Deadline
+from run_manifest import build_fingerprint, load_manifest, save_manifest, remove_manifest, is_up_to_date
+from near_duplicates import PostIndex
+from drafts import save_draft, load_draft
+from linkedin_publisher import LinkedInPublisher, load_accounts
+from hedging import HedgePolicy
+# Imported by package path so main shares the metrics registry with the src.* modules
+from src.metrics import REGISTRY, CACHE_HITS, CACHE_MISSES, LLM_FALLBACKS, flush_metrics
+
+def display_post(linkedin_post):
+    """
+    Print a generated post between separator lines.
+    """
+    print("\n" + "=" * 80)
+    print("GENERATED LINKEDIN POST:")
+    print("=" * 80)
+    print(linkedin_post)
+    print("=" * 80)
+
+# Used when no --deadline is given
+DEFAULT_PUBLISH_TIMEOUT = 30
+
+def publish_post(linkedin_post, post_index, post_key, duplicate_match=None, timeout=None):
+    """
+    Publish a post to every configured LinkedIn account and record it in the near-duplicate index.
+    
+    Args:
+        linkedin_post: Post text
+        post_index: near_duplicates.PostIndex of previous posts
+        post_key: Index key of this post
+        duplicate_match: (key, similarity) of a near-duplicate post, if one was found
+        timeout: Seconds allowed per account for the LinkedIn API calls (default: DEFAULT_PUBLISH_TIMEOUT)
+        
+    Returns:
+        Process exit code (0 if every account published the post)
+    """
+    print("\n=== STEP 3: Posting to LinkedIn ===")
+    
+    if duplicate_match:
+        print("Skipping LinkedIn posting: LinkedIn rejects near-duplicate posts.")
+        return 1
+    
+    # Accounts come from LINKEDIN_ACCOUNTS, or ACCESS_TOKEN/PERSON_URN for a single account
+    accounts = load_accounts()
+    if accounts is None:
+        return 1
+    if not accounts:
+        print("Error: LinkedIn ACCESS_TOKEN or PERSON_URN not set in environment variables.")
+        print("Cannot post to LinkedIn. Use --dry-run to skip posting.")
+        return 1
+    
+    print(f"Publishing to {len(accounts)} LinkedIn account(s)...")
+    with REGISTRY.time_stage("publish"), \
+            LinkedInPublisher(accounts, timeout=timeout or DEFAULT_PUBLISH_TIMEOUT) as publisher:
+        report = publisher.publish(linkedin_post)
+    report.print_summary()
+    
+    if report.succeeded:
+        post_index.add(post_key, linkedin_post, published=True)
+        post_index.save()
+    
+    if report.all_succeeded:
+        print("Success! Post published to LinkedIn.")
+        return 0
+    print("Failed to post to some LinkedIn accounts.")
+    return 1
+
+def reuse_saved_post(post_file, dry_run, post_index, post_key, publish_timeout=None):
+    """
+    Display a previously saved post and publish it unless this is a dry run.
+    
+    Returns:
+        Process exit code (0 on success)
+    """
+    with open(post_file) as f:
+        linkedin_post = f.read()
+    display_post(linkedin_post)
+    
+    if dry_run:
+        print("\nDry run mode: Skipping LinkedIn posting")
+        return 0
+    return publish_post(linkedin_post, post_index, post_key,
+                        post_index.find_duplicate(linkedin_post, exclude_key=post_key), timeout=publish_timeout)
 
 def main():
     """
@@ -36,8 +120,33 @@ def main():
                         help='Use SQLite database instead of PostgreSQL')
     parser.add_argument('--sqlite-path', type=str, default='../hackathon_projects.db',
                         help='Path to SQLite database file (default: ../hackathon_projects.db)')
+    parser.add_argument('--search', type=str, default=None,
+                        help='Generate a themed post from projects matching this full-text query instead of a single date')
+    parser.add_argument('--start-date', type=str, default=None,
+                        help='With --search, only include projects created on or after this date (YYYY-MM-DD)')
+    parser.add_argument('--end-date', type=str, default=None,
+                        help='With --search, only include projects created on or before this date (YYYY-MM-DD)')
+    parser.add_argument('--period', choices=PERIODS, default=None,
+                        help='Generate a digest of the calendar week (Monday to Sunday) or month containing --date '
+                             'instead of a single day')
+    parser.add_argument('--force', action='store_true',
+                        help="Regenerate the post even if the date's projects, prompt and model are unchanged")
+    parser.add_argument('--deadline', type=float, default=None,
+                        help='Total time budget in seconds; stages get timeouts from it and degrade to the '
+                             'saved or mock post instead of overrunning it')
+    parser.add_argument('--compress', action='store_true',
+                        help='Compress project descriptions to their key sentences to shorten the prompt')
+    parser.add_argument('--no-themes', action='store_true',
+                        help='List projects in creation order instead of grouping them by theme')
+    parser.add_argument('--hedge', action='store_true', default=os.getenv("LLM_HEDGE", "false").lower() == "true",
+                        help='Send a second OpenAI request when the first is slower than usual, using whichever '
+                             'answers first (default: LLM_HEDGE)')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Compose the post from cached per-project blurbs, writing blurbs only for new projects')
     args = parser.parse_args()
     
+    deadline = Deadline(args.deadline)
+    
     # Set environment variables based on command line arguments
     if args.use_sqlite:
         os.environ["USE_SQLITE"] = "true"
@@ -47,31 +156,38 @@ def main():
     date_str = args.date or datetime.now().strftime("%Y-%m-%d")
     
     try:
-        # Validate date format
-        datetime.strptime(date_str, "%Y-%m-%d")
+        # Validate date formats
+        for value in (date_str, args.start_date, args.end_date):
+            if value is not None:
+                datetime.strptime(value, "%Y-%m-%d")
     except ValueError:
-        print(f"Error: Invalid date format '{date_str}'. Please use YYYY-MM-DD format.")
+        print(f"Error: Invalid date format '{value}'. Please use YYYY-MM-DD format.")
         return 1
     
-    print(f"Starting workflow for projects created on {date_str}...")
-    
-    # Step 1: Pull project data from database
-    print("\n=== STEP 1: Pulling project data ===")
-    projects_df = get_projects_by_date(date_str)
-    
-    if projects_df is None or projects_df.empty:
-        print("No projects found for the specified date. Exiting.")
+    if args.search and args.period:
+        print("Error: Use either --search or --period, not both.")
         return 1
+    # Themed posts and digests cover several days, so the per-date manifest and draft do not apply
+    single_date = not (args.search or args.period)
     
-    print(f"Found {len(projects_df)} projects for {date_str}")
-    
-    # Save project data to CSV for reference
-    csv_path = save_projects_to_csv(projects_df, date_str)
-    if csv_path:
-        print(f"Project data saved to {csv_path}")
-    
-    # Step 2: Generate LinkedIn post
-    print("\n=== STEP 2: Generating LinkedIn post ===")
+    if args.search:
+        # Themed posts are described by their optional date range rather than a single day
+        if args.start_date and args.end_date:
+            date_str = f"created from {args.start_date} to {args.end_date}"
+        elif args.start_date or args.end_date:
+            date_str = f"created on or {'after' if args.start_date else 'before'} {args.start_date or args.end_date}"
+        else:
+            date_str = ""
+        file_label = re.sub(r'[^a-z0-9]+', '_', args.search.lower()).strip('_') or "search"
+        print(f"Starting workflow for projects matching '{args.search}'{' ' + date_str if date_str else ''}...")
+    elif args.period:
+        start_date, end_date = period_range(date_str, args.period)
+        date_str = f"{start_date} to {end_date}"
+        file_label = f"{args.period}_{start_date.replace('-', '_')}"
+        print(f"Starting workflow for the {args.period}ly digest of projects created from {start_date} to {end_date}...")
+    else:
+        file_label = date_str.replace("-", "_")
+        print(f"Starting workflow for projects created on {date_str}...")
     
     # Initialize OpenAI client if not in mock mode
     client = None
@@ -81,87 +197,141 @@ def main():
         if not OPENAI_API_KEY:
             print("Warning: OPENAI_API_KEY environment variable not set.")
             print("Falling back to mock mode. To use the OpenAI API, set the OPENAI_API_KEY environment variable.")
+            LLM_FALLBACKS.inc(reason="no_api_key")
             args.mock = True
         else:
             # Initialize OpenAI client
             client = OpenAI(api_key=OPENAI_API_KEY)
     
-    # Generate the LinkedIn post
-    linkedin_post = generate_linkedin_post(client, projects_df, date_str, args.max_projects, mock=args.mock)
+    post_key = f"linkedin_post_{file_label}"
+    post_index = PostIndex.load()
+    
+    # Reuse the last run's artifacts when the date's projects, prompt and model are unchanged
+    fingerprint = None
+    if single_date:
+        with REGISTRY.time_stage("fingerprint"):
+            data_fingerprint = get_date_fingerprint(date_str, timeout=deadline.stage_budget(0.1))
+        if data_fingerprint:
+            model = "mock" if args.mock else os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+            options = {'max_projects': args.max_projects}
+            if args.compress:
+                options['compress'] = True
+            if args.no_themes:
+                options['themes'] = False
+            if args.incremental:
+                options['incremental'] = True
+            fingerprint = build_fingerprint(data_fingerprint, PROMPT_VERSION, model, **options)
+        
+        manifest = load_manifest(file_label)
+        if not args.force and is_up_to_date(manifest, fingerprint):
+            CACHE_HITS.inc(cache="run_manifest")
+            print("Projects, prompt and model are unchanged since the last run; reusing its post.")
+            post_file = manifest['artifacts']['post']
+            draft = load_draft(date_str)
+            if not draft or draft.get('data_fingerprint') != data_fingerprint:
+                with open(post_file) as f:
+                    save_draft(date_str, f.read(), data_fingerprint)
+            return reuse_saved_post(post_file, args.dry_run, post_index, post_key, deadline.stage_budget(1.0))
+        CACHE_MISSES.inc(cache="run_manifest")
+    
+    # Step 1: Pull project data from database
+    print("\n=== STEP 1: Pulling project data ===")
+    digest = None
+    with REGISTRY.time_stage("pull"):
+        if args.search:
+            projects_df = search_projects(args.search, (args.start_date, args.end_date), limit=args.max_projects)
+        elif args.period:
+            # Aggregated in SQL; only the highlighted projects' rows are fetched
+            digest = get_period_digest(start_date, end_date, args.max_projects, timeout=deadline.stage_budget(0.3))
+            projects_df = digest['highlights'] if digest else None
+        else:
+            # Checked against the fingerprint, so a cached pull is only reused for unchanged data
+            projects_df = get_projects_by_date(date_str, timeout=deadline.stage_budget(0.3),
+                                               data_fingerprint=data_fingerprint)
+    
+    output_file = f"../linkedin_post_{file_label}.txt"
+    if projects_df is None or projects_df.empty:
+        # Under a deadline, a failed or timed-out pull serves the last saved post instead
+        pull_failed = fingerprint is None or fingerprint['row_count'] > 0
+        if args.deadline and single_date and pull_failed and os.path.exists(output_file):
+            print("Project pull failed within the deadline; serving the previously saved post.")
+            return reuse_saved_post(output_file, args.dry_run, post_index, post_key, deadline.stage_budget(1.0))
+        print("No projects found for the specified date, search or period. Exiting.")
+        return 1
+    
+    if not args.search:
+        # search_projects reports its own matches
+        print(f"Found {len(projects_df)} projects for {date_str}")
+    
+    # Collapse resubmissions so they don't use up prompt slots
+    projects_df, _ = deduplicate_projects(projects_df)
+    
+    # Save project data to CSV for reference
+    csv_path = save_projects_to_csv(projects_df, output_file=f"../projects_{file_label}.csv")
+    if csv_path:
+        print(f"Project data saved to {csv_path}")
+    
+    # Step 2: Generate LinkedIn post
+    print("\n=== STEP 2: Generating LinkedIn post ===")
+    
+    # Generate the LinkedIn post, regenerating near-duplicates of earlier posts
+    run_stats = {}
+    if deadline.expired() and not args.mock:
+        print("Deadline reached before generation; falling back to the saved or mock post.")
+        LLM_FALLBACKS.inc(reason="deadline")
+        run_stats['fallback'] = True
+    with REGISTRY.time_stage("generate"):
+        linkedin_post, duplicate_match = generate_distinct_linkedin_post(
+            client, projects_df, date_str, post_index, post_key,
+            args.max_projects, mock=args.mock or deadline.expired(), theme=args.search, run_stats=run_stats,
+            deadline=deadline, compress=args.compress, group_themes=not args.no_themes,
+            hedge=HedgePolicy.from_env() if args.hedge else None, incremental=args.incremental, digest=digest
+        )
+    # The mock fallback never replaces a saved post, which the last manifest may still point to
+    if run_stats.get('fallback') and single_date and os.path.exists(output_file):
+        print("Serving the previously saved post instead of the mock fallback.")
+        return reuse_saved_post(output_file, args.dry_run, post_index, post_key, deadline.stage_budget(1.0))
+    if run_stats.get('prompt_tokens'):
+        print(f"Token usage: {run_stats['prompt_tokens']} prompt ({run_stats['cached_tokens']} cached) + "
+              f"{run_stats['completion_tokens']} completion (~${run_stats['cost_usd']:.4f})")
     
     # Display the generated post
-    print("\n" + "=" * 80)
-    print("GENERATED LINKEDIN POST:")
-    print("=" * 80)
-    print(linkedin_post)
-    print("=" * 80)
+    display_post(linkedin_post)
     
     # Save the post to a file
-    filename_date = date_str.replace("-", "_")
-    output_file = f"../linkedin_post_{filename_date}.txt"
-    
-    with open(output_file, 'w') as f:
-        f.write(linkedin_post)
+    write_text_atomic(output_file, linkedin_post)
     
     print(f"\nLinkedIn post saved to {output_file}")
     
+    post_index.add(post_key, linkedin_post)
+    post_index.save()
+    
+    # Keep the web UI's draft current; a fallback post is saved without a fingerprint so it is retried
+    if single_date:
+        save_draft(date_str, linkedin_post, None if run_stats.get('fallback') else data_fingerprint)
+    
+    # A post from the mock fallback is not what any fingerprint asks for, so don't reuse it
+    if run_stats.get('fallback'):
+        if single_date:
+            remove_manifest(file_label)
+    elif fingerprint:
+        save_manifest(file_label, fingerprint, {'post': output_file, 'csv': csv_path})
+    
+    if duplicate_match:
+        print(f"Warning: Post is still {duplicate_match[1]:.0%} similar to {duplicate_match[0]} after regenerating.")
+    
     # Step 3: Post to LinkedIn
-    if not args.dry_run:
-        print("\n=== STEP 3: Posting to LinkedIn ===")
-        
-        # Check for required environment variables
-        access_token = os.getenv('ACCESS_TOKEN')
-        person_urn = os.getenv('PERSON_URN')
-        
-        if not access_token or not person_urn:
-            print("Error: LinkedIn ACCESS_TOKEN or PERSON_URN not set in environment variables.")
-            print("Cannot post to LinkedIn. Use --dry-run to skip posting.")
-            return 1
-        
-        # Prepare post data
-        post_data = {
-            "author": person_urn,
-            "lifecycleState": "PUBLISHED",
-            "specificContent": {
-                "com.linkedin.ugc.ShareContent": {
-                    "shareCommentary": {
-                        "text": linkedin_post
-                    },
-                    "shareMediaCategory": "NONE"
-                }
-            },
-            "visibility": {
-                "com.linkedin.ugc.MemberNetworkVisibility": "PUBLIC"
-            }
-        }
-        
-        # Post to LinkedIn
-        url = "https://api.linkedin.com/v2/ugcPosts"
-        headers = {
-            "Authorization": f"Bearer {access_token}",
-            "Content-Type": "application/json",
-            "X-Restli-Protocol-Version": "2.0.0"
-        }
-        
-        try:
-            response = requests.post(url, headers=headers, json=post_data)
-            print(f"LinkedIn API Status: {response.status_code}")
-            
-            if response.status_code == 201:
-                print("Success! Post published to LinkedIn.")
-                print(f"Response: {response.text}")
-                return 0
-            else:
-                print(f"Failed to post to LinkedIn. Status code: {response.status_code}")
-                print(f"Response: {response.text}")
-                return 1
-                
-        except Exception as e:
-            print(f"Error posting to LinkedIn: {e}")
-            return 1
-    else:
+    if args.dry_run:
         print("\nDry run mode: Skipping LinkedIn posting")
         return 0
+    
+    return publish_post(linkedin_post, post_index, post_key, duplicate_match, timeout=deadline.stage_budget(1.0))
 
 if __name__ == "__main__":
-    sys.exit(main())
+    try:
+        with REGISTRY.time_stage("total"):
+            exit_code = main()
+    finally:
+        # Add this run to the cumulative metrics, even if it failed
+        flush_metrics()
+    sys.exit(exit_code)
@@ -0,0 +1,381 @@
+"""
+Cumulative pipeline metrics in Prometheus text format.
+
+Each process records counters and histograms in memory; flush_metrics() merges
+them into a persisted state file (so totals accumulate across runs) and rewrites
+the Prometheus exposition file. The file can be scraped through a node_exporter
+textfile collector or served directly:
+  python metrics.py --serve --port 9464
+"""
+
+import os
+import sys
+import json
+import time
+import fcntl
+import argparse
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add the parent directory to the path to import the module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Import after adding to path
+from src.utils import PROJECT_ROOT, write_text_atomic
+
+DEFAULT_METRICS_PATH = os.getenv("METRICS_PATH", os.path.join(PROJECT_ROOT, "metrics.prom"))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# USD per million tokens as (prompt, completion); override with OPENAI_PRICE_PROMPT/OPENAI_PRICE_COMPLETION
+MODEL_PRICES = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1": (2.00, 8.00),
+}
+# Share of the prompt price billed for prompt tokens served from the provider's prompt cache
+CACHED_PROMPT_PRICE_FACTOR = float(os.getenv("OPENAI_CACHED_PRICE_FACTOR", 0.5))
+
+
+def estimate_cost(model, prompt_tokens, completion_tokens, cached_tokens=0):
+    """
+    Estimate the cost of a chat completion in USD.
+
+    Args:
+        model: Model name
+        prompt_tokens: Number of prompt tokens, including cached ones
+        completion_tokens: Number of completion tokens
+        cached_tokens: Number of the prompt tokens served from the prompt cache
+
+    Returns:
+        Estimated cost in USD (0.0 for unknown models without price overrides)
+    """
+    prompt_price, completion_price = MODEL_PRICES.get(model, (0.0, 0.0))
+    prompt_price = float(os.getenv("OPENAI_PRICE_PROMPT", prompt_price))
+    completion_price = float(os.getenv("OPENAI_PRICE_COMPLETION", completion_price))
+    billed_prompt_tokens = prompt_tokens - cached_tokens + cached_tokens * CACHED_PROMPT_PRICE_FACTOR
+    return (billed_prompt_tokens * prompt_price + completion_tokens * completion_price) / 1_000_000
+
+
+class Counter:
+    """
+    A monotonically increasing value per label set.
+    """
+
+    kind = "counter"
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1.0, **labels):
+        """
+        Increase the counter for a label set.
+        """
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            self.values[key] = self.values.get(key, 0.0) + amount
+
+    def merge(self, state):
+        for key, value in state.get("values", []):
+            key = tuple(key)
+            self.values[key] = self.values.get(key, 0.0) + value
+
+    def state(self):
+        return {"values": [[list(key), value] for key, value in self.values.items()]}
+
+    def render(self):
+        lines = []
+        for key, value in sorted(self.values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    """
+    Bucketed distribution of observed values per label set.
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self.values = {}
+        self._lock = threading.Lock()
+
+    def _series(self, key):
+        if key not in self.values:
+            self.values[key] = {"buckets": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+        return self.values[key]
+
+    def observe(self, value, **labels):
+        """
+        Record one observation for a label set.
+        """
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            series = self._series(key)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series["buckets"][i] += 1
+            series["sum"] += value
+            series["count"] += 1
+
+    def merge(self, state):
+        for key, values in state.get("values", []):
+            series = self._series(tuple(key))
+            if len(values["buckets"]) == len(series["buckets"]):
+                series["buckets"] = [a + b for a, b in zip(series["buckets"], values["buckets"])]
+            series["sum"] += values["sum"]
+            series["count"] += values["count"]
+
+    def state(self):
+        return {"values": [[list(key), series] for key, series in self.values.items()]}
+
+    def render(self):
+        lines = []
+        for key, series in sorted(self.values.items()):
+            for bound, count in zip(self.buckets, series["buckets"]):
+                labels = _format_labels(self.labelnames + ("le",), key + (_format_value(bound),))
+                lines.append(f"{self.name}_bucket{labels} {count}")
+            labels = _format_labels(self.labelnames + ("le",), key + ("+Inf",))
+            lines.append(f"{self.name}_bucket{labels} {series['count']}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(series['sum'])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {series['count']}")
+        return lines
+
+
+def _format_labels(names, values):
+    if not names:
+        return ""
+    pairs = []
+    for name, value in zip(names, values):
+        escaped = value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        pairs.append(f'{name}="{escaped}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def _format_value(value):
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class MetricsRegistry:
+    """
+    Collection of metrics recorded by this process.
+    """
+
+    def __init__(self):
+        self.metrics = {}
+        self._lock = threading.Lock()
+
+    def _get(self, cls, name, help_text, labelnames, **kwargs):
+        with self._lock:
+            if name not in self.metrics:
+                self.metrics[name] = cls(name, help_text, labelnames, **kwargs)
+            return self.metrics[name]
+
+    def counter(self, name, help_text, labelnames=()):
+        """
+        Get or create a counter.
+        """
+        return self._get(Counter, name, help_text, labelnames)
+
+    def histogram(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        """
+        Get or create a histogram.
+        """
+        return self._get(Histogram, name, help_text, labelnames, buckets=buckets)
+
+    @contextmanager
+    def time_stage(self, stage):
+        """
+        Time a block of code as a pipeline stage.
+
+        Args:
+            stage: Stage name used as the 'stage' label
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            STAGE_LATENCY.observe(time.perf_counter() - start, stage=stage)
+
+    def render(self):
+        """
+        Render all metrics in Prometheus text exposition format.
+        """
+        lines = []
+        for name in sorted(self.metrics):
+            metric = self.metrics[name]
+            lines.append(f"# HELP {name} {metric.help}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def state(self):
+        return {
+            name: {
+                "kind": metric.kind,
+                "help": metric.help,
+                "labelnames": list(metric.labelnames),
+                **({"buckets": list(metric.buckets)} if metric.kind == "histogram" else {}),
+                **metric.state()
+            }
+            for name, metric in self.metrics.items()
+        }
+
+    def merge_state(self, state):
+        for name, data in state.items():
+            if data["kind"] == "histogram":
+                metric = self.histogram(name, data["help"], data["labelnames"], data.get("buckets", LATENCY_BUCKETS))
+            else:
+                metric = self.counter(name, data["help"], data["labelnames"])
+            metric.merge(data)
+
+    def reset(self):
+        """
+        Clear recorded values, keeping the metric definitions.
+        """
+        with self._lock:
+            for metric in self.metrics.values():
+                with metric._lock:
+                    metric.values = {}
+
+
+REGISTRY = MetricsRegistry()
+
+STAGE_LATENCY = REGISTRY.histogram(
+    "sundai_stage_duration_seconds", "Duration of pipeline stages", ("stage",))
+DB_QUERY_LATENCY = REGISTRY.histogram(
+    "sundai_db_query_duration_seconds", "Duration of database queries", ("query",))
+DB_STATEMENT_LATENCY = REGISTRY.histogram(
+    "sundai_db_statement_duration_seconds", "Duration of statements at the database driver", ("backend",))
+DB_SLOW_QUERIES = REGISTRY.counter(
+    "sundai_db_slow_queries_total", "Statements slower than SLOW_QUERY_SECONDS", ("backend",))
+ROWS_FETCHED = REGISTRY.counter(
+    "sundai_rows_fetched_total", "Project rows fetched from the database", ("query",))
+LLM_LATENCY = REGISTRY.histogram(
+    "sundai_llm_request_duration_seconds", "Duration of chat completion requests", ("model",))
+LLM_CACHE_LATENCY = REGISTRY.histogram(
+    "sundai_llm_request_by_prompt_cache_duration_seconds",
+    "Duration of chat completion requests by whether part of the prompt was served from the provider's cache",
+    ("model", "cache"))
+LLM_TOKENS = REGISTRY.counter(
+    "sundai_llm_tokens_total", "Tokens used by chat completions", ("model", "type"))
+LLM_COST = REGISTRY.counter(
+    "sundai_llm_cost_usd_total", "Estimated cost of chat completions in USD", ("model",))
+LLM_HEDGES = REGISTRY.counter(
+    "sundai_llm_hedges_total", "Hedged chat completions by which request answered first, and hedges skipped",
+    ("outcome",))
+LLM_FALLBACKS = REGISTRY.counter(
+    "sundai_llm_fallbacks_total", "Posts generated by the mock fallback instead of the LLM", ("reason",))
+CACHE_HITS = REGISTRY.counter(
+    "sundai_cache_hits_total", "Work skipped by reusing cached results", ("cache",))
+CACHE_MISSES = REGISTRY.counter(
+    "sundai_cache_misses_total", "Cache lookups that had to do the work", ("cache",))
+PROMPT_FIELD_TOKENS = REGISTRY.counter(
+    "sundai_prompt_field_tokens_total", "Estimated tokens of project text put into prompts, before and after compression",
+    ("stage",))
+PUBLISH_RESPONSES = REGISTRY.counter(
+    "sundai_publish_responses_total", "LinkedIn publish attempts by HTTP status code", ("status",))
+
+
+def flush_metrics(path=DEFAULT_METRICS_PATH, registry=REGISTRY):
+    """
+    Add this process's metrics to the persisted totals and rewrite the Prometheus file.
+
+    The state file is locked while it is updated, so concurrent runs don't lose counts.
+
+    Args:
+        path: Prometheus text file to write; the cumulative state is kept next to it as .json
+        registry: Registry whose values are flushed (and then reset)
+    """
+    state_path = os.path.splitext(path)[0] + ".json"
+    lock_path = state_path + ".lock"
+
+    try:
+        with open(lock_path, "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                totals = MetricsRegistry()
+                if os.path.exists(state_path):
+                    with open(state_path) as f:
+                        totals.merge_state(json.load(f))
+                totals.merge_state(registry.state())
+
+                write_text_atomic(state_path, json.dumps(totals.state()))
+                write_text_atomic(path, totals.render())
+                registry.reset()
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+    except (OSError, ValueError) as e:
+        print(f"Error writing metrics to {path}: {e}")
+
+
+def serve_metrics(port, path=DEFAULT_METRICS_PATH):
+    """
+    Serve the Prometheus text file at http://localhost:PORT/metrics.
+    """
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.rstrip("/") != "/metrics":
+                self.send_error(404)
+                return
+            body = b""
+            if os.path.exists(path):
+                with open(path, "rb") as f:
+                    body = f.read()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), MetricsHandler)
+    print(f"Serving {path} at http://127.0.0.1:{port}/metrics")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def main():
+    """
+    Command-line interface for printing or serving the cumulative metrics.
+    """
+    parser = argparse.ArgumentParser(description='Print or serve cumulative pipeline metrics')
+    parser.add_argument('--serve', action='store_true',
+                        help='Serve the metrics over HTTP instead of printing them')
+    parser.add_argument('--port', type=int, default=9464,
+                        help='Port for --serve (default: 9464)')
+    parser.add_argument('--path', type=str, default=DEFAULT_METRICS_PATH,
+                        help='Prometheus text file (default: metrics.prom in the project root)')
+    args = parser.parse_args()
+
+    if args.serve:
+        serve_metrics(args.port, args.path)
+        return 0
+
+    if not os.path.exists(args.path):
+        print(f"No metrics recorded yet at {args.path}")
+        return 1
+    with open(args.path) as f:
+        print(f.read(), end="")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,370 @@
+"""
+MinHash/LSH near-duplicate detection.
+
+LinkedIn rejects posts that are too similar to earlier ones (HTTP 422), so every
+generated or published post is indexed here and new candidates are checked
+before a publish attempt is spent on them.
+
+Usage:
+  echo "post text" | python near_duplicates.py --check
+  echo "post text" | python near_duplicates.py --add published_post --published
+"""
+
+import os
+import re
+import sys
+import glob
+import json
+import argparse
+import zlib
+import hashlib
+from datetime import datetime
+
+import numpy as np
+
+# Add the parent directory to the path to import the module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Import after adding to path
+from src.utils import PROJECT_ROOT, write_text_atomic
+
+NUM_PERM = 128
+NUM_BANDS = 16  # 16 bands x 8 rows: candidate pairs start at roughly 70% similarity
+SHINGLE_SIZE = 3
+DUPLICATE_THRESHOLD = 0.8
+# Bump when shingle hashing changes: signatures from another version are not comparable.
+# Version 1 (files without a hash_version) hashed shingles with blake2b; version 2 uses crc32.
+HASH_VERSION = 2
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_WORD_PATTERN = re.compile(r"\w+")
+
+DEFAULT_INDEX_PATH = os.getenv("POST_INDEX_PATH", os.path.join(PROJECT_ROOT, "post_index.json"))
+
+
+class MinHasher:
+    """
+    Computes MinHash signatures of word shingles using vectorized universal hashing.
+    """
+
+    def __init__(self, num_perm=NUM_PERM, shingle_size=SHINGLE_SIZE, seed=1):
+        """
+        Initialize the hash permutations.
+
+        Args:
+            num_perm: Number of hash permutations (signature length)
+            shingle_size: Number of consecutive words per shingle
+            seed: Random seed for the permutations (signatures are only comparable for equal seeds)
+        """
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = np.random.default_rng(seed)
+        # a, b < 2**32 and 32-bit shingle hashes keep a * x + b within uint64
+        self._a = rng.integers(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, 1 << 32, size=num_perm, dtype=np.uint64)
+
+    def shingle_hashes(self, text):
+        """
+        Hash the word shingles of a text to 32-bit integers.
+
+        Args:
+            text: Input text
+
+        Returns:
+            1-D uint64 array of distinct shingle hashes
+        """
+        words = _WORD_PATTERN.findall((text or "").lower())
+        if len(words) < self.shingle_size:
+            shingles = {" ".join(words)} if words else set()
+        else:
+            shingles = {
+                " ".join(words[i:i + self.shingle_size])
+                for i in range(len(words) - self.shingle_size + 1)
+            }
+        return np.fromiter(
+            (zlib.crc32(s.encode()) for s in shingles),
+            dtype=np.uint64,
+            count=len(shingles)
+        )
+
+    def signature(self, text):
+        """
+        Compute the MinHash signature of a text.
+
+        Args:
+            text: Input text
+
+        Returns:
+            1-D uint64 array of length num_perm
+        """
+        hashes = self.shingle_hashes(text)
+        if hashes.size == 0:
+            return np.full(self.num_perm, _MAX_HASH, dtype=np.uint64)
+        permuted = (np.outer(hashes, self._a) + self._b) % _MERSENNE_PRIME
+        return np.bitwise_and(permuted, _MAX_HASH).min(axis=0)
+
+
+def estimate_similarity(signature_a, signature_b):
+    """
+    Estimate the Jaccard similarity of two texts from their MinHash signatures.
+
+    Args:
+        signature_a: MinHash signature
+        signature_b: MinHash signature of the same length
+
+    Returns:
+        Estimated similarity between 0.0 and 1.0
+    """
+    return float(np.count_nonzero(signature_a == signature_b)) / len(signature_a)
+
+
+class LSHIndex:
+    """
+    Banded locality-sensitive hashing index over MinHash signatures.
+    """
+
+    def __init__(self, num_perm=NUM_PERM, num_bands=NUM_BANDS):
+        """
+        Initialize an empty index.
+
+        Args:
+            num_perm: Signature length
+            num_bands: Number of bands; must divide num_perm
+        """
+        if num_perm % num_bands:
+            raise ValueError(f"num_bands ({num_bands}) must divide num_perm ({num_perm})")
+        self.num_bands = num_bands
+        self.rows = num_perm // num_bands
+        self._buckets = [{} for _ in range(num_bands)]
+        self.signatures = {}
+
+    def _band_keys(self, signature):
+        return [signature[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.num_bands)]
+
+    def add(self, key, signature):
+        """
+        Add (or replace) a signature under a key.
+
+        Args:
+            key: Identifier for the indexed item
+            signature: MinHash signature
+        """
+        if key in self.signatures:
+            self.remove(key)
+        self.signatures[key] = signature
+        for bucket, band_key in zip(self._buckets, self._band_keys(signature)):
+            bucket.setdefault(band_key, set()).add(key)
+
+    def remove(self, key):
+        """
+        Remove a key from the index if present.
+
+        Args:
+            key: Identifier of the indexed item
+        """
+        signature = self.signatures.pop(key, None)
+        if signature is None:
+            return
+        for bucket, band_key in zip(self._buckets, self._band_keys(signature)):
+            keys = bucket.get(band_key)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del bucket[band_key]
+
+    def query(self, signature, threshold=DUPLICATE_THRESHOLD):
+        """
+        Find indexed items whose estimated similarity meets the threshold.
+
+        Args:
+            signature: MinHash signature to look up
+            threshold: Minimum estimated Jaccard similarity
+
+        Returns:
+            List of (key, similarity) tuples, most similar first
+        """
+        candidates = set()
+        for bucket, band_key in zip(self._buckets, self._band_keys(signature)):
+            candidates.update(bucket.get(band_key, ()))
+
+        matches = []
+        for key in candidates:
+            similarity = estimate_similarity(signature, self.signatures[key])
+            if similarity >= threshold:
+                matches.append((key, similarity))
+        return sorted(matches, key=lambda match: match[1], reverse=True)
+
+
+class PostIndex:
+    """
+    Persistent near-duplicate index over every generated or published LinkedIn post.
+    """
+
+    def __init__(self, path=DEFAULT_INDEX_PATH, threshold=DUPLICATE_THRESHOLD):
+        """
+        Initialize an empty post index.
+
+        Args:
+            path: JSON file the index is persisted to
+            threshold: Minimum estimated similarity for two posts to count as near-duplicates
+        """
+        self.path = path
+        self.threshold = threshold
+        self.hasher = MinHasher()
+        self.lsh = LSHIndex(self.hasher.num_perm)
+        self.entries = {}
+
+    @classmethod
+    def load(cls, path=DEFAULT_INDEX_PATH, threshold=DUPLICATE_THRESHOLD, post_dir=PROJECT_ROOT):
+        """
+        Load the index from disk, also indexing saved linkedin_post_*.txt files it has not seen yet.
+
+        Signatures stored with another HASH_VERSION or signature length are discarded and the
+        index is rebuilt from the saved post files (keeping their published flags).
+
+        Args:
+            path: JSON file the index is persisted to
+            threshold: Minimum estimated similarity for two posts to count as near-duplicates
+            post_dir: Directory containing saved linkedin_post_*.txt files
+
+        Returns:
+            PostIndex instance
+        """
+        index = cls(path, threshold)
+        published_keys = set()
+
+        if os.path.exists(path):
+            try:
+                with open(path) as f:
+                    data = json.load(f)
+                posts = data.get("posts", {})
+                if (data.get("hash_version", 1), data.get("num_perm", NUM_PERM)) != (HASH_VERSION, NUM_PERM):
+                    published_keys = {key for key, entry in posts.items() if entry.get("published")}
+                    print(f"Post index {path} was built with other signatures; rebuilding it from the saved posts.")
+                    posts = {}
+                for key, entry in posts.items():
+                    signature = np.array(entry["signature"], dtype=np.uint64)
+                    index.entries[key] = {
+                        "published": entry.get("published", False),
+                        "updated_at": entry.get("updated_at")
+                    }
+                    index.lsh.add(key, signature)
+            except (OSError, ValueError, KeyError) as e:
+                print(f"Error loading post index from {path}: {e}")
+
+        # Posts saved before the index existed (or by other tools)
+        for post_file in glob.glob(os.path.join(post_dir, "linkedin_post_*.txt")):
+            key = os.path.splitext(os.path.basename(post_file))[0]
+            if key not in index.entries:
+                with open(post_file) as f:
+                    index.add(key, f.read(), published=key in published_keys)
+        if published_keys - set(index.entries):
+            print(f"Warning: {len(published_keys - set(index.entries))} published posts without a saved file "
+                  f"were dropped from the post index.")
+
+        return index
+
+    def add(self, key, text, published=False):
+        """
+        Index a post.
+
+        Args:
+            key: Identifier for the post (e.g. the post file name without extension)
+            text: Post text
+            published: True if the post has been published to LinkedIn
+        """
+        previous = self.entries.get(key, {})
+        self.entries[key] = {
+            "published": published or previous.get("published", False),
+            "updated_at": datetime.now().isoformat(timespec='seconds')
+        }
+        self.lsh.add(key, self.hasher.signature(text))
+
+    def find_duplicate(self, text, exclude_key=None):
+        """
+        Check a candidate post against every indexed post.
+
+        A draft with the same key as the candidate (i.e. an earlier draft for the same
+        date being regenerated) is ignored unless it was published.
+
+        Args:
+            text: Candidate post text
+            exclude_key: Key of the candidate's own draft, if any
+
+        Returns:
+            (key, similarity) of the most similar indexed post, or None if there is no near-duplicate
+        """
+        for key, similarity in self.lsh.query(self.hasher.signature(text), self.threshold):
+            if key == exclude_key and not self.entries[key]["published"]:
+                continue
+            return key, similarity
+        return None
+
+    def save(self):
+        """
+        Persist the index to disk.
+        """
+        posts = {
+            key: {
+                "signature": self.lsh.signatures[key].tolist(),
+                "published": entry["published"],
+                "updated_at": entry["updated_at"]
+            }
+            for key, entry in self.entries.items()
+        }
+        write_text_atomic(self.path, json.dumps({"hash_version": HASH_VERSION, "num_perm": self.hasher.num_perm,
+                                                "posts": posts}))
+
+
+def published_post_key(text):
+    """
+    Build an index key for a post published without a saved draft file (e.g. edited in the web UI).
+
+    Args:
+        text: Post text
+
+    Returns:
+        Index key string
+    """
+    return "published_" + hashlib.sha1(text.encode()).hexdigest()[:12]
+
+
+def main():
+    """
+    Command-line interface used by the web API to check and record posts.
+    """
+    parser = argparse.ArgumentParser(description='Check LinkedIn posts against previously generated or published posts')
+    parser.add_argument('--check', action='store_true',
+                        help='Check the post text read from stdin and print the result as JSON')
+    parser.add_argument('--add', type=str, nargs='?', const='', default=None,
+                        help='Add the post text read from stdin to the index under this key')
+    parser.add_argument('--published', action='store_true',
+                        help='With --add, mark the post as published')
+    parser.add_argument('--exclude-key', type=str, default=None,
+                        help="With --check, ignore this key's unpublished draft")
+    args = parser.parse_args()
+
+    text = sys.stdin.read().strip()
+    if not text:
+        print("Error: No post text provided on stdin.")
+        return 1
+
+    index = PostIndex.load()
+
+    if args.check:
+        match = index.find_duplicate(text, exclude_key=args.exclude_key)
+        if match:
+            print(json.dumps({"duplicate": True, "key": match[0], "similarity": round(match[1], 3)}))
+        else:
+            print(json.dumps({"duplicate": False}))
+
+    if args.add is not None:
+        index.add(args.add or published_post_key(text), text, published=args.published)
+        index.save()
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,39 +2,138 @@
 import { spawn } from 'child_process';
 import path from 'path';
 import fs from 'fs';
+import crypto from 'crypto';
 
-export default async function handler(req, res) {
-  if (req.method !== 'POST') {
-    return res.status(405).json({ error: 'Method not allowed' });
+// Latency budget for one generation; main.py degrades to a saved or mock post within it
+const GENERATE_DEADLINE_SECONDS = Number(process.env.GENERATE_DEADLINE_SECONDS || 60);
+// Extra time before the Python process is killed if it still overruns
+const KILL_GRACE_MS = 5000;
+// Drafts written by main.py (and kept current by scheduler.py)
+const DRAFTS_DIR = process.env.DRAFTS_DIR || path.resolve(process.cwd(), '../drafts');
+// Defaults of main.py's --max-projects and project_summary.py's OPENAI_MODEL
+const DEFAULT_MAX_PROJECTS = 20;
+const OPENAI_MODEL = process.env.OPENAI_MODEL || 'gpt-4o-mini';
+
+// Generations in progress, keyed by their inputs; concurrent requests for the same
+// inputs wait for the running generation instead of starting another main.py
+const inFlight = new Map();
+
+// Key main.py indexes a date's post under in the near-duplicate index (see near_duplicates.py)
+function postKeyFor(date) {
+  return `linkedin_post_${date.replace(/-/g, '_')}`;
+}
+
+// Write a file via a temporary file and a rename, so readers never see a partial post
+function writeFileAtomic(filePath, contents) {
+  const tempPath = `${filePath}.${process.pid}.${Date.now()}.tmp`;
+  try {
+    fs.writeFileSync(tempPath, contents);
+    fs.renameSync(tempPath, filePath);
+  } catch (error) {
+    fs.rmSync(tempPath, { force: true });
+    throw error;
   }
+}
 
-  const { date } = req.body;
+// Recently served drafts, most recently used last, validated against the file's mtime and size
+const DRAFT_CACHE_SIZE = 32;
+const draftCache = new Map();
 
-  if (!date) {
-    return res.status(400).json({ error: 'Date is required' });
+// Load a date's draft response (body and ETag) through the in-process LRU
+function loadDraftResponse(date, draftPath) {
+  const stat = fs.statSync(draftPath);
+  const cached = draftCache.get(draftPath);
+  if (cached && cached.mtimeMs === stat.mtimeMs && cached.size === stat.size) {
+    draftCache.delete(draftPath);
+    draftCache.set(draftPath, cached);
+    return cached;
+  }
+
+  const draft = JSON.parse(fs.readFileSync(draftPath, 'utf8'));
+  const body = {
+    success: true,
+    generatedPost: draft.post,
+    postKey: postKeyFor(date),
+    generatedAt: draft.generated_at,
+    projectCount: draft.project_count
+  };
+  // The post and the inputs it was generated from identify the response
+  const etag = `"${crypto.createHash('sha1')
+    .update(JSON.stringify([date, draft.data_fingerprint || null, draft.generated_at || null, draft.post]))
+    .digest('base64url')}"`;
+
+  const entry = { mtimeMs: stat.mtimeMs, size: stat.size, body, etag };
+  draftCache.delete(draftPath);
+  draftCache.set(draftPath, entry);
+  if (draftCache.size > DRAFT_CACHE_SIZE) {
+    draftCache.delete(draftCache.keys().next().value);
+  }
+  return entry;
+}
+
+// Return the saved draft for a date without running the pipeline
+function handleGetDraft(req, res) {
+  const { date } = req.query;
+
+  if (!date || !/^\d{4}-\d{2}-\d{2}$/.test(date)) {
+    return res.status(400).json({ error: 'Date is required in YYYY-MM-DD format' });
+  }
+
+  const draftPath = path.join(DRAFTS_DIR, `${date.replace(/-/g, '_')}.json`);
+  if (!fs.existsSync(draftPath)) {
+    return res.status(404).json({ error: 'No draft for this date' });
   }
 
   try {
+    const { body, etag } = loadDraftResponse(date, draftPath);
+    // Browsers and proxies may keep the draft but must revalidate it, since it is regenerated in place
+    res.setHeader('ETag', etag);
+    res.setHeader('Cache-Control', 'private, no-cache');
+
+    const ifNoneMatch = req.headers['if-none-match'];
+    if (ifNoneMatch && ifNoneMatch.split(',').some((tag) => tag.trim().replace(/^W\//, '') === etag)) {
+      return res.status(304).end();
+    }
+    return res.status(200).json(body);
+  } catch (error) {
+    console.error(`Error reading draft ${draftPath}: ${error}`);
+    return res.status(500).json({ error: 'Failed to read draft', details: error.message });
+  }
+}
+
+// Run main.py for a date and resolve with the HTTP status and JSON body to send;
+// force regenerates even if main.py's manifest says the date's inputs are unchanged
+function runGeneration(date, maxProjects, force) {
+  return new Promise((resolve) => {
     // Path to the main.py script in the src directory
     const scriptPath = path.resolve(process.cwd(), 'main.py');
-    
+
     // Make sure the script exists
     if (!fs.existsSync(scriptPath)) {
-      return res.status(500).json({ error: `Script not found at ${scriptPath}` });
+      return resolve({ status: 500, body: { error: `Script not found at ${scriptPath}` } });
     }
 
     // Output file path for the generated post (in the root directory)
-    const outputFilePath = path.resolve(process.cwd(), `../linkedin_post_${date.replace(/-/g, '_')}.txt`);
-    
+    const outputFilePath = path.resolve(process.cwd(), `../${postKeyFor(date)}.txt`);
+
     // Run the Python script with the specified date and dry-run flag
     // Use --mock flag to avoid OpenAI API dependency
     const pythonProcess = spawn('python3', [
       scriptPath,
       '--date', date,
-      '--dry-run' // Don't post to LinkedIn, just generate the post
+      '--max-projects', String(maxProjects),
+      '--dry-run', // Don't post to LinkedIn, just generate the post
+      '--deadline', String(GENERATE_DEADLINE_SECONDS),
+      ...(force ? ['--force'] : [])
       // '--mock' flag removed since OpenAI package is now installed
     ]);
 
+    // Never let the web request hang on the Python process
+    const killTimer = setTimeout(() => {
+      console.error(`Python script exceeded its ${GENERATE_DEADLINE_SECONDS}s deadline, killing it`);
+      pythonProcess.kill('SIGKILL');
+    }, GENERATE_DEADLINE_SECONDS * 1000 + KILL_GRACE_MS);
+
     let dataString = '';
     let errorString = '';
 
@@ -48,8 +147,16 @@ export default async function handler(req, res) {
       errorString += data.toString();
     });
 
+    pythonProcess.on('error', (error) => {
+      clearTimeout(killTimer);
+      console.error(`Error running Python script: ${error}`);
+      resolve({ status: 500, body: { error: 'Internal server error', details: error.message } });
+    });
+
     // Handle process completion
     pythonProcess.on('close', (code) => {
+      clearTimeout(killTimer);
+
       if (code !== 0) {
         console.error(`Python script exited with code ${code}`);
         console.error(`Error: ${errorString}`);
@@ -74,23 +181,23 @@ Check out these amazing projects through Sundai and see how our community contin
 
           // Try to write the mock post to the output file
           try {
-            fs.writeFileSync(outputFilePath, mockPost);
+            writeFileAtomic(outputFilePath, mockPost);
           } catch (writeError) {
             console.log(`Could not write mock post to file: ${writeError.message}`);
             // Continue anyway since we'll return the mock post directly
           }
           
-          return res.status(200).json({
+          return resolve({ status: 200, body: {
             success: true,
             generatedPost: mockPost,
             note: "Generated JavaScript mock post due to Python module error"
-          });
+          } });
         }
         
-        return res.status(500).json({ 
+        return resolve({ status: 500, body: {
           error: 'Failed to generate post',
           details: errorString || 'Unknown error'
-        });
+        } });
       }
 
       // Check if the output file was created
@@ -99,31 +206,70 @@ Check out these amazing projects through Sundai and see how our community contin
           // Read the generated post from the file
           const generatedPost = fs.readFileSync(outputFilePath, 'utf8');
           
-          return res.status(200).json({ 
+          return resolve({ status: 200, body: {
             success: true,
-            generatedPost: generatedPost
-          });
+            generatedPost: generatedPost,
+            postKey: postKeyFor(date)
+          } });
         } catch (readError) {
           console.error(`Error reading output file: ${readError}`);
-          return res.status(500).json({ 
+          return resolve({ status: 500, body: {
             error: 'Failed to read generated post',
             details: readError.message
-          });
+          } });
         }
       } else {
         console.error('Output file not found after script execution');
-        return res.status(500).json({ 
+        return resolve({ status: 500, body: {
           error: 'Generated post file not found',
           details: dataString || 'No output from script'
-        });
+        } });
       }
     });
+  });
+}
 
-  } catch (error) {
-    console.error(`Error running Python script: ${error}`);
-    return res.status(500).json({ 
-      error: 'Internal server error',
-      details: error.message
-    });
+// Run one generation per set of inputs at a time, sharing its result with every concurrent caller
+function generateOnce(date, maxProjects, force) {
+  const key = `${date}|${maxProjects}|${OPENAI_MODEL}|${force ? 'force' : 'cached'}`;
+  const running = inFlight.get(key);
+  if (running) {
+    console.log(`Joining the generation already running for ${key}`);
+    return running;
+  }
+
+  const generation = runGeneration(date, maxProjects, force).finally(() => inFlight.delete(key));
+  inFlight.set(key, generation);
+  return generation;
+}
+
+export default async function handler(req, res) {
+  if (req.method === 'GET') {
+    return handleGetDraft(req, res);
+  }
+
+  if (req.method !== 'POST') {
+    return res.status(405).json({ error: 'Method not allowed' });
+  }
+
+  const { date, maxProjects = DEFAULT_MAX_PROJECTS, force = false } = req.body;
+
+  if (!date) {
+    return res.status(400).json({ error: 'Date is required' });
   }
+
+  if (!/^\d{4}-\d{2}-\d{2}$/.test(date)) {
+    return res.status(400).json({ error: 'Date must be in YYYY-MM-DD format' });
+  }
+
+  if (!Number.isInteger(maxProjects) || maxProjects < 1) {
+    return res.status(400).json({ error: 'maxProjects must be a positive integer' });
+  }
+
+  if (typeof force !== 'boolean') {
+    return res.status(400).json({ error: 'force must be a boolean' });
+  }
+
+  const { status, body } = await generateOnce(date, maxProjects, force);
+  return res.status(status).json(body);
 }
@@ -1,15 +1,76 @@
 // API route to handle LinkedIn posting
+import { spawn } from 'child_process';
+import path from 'path';
+
+// Run near_duplicates.py with the post text on stdin and resolve with its stdout
+function runPostIndex(args, text) {
+  return new Promise((resolve, reject) => {
+    const scriptPath = path.resolve(process.cwd(), 'near_duplicates.py');
+    const pythonProcess = spawn('python3', [scriptPath, ...args]);
+
+    let dataString = '';
+    let errorString = '';
+
+    pythonProcess.stdout.on('data', (data) => {
+      dataString += data.toString();
+    });
+
+    pythonProcess.stderr.on('data', (data) => {
+      errorString += data.toString();
+    });
+
+    pythonProcess.on('error', reject);
+    pythonProcess.on('close', (code) => {
+      if (code !== 0) {
+        return reject(new Error(errorString || dataString || `near_duplicates.py exited with code ${code}`));
+      }
+      resolve(dataString);
+    });
+
+    pythonProcess.stdin.write(text);
+    pythonProcess.stdin.end();
+  });
+}
+
 export default async function handler(req, res) {
   if (req.method !== 'POST') {
     return res.status(405).json({ error: 'Method not allowed' });
   }
 
-  let { text } = req.body;
+  let { text, postKey } = req.body;
 
   if (!text) {
     return res.status(400).json({ error: 'Post text is required' });
   }
 
+  // Index key of the draft the post was generated as (e.g. linkedin_post_2025_08_25), if any
+  if (postKey !== undefined && postKey !== null && !/^linkedin_post_\w+$/.test(postKey)) {
+    return res.status(400).json({ error: 'postKey must look like linkedin_post_<label>' });
+  }
+
+  // Check against previously generated/published posts before spending a publish attempt;
+  // main.py indexes every draft it writes, so the post's own unpublished draft is excluded
+  const originalText = text;
+  const checkArgs = postKey ? ['--check', '--exclude-key', postKey] : ['--check'];
+  try {
+    const lines = (await runPostIndex(checkArgs, originalText)).trim().split('\n');
+    const check = JSON.parse(lines[lines.length - 1]);
+
+    if (check.duplicate) {
+      console.log('❌ SKIPPED: Post is a near-duplicate of a previous post');
+      console.log(`   Similar to: ${check.key} (${Math.round(check.similarity * 100)}%)`);
+      return res.status(409).json({
+        error: 'Post is too similar to a previous post. Regenerate it before publishing.',
+        duplicate: true,
+        similarTo: check.key,
+        similarity: check.similarity
+      });
+    }
+  } catch (checkError) {
+    // The check is an optimization; LinkedIn still enforces duplicates itself
+    console.log(`   Could not check for duplicate posts: ${checkError.message}`);
+  }
+
   // Add timestamp to prevent duplicates
   const timestamp = new Date().toLocaleString();
   text = `${text}\n\n📅 Posted on ${timestamp}`;
@@ -45,7 +106,8 @@ export default async function handler(req, res) {
       }
     };
 
-    const response = await fetch("https://api.linkedin.com/v2/ugcPosts", {
+    const apiBase = (process.env.LINKEDIN_API_BASE || 'https://api.linkedin.com').replace(/\/$/, '');
+    const response = await fetch(`${apiBase}/v2/ugcPosts`, {
       method: 'POST',
       headers: headers,
       body: JSON.stringify(payload)
@@ -54,6 +116,12 @@ export default async function handler(req, res) {
     const data = await response.json();
 
     if (response.ok) {
+      // Recorded under the draft's key when there is one, so later checks see it as published
+      const addArgs = postKey ? ['--add', postKey, '--published'] : ['--add', '--published'];
+      runPostIndex(addArgs, originalText).catch((indexError) => {
+        console.log(`   Could not record published post: ${indexError.message}`);
+      });
+
       console.log('✅ SUCCESS: LinkedIn post published!');
       console.log('   Post ID:', data.id);
       console.log('   View at: https://www.linkedin.com/feed/update/' + data.id + '/');
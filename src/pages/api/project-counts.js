@@ -0,0 +1,79 @@
+// API route returning the number of projects per day for a date range (used by the calendar)
+import { spawn } from 'child_process';
+import path from 'path';
+import fs from 'fs';
+
+const DATE_PATTERN = /^\d{4}-\d{2}-\d{2}$/;
+
+export default async function handler(req, res) {
+  if (req.method !== 'GET') {
+    return res.status(405).json({ error: 'Method not allowed' });
+  }
+
+  const { start, end } = req.query;
+
+  if ((start && !DATE_PATTERN.test(start)) || (end && !DATE_PATTERN.test(end))) {
+    return res.status(400).json({ error: 'start and end must be in YYYY-MM-DD format' });
+  }
+
+  try {
+    // Path to the data_pull.py script in the src directory
+    const scriptPath = path.resolve(process.cwd(), 'data_pull.py');
+
+    if (!fs.existsSync(scriptPath)) {
+      return res.status(500).json({ error: `Script not found at ${scriptPath}` });
+    }
+
+    const args = [scriptPath, '--counts', '--quiet'];
+    if (start) {
+      args.push('--start-date', start);
+    }
+    if (end) {
+      args.push('--end-date', end);
+    }
+
+    const pythonProcess = spawn('python3', args);
+
+    let dataString = '';
+    let errorString = '';
+
+    pythonProcess.stdout.on('data', (data) => {
+      dataString += data.toString();
+    });
+
+    pythonProcess.stderr.on('data', (data) => {
+      errorString += data.toString();
+    });
+
+    pythonProcess.on('close', (code) => {
+      if (code !== 0) {
+        console.error(`Python script exited with code ${code}`);
+        console.error(`Error: ${errorString}`);
+        return res.status(500).json({
+          error: 'Failed to load project counts',
+          details: errorString || dataString || 'Unknown error'
+        });
+      }
+
+      try {
+        // The counts are printed as the last line of output
+        const lines = dataString.trim().split('\n');
+        const counts = JSON.parse(lines[lines.length - 1]);
+        return res.status(200).json({ success: true, counts: counts });
+      } catch (parseError) {
+        console.error(`Error parsing project counts: ${parseError}`);
+        return res.status(500).json({
+          error: 'Failed to parse project counts',
+          details: parseError.message
+        });
+      }
+    });
+
+  } catch (error) {
+    console.error(`Error running Python script: ${error}`);
+    return res.status(500).json({
+      error: 'Internal server error',
+      details: error.message
+    });
+  }
+}
@@ -1,4 +1,4 @@
-import { useState } from 'react';
+import { useState, useEffect } from 'react';
 import PostPreview from '../components/PostPreview';
 import ApprovalButtons from '../components/ApprovalButtons';
 
@@ -16,6 +16,59 @@ export default function Home() {
   const [postHistory, setPostHistory] = useState([]);
   const [selectedDate, setSelectedDate] = useState(new Date().toISOString().split('T')[0]);
   const [isGenerating, setIsGenerating] = useState(false);
+  // Per-day counts for a date range: null while loading, { error: true } if they could not be loaded
+  const [projectCounts, setProjectCounts] = useState(null);
+  const [draftInfo, setDraftInfo] = useState(null);
+  // Near-duplicate index key of the draft being shown, so publishing doesn't match the draft itself
+  const [postKey, setPostKey] = useState(null);
+
+  // Load per-day project counts for the month around the selected date
+  const selectedMonth = selectedDate.slice(0, 7);
+  useEffect(() => {
+    const [year, month] = selectedMonth.split('-').map(Number);
+    const lastDay = new Date(year, month, 0).getDate();
+    const start = `${selectedMonth}-01`;
+    const end = `${selectedMonth}-${String(lastDay).padStart(2, '0')}`;
+
+    let cancelled = false;
+    setProjectCounts(null);
+
+    fetch(`/api/project-counts?start=${start}&end=${end}`)
+      .then((response) => response.ok ? response.json() : Promise.reject(new Error(`HTTP ${response.status}`)))
+      .then((data) => {
+        if (cancelled) return;
+        setProjectCounts(data.counts ? { start, end, counts: data.counts } : { error: true });
+      })
+      .catch(() => {
+        if (!cancelled) setProjectCounts({ error: true });
+      });
+
+    return () => { cancelled = true; };
+  }, [selectedMonth]);
+
+  // Days missing from loaded counts had no projects; outside the loaded range the count is unknown
+  const countsLoaded = projectCounts && !projectCounts.error
+    && selectedDate >= projectCounts.start && selectedDate <= projectCounts.end;
+  const selectedCount = countsLoaded ? (projectCounts.counts[selectedDate] || 0) : null;
+
+  // Show the pre-generated draft for the selected date, if there is one
+  useEffect(() => {
+    let cancelled = false;
+    setDraftInfo(null);
+    setPostKey(null);
+
+    fetch(`/api/generate-post?date=${selectedDate}`)
+      .then((response) => response.ok ? response.json() : null)
+      .then((data) => {
+        if (cancelled || !data || !data.success) return;
+        setPostData({ text: data.generatedPost, status: 'pending' });
+        setDraftInfo({ generatedAt: data.generatedAt });
+        setPostKey(data.postKey || null);
+      })
+      .catch(() => {});
+
+    return () => { cancelled = true; };
+  }, [selectedDate]);
 
   const handleApprove = async () => {
     setIsPosting(true);
@@ -25,7 +78,7 @@ export default function Home() {
         headers: {
           'Content-Type': 'application/json',
         },
-        body: JSON.stringify({ text: postData.text }),
+        body: JSON.stringify({ text: postData.text, postKey }),
       });
       
       const data = await response.json();
@@ -52,6 +105,18 @@ export default function Home() {
         };
         setPostHistory(prev => [historyItem, ...prev]);
         
+      } else if (response.status === 409 && data.duplicate) {
+        // Near-duplicate of an earlier post: regenerate instead of publishing
+        setIsPosting(false);
+        const rejectedText = postData.text;
+        const regenerated = await handleGeneratePost({ force: true });
+        if (regenerated === rejectedText) {
+          // Generation is deterministic (e.g. mock mode), so regenerating again would not help
+          setResult({ success: false, message: `${data.error} Regenerating produced the same post; edit it before publishing.` });
+        } else if (regenerated) {
+          setResult({ success: false, message: `${data.error} A new post was generated; review it before publishing.` });
+        }
+        return;
       } else {
         setResult({ success: false, message: data.error || 'Failed to post' });
         
@@ -98,9 +163,12 @@ export default function Home() {
     setIsEditing(false);
   };
 
-  const handleGeneratePost = async () => {
+  // Generate a post for the selected date, returning its text (null if generation failed);
+  // force skips main.py's reuse of an unchanged date's saved post
+  const handleGeneratePost = async ({ force = false } = {}) => {
     setIsGenerating(true);
     setResult(null); // Clear previous results
+    let generatedPost = null;
     
     try {
       const response = await fetch('/api/generate-post', {
@@ -108,13 +176,16 @@ export default function Home() {
         headers: {
           'Content-Type': 'application/json',
         },
-        body: JSON.stringify({ date: selectedDate }),
+        body: JSON.stringify({ date: selectedDate, force }),
       });
       
       const data = await response.json();
       
       if (response.ok && data.success) {
         setPostData({ text: data.generatedPost, status: 'pending' });
+        setDraftInfo(null);
+        setPostKey(data.postKey || null);
+        generatedPost = data.generatedPost;
         setResult({ 
           success: true, 
           message: 'Post generated successfully! Review and approve to publish to LinkedIn.' 
@@ -137,6 +208,7 @@ export default function Home() {
     }
     
     setIsGenerating(false);
+    return generatedPost;
   };
 
   return (
@@ -229,10 +301,22 @@ export default function Home() {
                 onFocus={(e) => e.target.style.borderColor = '#3b82f6'}
                 onBlur={(e) => e.target.style.borderColor = '#e5e7eb'}
               />
+              <span style={{
+                fontSize: '12px',
+                color: selectedCount ? '#059669' : '#9ca3af'
+              }}>
+                {projectCounts && projectCounts.error
+                  ? 'Counts unavailable'
+                  : selectedCount === null
+                    ? ''
+                    : selectedCount
+                      ? `${selectedCount} projects on this day`
+                      : 'No projects on this day'}
+              </span>
             </div>
             
             <button
-              onClick={handleGeneratePost}
+              onClick={() => handleGeneratePost({ force: Boolean(postKey) })}
               disabled={isGenerating}
               style={{
                 padding: '12px 24px',
@@ -271,7 +355,7 @@ export default function Home() {
                 </>
               ) : (
                 <>
-                  ✨ Generate Post
+                  {postKey ? '🔄 Regenerate Post' : '✨ Generate Post'}
                 </>
               )}
             </button>
@@ -283,7 +367,9 @@ export default function Home() {
             fontSize: '12px',
             color: '#6b7280'
           }}>
-            Generate a LinkedIn post based on Sundai Hack projects from the selected date
+            {draftInfo
+              ? `Showing the draft prepared at ${new Date(draftInfo.generatedAt).toLocaleString()}; regenerate for a fresh one`
+              : 'Generate a LinkedIn post based on Sundai Hack projects from the selected date'}
           </div>
         </div>
       
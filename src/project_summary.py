@@ -1,8 +1,10 @@
 import os
 import sys
 import json
+import time
 import textwrap
 import argparse
+import threading
 from dotenv import load_dotenv
 import pandas as pd
 from datetime import datetime
@@ -14,60 +16,227 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # Import after adding to path
 from src.utils import parse_date
-from src.data_pull import get_projects_by_date, format_projects_for_prompt, save_projects_to_csv
+from src.data_pull import (get_projects_by_date, deduplicate_projects, format_projects_for_prompt, prompt_row_positions,
+                           format_digest_summary, save_projects_to_csv)
+from src.metrics import LLM_LATENCY, LLM_CACHE_LATENCY, LLM_TOKENS, LLM_COST, LLM_FALLBACKS, estimate_cost, flush_metrics
+from src.theme_clustering import cluster_projects
+from src.hedging import HedgePolicy, hedged_chat_completion
+from src.blurbs import BLURB_SYSTEM_PROMPT, get_blurbs, with_blurbs
 
 load_dotenv()
 
-def generate_linkedin_post(client, projects_df, date_str, max_projects=20, mock=False):
+# Bump whenever the prompt changes, so up-to-date checks regenerate existing posts
+PROMPT_VERSION = "5"
+
+# Everything that is the same for every post comes first, in the system message, and
+# only the user message varies. OpenAI caches shared prompt prefixes of 1024+ tokens,
+# so a request repeating a day's projects within minutes (a near-duplicate regeneration)
+# is served from its cache. The system prompt alone (about 450 tokens with gpt-4o-mini's
+# tokenizer) is deliberately not padded up to the minimum: runs are hours apart, so the
+# padding would be paid on nearly every call. Keep it byte-for-byte stable: any edit
+# invalidates the cache and needs a PROMPT_VERSION bump.
+SYSTEM_PROMPT = textwrap.dedent("""\
+    You are a professional community manager for Sundai, a tech community whose members
+    build and ship new projects together every week. You write engaging LinkedIn posts that
+    celebrate the projects they create.
+
+    Each request gives the date the projects were created and the list of projects. Every
+    project starts with a "Project #N: <title>" line, followed by some of "Preview:",
+    "Description:", "GitHub:" and "Demo:" lines. Projects may be grouped under
+    "Theme: <name> (<count> projects in total)" headings.
+
+    Requirements for every LinkedIn post:
+    1. Keep it concise (under 1300 characters)
+    2. Include hashtags like #AI #TechCommunity #Sundai #Innovation
+    3. Mention the date when these projects were created, as given in the request
+    4. Highlight the most interesting and innovative aspects of the projects
+    5. Encourage readers to check out the projects
+    6. Format it properly for LinkedIn with appropriate spacing and paragraph breaks
+    7. Do not include all the GitHub links - just mention they can be found through Sundai
+    8. The tone should be professional but enthusiastic
+    9. When the request lists themes, organize the post by them (for example "4 agent tools,
+       3 health apps"), describing each theme in your own words
+    10. When the request names a theme the projects were selected for, build the post around it
+    11. When the request includes an earlier post, the new post must read clearly differently
+        from it: use a different opening, structure and wording
+    12. Only describe what the project list says; never invent features, users or results
+
+    Style notes:
+    - Open with a hook in the first line; LinkedIn shows only the first two lines before "see more"
+    - Name projects by their titles and say in a few plain words what each one does
+    - Prefer concrete details (what a project does, who it helps) over generic praise
+    - Use at most one emoji per paragraph, and no more than five hashtags at the end
+    - Keep paragraphs to two or three short sentences, separated by blank lines
+    - Close with an invitation: try the projects, share feedback or join the next build day
+    """)
+
+def record_usage(response, model, run_stats=None, latency=None):
+    """
+    Record the token usage, prompt cache hits and estimated cost of a chat completion.
+    
+    Args:
+        response: Chat completion response from the OpenAI API
+        model: Model the request was made with
+        run_stats: Optional dictionary in which the usage is accumulated
+        latency: Optional request duration in seconds, recorded by prompt cache hit or miss
+    """
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return
+    prompt_tokens = usage.prompt_tokens or 0
+    completion_tokens = usage.completion_tokens or 0
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached_tokens = getattr(details, "cached_tokens", None) or 0
+    cost = estimate_cost(model, prompt_tokens, completion_tokens, cached_tokens)
+    
+    LLM_TOKENS.inc(prompt_tokens, model=model, type="prompt")
+    LLM_TOKENS.inc(cached_tokens, model=model, type="cached_prompt")
+    LLM_TOKENS.inc(completion_tokens, model=model, type="completion")
+    LLM_COST.inc(cost, model=model)
+    if latency is not None:
+        LLM_CACHE_LATENCY.observe(latency, model=model, cache="hit" if cached_tokens else "miss")
+    
+    if run_stats is not None:
+        run_stats['prompt_tokens'] = run_stats.get('prompt_tokens', 0) + prompt_tokens
+        run_stats['cached_tokens'] = run_stats.get('cached_tokens', 0) + cached_tokens
+        run_stats['completion_tokens'] = run_stats.get('completion_tokens', 0) + completion_tokens
+        run_stats['cost_usd'] = run_stats.get('cost_usd', 0.0) + cost
+
+def write_project_blurbs(client, projects_df, run_stats=None, timeout=None):
+    """
+    Get every project's blurb (see blurbs), writing the ones that are not cached with the API.
+    
+    Args:
+        client: OpenAI client
+        projects_df: DataFrame containing project data
+        run_stats: Optional dictionary in which the API usage is accumulated
+        timeout: Optional seconds allowed for writing all the missing blurbs
+        
+    Returns:
+        List of blurbs in row order; None where a blurb could not be written in time
+    """
+    if timeout is not None:
+        client = client.with_options(timeout=timeout, max_retries=0)
+    model = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+    usage_lock = threading.Lock()
+    
+    def write_blurb(prompt):
+        start = time.perf_counter()
+        response = client.chat.completions.create(
+            model=model,
+            messages=[
+                {"role": "system", "content": BLURB_SYSTEM_PROMPT},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.3,
+            max_tokens=150
+        )
+        latency = time.perf_counter() - start
+        LLM_LATENCY.observe(latency, model=model)
+        # Blurbs are written concurrently; run_stats is a plain dictionary
+        with usage_lock:
+            record_usage(response, model, run_stats, latency=latency)
+        return response.choices[0].message.content
+    
+    return get_blurbs(projects_df, write_blurb, model, timeout=timeout)
+
+def generate_linkedin_post(client, projects_df, date_str, max_projects=20, mock=False, theme=None, avoid_post=None,
+                           run_stats=None, timeout=None, compress=False, group_themes=True, hedge=None,
+                           incremental=False, digest=None):
     """
     Generate a LinkedIn post summarizing the projects using GPT.
     
     Args:
         client: OpenAI client (or None if mock=True)
         projects_df: DataFrame containing project data
-        date_str: Date string in YYYY-MM-DD format
+        date_str: Date string in YYYY-MM-DD format; for themed posts, their date range as a phrase
+            such as 'created from 2025-08-01 to 2025-08-31', or '' for all dates
         max_projects: Maximum number of projects to include
         mock: If True, generate a mock post without using the OpenAI API
+        theme: Optional theme the projects were selected for (e.g. a search query)
+        avoid_post: Optional earlier post the new one must not resemble (used when regenerating near-duplicates)
+        run_stats: Optional dictionary that receives details about the generation
+            ('fallback' is set to True if the API call failed and a mock post was returned;
+            'prompt_tokens', 'cached_tokens', 'completion_tokens' and 'cost_usd' accumulate the API usage)
+        timeout: Optional seconds allowed for the API call; on timeout the mock post is returned
+        compress: If True, compress the project text in the prompt (see prompt_compression)
+        group_themes: If True, cluster the projects into themes (see theme_clustering) and
+            have the post organized by them
+        hedge: Optional hedging.HedgePolicy; if given, a slow API call is raced against a second identical call
+        incremental: If True, compose the post from short per-project blurbs, which are cached so
+            only new or changed projects need an API call (see blurbs); compress is then ignored
+        digest: Optional weekly or monthly digest from data_pull.get_period_digest; the post then
+            covers the whole period, and projects_df holds its highlighted projects
         
     Returns:
         Generated LinkedIn post as a string
     """
-    # Format the projects for the prompt
-    formatted_projects = format_projects_for_prompt(projects_df, max_projects)
+    # Group the projects by theme
+    project_themes = cluster_projects(projects_df) if group_themes else []
     
-    # Create the prompt
-    prompt = f"""
-    You are a community manager for a tech community called Sundai. 
+    # In incremental mode the prompt lists each project's blurb instead of its full text;
+    # only the projects that make it into the prompt get one
+    prompt_projects_df = projects_df
+    if incremental and not mock and client is not None:
+        start = time.perf_counter()
+        blurb_timeout = timeout / 2 if timeout is not None else None
+        positions, _ = prompt_row_positions(projects_df, max_projects, project_themes)
+        blurbs = [None] * len(projects_df)
+        for position, blurb in zip(positions, write_project_blurbs(client, projects_df.iloc[positions], run_stats,
+                                                                   blurb_timeout)):
+            blurbs[position] = blurb
+        prompt_projects_df = with_blurbs(projects_df, blurbs)
+        compress = False
+        # The compose call gets what is left of the budget
+        if timeout is not None:
+            timeout = max(0.1, timeout - (time.perf_counter() - start))
     
-    Please write an engaging LinkedIn post about the following projects that were created on {date_str}. 
-    The post should be professional, enthusiastic, and highlight the innovative aspects of these projects.
+    # Format the projects for the prompt
+    formatted_projects = format_projects_for_prompt(prompt_projects_df, max_projects, compress=compress,
+                                                    themes=project_themes)
     
-    Here are the projects:
+    theme_summary = ", ".join(f"{len(t)} {t.name}" for t in project_themes)
     
-    {formatted_projects}
+    # Create the request: only the variable payload, after the static system prompt
+    if digest:
+        request_lines = [f"Write a LinkedIn post that sums up the projects created from {digest['start_date']} "
+                         f"to {digest['end_date']}, featuring the highlighted projects below.",
+                         f"Statistics for the period:\n{format_digest_summary(digest)}"]
+    elif theme:
+        request_lines = [f"Write a LinkedIn post about the following projects matching the theme \"{theme}\""
+                         + (f", {date_str}." if date_str else ".")]
+    else:
+        request_lines = [f"Write a LinkedIn post about the following projects that were created on {date_str}."]
+    if project_themes:
+        projects_label = "highlighted projects" if digest else "projects"
+        request_lines.append(f"The {len(projects_df)} {projects_label} fall into these themes: {theme_summary}.")
+    projects_heading = "Here are the highlighted projects" if digest else "Here are the projects"
+    prompt = "\n".join(request_lines) + f"\n\n{projects_heading}:\n\n{formatted_projects}\n"
     
-    Requirements for the LinkedIn post:
-    1. Keep it concise (under 1300 characters)
-    2. Include hashtags like #AI #TechCommunity #Sundai #Innovation
-    3. Mention the date ({date_str}) when these projects were created
-    4. Highlight the most interesting aspects of the projects
-    5. Encourage readers to check out the projects
-    6. Format it properly for LinkedIn with appropriate spacing and paragraph breaks
-    7. Do not include all the GitHub links - just mention they can be found through Sundai
-    8. The tone should be professional but enthusiastic
-    """
+    if avoid_post:
+        prompt += f"\nEarlier post to read clearly differently from:\n\n{avoid_post}\n"
     
     # If mock mode is enabled, return a mock post
     if mock:
         print("Generating mock LinkedIn post (no API call)...")
-        project_count = len(projects_df)
+        project_count = digest['project_count'] if digest else len(projects_df)
         project_titles = ", ".join([f'"{p.get("title", "Untitled")}"' for _, p in projects_df.head(3).iterrows()])
         if project_count > 3:
             project_titles += f", and {project_count - 3} more"
         
-        mock_post = f"""🚀 Exciting projects from our Sundai community on {date_str}! 
+        headline = f"{theme} projects" if theme else "projects"
+        themes_label = "The themes" if digest or theme else "Today's themes"
+        theme_sentence = f" {themes_label}: {theme_summary}." if project_themes else ""
+        if digest:
+            when = f" from {digest['start_date']} to {digest['end_date']}"
+        elif theme:
+            when = f" {date_str}" if date_str else ""
+        else:
+            when = f" on {date_str}"
+        opening = "Over these days" if digest else "Across our build days" if theme else "Today"
+        mock_post = f"""🚀 Exciting {headline} from our Sundai community{when}! 
 
-Today, our talented members created {project_count} innovative projects including {project_titles}.
+{opening}, our talented members created {project_count} innovative projects including {project_titles}.{theme_sentence}
 
 These projects showcase the creativity and technical skills of our community members, ranging from AI tools to productivity enhancers.
 
@@ -80,16 +249,27 @@ Check out these amazing projects through Sundai and see how our community contin
     print("Generating LinkedIn post with GPT...")
     
     try:
-        # Call the OpenAI API
-        response = client.chat.completions.create(
-            model=os.getenv("OPENAI_MODEL", "gpt-4o-mini"),
+        # Call the OpenAI API (no SDK retries under a deadline, they would overrun it)
+        if timeout is not None:
+            client = client.with_options(timeout=timeout, max_retries=0)
+        model = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+        request = dict(
+            model=model,
             messages=[
-                {"role": "system", "content": "You are a professional community manager who writes engaging LinkedIn posts."},
+                {"role": "system", "content": SYSTEM_PROMPT},
                 {"role": "user", "content": prompt}
             ],
             temperature=0.7,
             max_tokens=1000
         )
+        start = time.perf_counter()
+        if hedge is not None:
+            response = hedged_chat_completion(client, hedge, **request)
+        else:
+            response = client.chat.completions.create(**request)
+        latency = time.perf_counter() - start
+        LLM_LATENCY.observe(latency, model=model)
+        record_usage(response, model, run_stats, latency=latency)
         
         # Extract the generated post
         linkedin_post = response.choices[0].message.content.strip()
@@ -98,8 +278,67 @@ Check out these amazing projects through Sundai and see how our community contin
     except Exception as e:
         print(f"Error generating LinkedIn post with GPT: {e}")
         print("Falling back to mock post generation...")
+        LLM_FALLBACKS.inc(reason=type(e).__name__)
+        if run_stats is not None:
+            run_stats['fallback'] = True
         # Fall back to mock generation if API call fails
-        return generate_linkedin_post(None, projects_df, date_str, max_projects, mock=True)
+        return generate_linkedin_post(None, projects_df, date_str, max_projects, mock=True, theme=theme,
+                                      group_themes=group_themes, digest=digest)
+
+def generate_distinct_linkedin_post(client, projects_df, date_str, post_index, post_key,
+                                    max_projects=20, mock=False, theme=None, max_attempts=3, run_stats=None,
+                                    deadline=None, compress=False, group_themes=True, hedge=None, incremental=False,
+                                    digest=None):
+    """
+    Generate a LinkedIn post, regenerating while it is a near-duplicate of an indexed post.
+    
+    Args:
+        client: OpenAI client (or None if mock=True)
+        projects_df: DataFrame containing project data
+        date_str: Date string in YYYY-MM-DD format, or the date range phrase for themed posts (see generate_linkedin_post)
+        post_index: near_duplicates.PostIndex of previously generated or published posts
+        post_key: Index key of this post's draft
+        max_projects: Maximum number of projects to include
+        mock: If True, generate a mock post without using the OpenAI API
+        theme: Optional theme the projects were selected for (e.g. a search query)
+        max_attempts: Maximum number of generations
+        run_stats: Optional dictionary that receives details about the generation (see generate_linkedin_post)
+        deadline: Optional deadline.Deadline; each attempt gets most of the remaining time and
+            no regeneration is attempted once it has expired
+        compress: If True, compress the project text in the prompt (see prompt_compression)
+        group_themes: If True, organize the post by project theme (see generate_linkedin_post)
+        hedge: Optional hedging.HedgePolicy for the API calls (see generate_linkedin_post)
+        incremental: If True, compose the post from cached per-project blurbs (see generate_linkedin_post)
+        digest: Optional weekly or monthly digest the post sums up (see generate_linkedin_post)
+        
+    Returns:
+        Tuple of (post text, duplicate match) where the match is the (key, similarity) of the
+        most similar indexed post if every attempt was a near-duplicate, else None
+    """
+    def llm_timeout():
+        # Leave a slice of the budget for saving and publishing
+        return deadline.stage_budget(0.8) if deadline else None
+    
+    linkedin_post = generate_linkedin_post(client, projects_df, date_str, max_projects, mock=mock, theme=theme,
+                                           run_stats=run_stats, timeout=llm_timeout(), compress=compress,
+                                           group_themes=group_themes, hedge=hedge, incremental=incremental,
+                                           digest=digest)
+    match = post_index.find_duplicate(linkedin_post, exclude_key=post_key)
+    
+    for _ in range(max_attempts - 1):
+        if match is None:
+            break
+        if deadline and deadline.expired():
+            print("Deadline reached; not regenerating the near-duplicate post.")
+            break
+        print(f"Generated post is {match[1]:.0%} similar to {match[0]}; regenerating...")
+        linkedin_post = generate_linkedin_post(client, projects_df, date_str, max_projects,
+                                               mock=mock, theme=theme, avoid_post=linkedin_post, run_stats=run_stats,
+                                               timeout=llm_timeout(), compress=compress, group_themes=group_themes,
+                                               hedge=hedge, incremental=incremental, digest=digest)
+        match = post_index.find_duplicate(linkedin_post, exclude_key=post_key)
+    
+    return linkedin_post, match
 
 def main():
     """
@@ -115,6 +354,14 @@ def main():
                         help='Output file path for the LinkedIn post (default: linkedin_post_YYYY_MM_DD.txt)')
     parser.add_argument('--mock', action='store_true',
                         help='Generate a mock LinkedIn post without using the OpenAI API')
+    parser.add_argument('--compress', action='store_true',
+                        help='Compress project descriptions to their key sentences to shorten the prompt')
+    parser.add_argument('--no-themes', action='store_true',
+                        help='List projects in creation order instead of grouping them by theme')
+    parser.add_argument('--hedge', action='store_true',
+                        help='Send a second OpenAI request when the first is slower than usual (see hedging.py)')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Compose the post from cached per-project blurbs, writing blurbs only for new projects')
     args = parser.parse_args()
     
     # Use provided date or default to today
@@ -146,8 +393,14 @@ def main():
         print("No projects found to summarize.")
         return
     
+    # Collapse resubmissions before prompting
+    projects_df, _ = deduplicate_projects(projects_df)
+    
     # Generate LinkedIn post
-    linkedin_post = generate_linkedin_post(client, projects_df, date_str, args.max_projects, mock=args.mock)
+    linkedin_post = generate_linkedin_post(client, projects_df, date_str, args.max_projects, mock=args.mock,
+                                           compress=args.compress, group_themes=not args.no_themes,
+                                           hedge=HedgePolicy.from_env() if args.hedge else None,
+                                           incremental=args.incremental)
     
     # Display the generated post
     print("\n" + "=" * 80)
@@ -167,6 +420,8 @@ def main():
     
     # Also save project data to CSV for reference using data_pull.py
     save_projects_to_csv(projects_df, date_str)
+    
+    flush_metrics()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,275 @@
+"""
+Local compression of project text before it goes into the prompt.
+
+Project previews and descriptions are cleaned (markup, URLs, README boilerplate),
+split into sentences and ranked with TextRank. Each project then keeps its
+highest-ranked sentences up to a token cap, in their original order. The ranking
+runs as one power iteration over all projects' sentences at once.
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+# Text columns that are compressed (both the PostgreSQL and the SQLite names)
+TEXT_COLUMNS = ("preview", "description")
+
+DEFAULT_MAX_TOKENS_PER_PROJECT = 80
+
+# Rough size of a token in characters for English text
+CHARS_PER_TOKEN = 4
+
+DAMPING = 0.85
+# Sentences at least this similar to an already selected one add nothing new
+REDUNDANCY_THRESHOLD = 0.6
+MAX_ITERATIONS = 50
+TOLERANCE = 1e-6
+
+_WORD_PATTERN = re.compile(r"[a-z0-9]+")
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+|\n+")
+_MARKDOWN_IMAGE = re.compile(r"!\[[^\]]*\]\([^)]*\)")
+_MARKDOWN_LINK = re.compile(r"\[([^\]]*)\]\([^)]*\)")
+_HTML_TAG = re.compile(r"<[^>]+>")
+_URL = re.compile(r"https?://\S+|www\.\S+")
+_HEADING_MARKS = re.compile(r"^\s*(#+|[-*+]|\d+\.)\s+", re.MULTILINE)
+_EMPHASIS = re.compile(r"[*_`~]{1,3}")
+# README sections that say nothing about what the project does
+_BOILERPLATE_SECTION = re.compile(
+    r"^\s*#*\s*(installation|getting started|setup|usage|license|contributing|acknowledg\w*|prerequisites|requirements)\s*:?\s*$",
+    re.IGNORECASE | re.MULTILINE
+)
+_BOILERPLATE_SENTENCE = re.compile(
+    r"^(built with\b.*(love|❤)|made with\b|feel free to|pull requests are welcome|check out (our|the) (repo|github)|"
+    r"(npm|pip|yarn|git) (install|clone|run)|this project (is|was) (built|created|made) (at|during|for) (a |the )?hackathon)",
+    re.IGNORECASE
+)
+
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or our that the this to was we were will with "
+    "you your can it's into their they also which who using use used".split()
+)
+
+
+def estimate_tokens(text):
+    """
+    Estimate the number of tokens in a text.
+
+    Args:
+        text: Input text
+
+    Returns:
+        Approximate token count
+    """
+    return -(-len(text or "") // CHARS_PER_TOKEN)
+
+
+def clean_text(text):
+    """
+    Strip markup, URLs, README boilerplate and redundant whitespace from project text.
+
+    Args:
+        text: Raw preview or description
+
+    Returns:
+        Cleaned text with one sentence-bearing line per paragraph
+    """
+    if not isinstance(text, str):
+        return ""
+
+    # Everything after the first boilerplate heading is setup instructions or legal text
+    section = _BOILERPLATE_SECTION.search(text)
+    if section and section.start() > 0:
+        text = text[:section.start()]
+
+    text = _MARKDOWN_IMAGE.sub("", text)
+    text = _MARKDOWN_LINK.sub(r"\1", text)
+    text = _HTML_TAG.sub(" ", text)
+    text = _URL.sub("", text)
+    text = _HEADING_MARKS.sub("", text)
+    text = _EMPHASIS.sub("", text)
+
+    lines = (re.sub(r"[ \t\r\f\v]+", " ", line).strip() for line in text.split("\n"))
+    return "\n".join(line for line in lines if line)
+
+
+def split_sentences(text):
+    """
+    Split cleaned text into sentences, dropping boilerplate, repeats and heading fragments.
+
+    Args:
+        text: Cleaned text
+
+    Returns:
+        List of sentences
+    """
+    sentences = []
+    fragments = []
+    seen = set()
+    for sentence in _SENTENCE_SPLIT.split(text):
+        sentence = sentence.strip()
+        key = sentence.lower()
+        if not sentence or key in seen or _BOILERPLATE_SENTENCE.match(sentence):
+            continue
+        seen.add(key)
+        # Short unpunctuated lines are headings or titles
+        if sentence[-1] not in ".!?" and len(sentence.split()) <= 4:
+            fragments.append(sentence)
+        else:
+            sentences.append(sentence)
+    return sentences or fragments
+
+
+def rank_sentences(sentences, groups):
+    """
+    Score sentences with TextRank, ranking each group's sentences only against each other.
+
+    All groups are scored together: the similarity matrix is masked to a block-diagonal
+    matrix (one block per group) and a single power iteration converges every block.
+    The random jumps favour early sentences, since descriptions usually lead with what
+    the project does.
+
+    Args:
+        sentences: List of sentences across all groups (each group's in text order)
+        groups: Group index (e.g. project position) for each sentence
+
+    Returns:
+        Tuple of (1-D array of scores, where higher is more central within a group,
+        and the masked sentence similarity matrix)
+    """
+    n = len(sentences)
+    if n == 0:
+        return np.zeros(0), np.zeros((0, 0))
+
+    vocabulary = {}
+    rows, cols = [], []
+    for i, sentence in enumerate(sentences):
+        for word in _WORD_PATTERN.findall(sentence.lower()):
+            if word not in _STOPWORDS:
+                rows.append(i)
+                cols.append(vocabulary.setdefault(word, len(vocabulary)))
+
+    counts = np.zeros((n, max(1, len(vocabulary))), dtype=np.float32)
+    np.add.at(counts, (rows, cols), 1.0)
+    vectors = np.log1p(counts)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    vectors /= np.where(norms == 0, 1.0, norms)
+
+    groups = np.asarray(groups)
+    same_group = groups[:, None] == groups[None, :]
+    similarity = (vectors @ vectors.T) * same_group
+    np.fill_diagonal(similarity, 0.0)
+
+    # Sentences without similar neighbours spread their score evenly over their own group
+    group_sizes = same_group.sum(axis=1).astype(np.float32)
+    out_weight = similarity.sum(axis=1, keepdims=True)
+    transition = np.where(out_weight > 0, similarity / np.where(out_weight == 0, 1.0, out_weight),
+                          same_group / group_sizes[:, None])
+
+    # Position of each sentence within its group, for a 1/(position + 1) jump prior
+    positions = np.tril(same_group, k=-1).sum(axis=1)
+    prior = 1.0 / (positions + 1.0)
+    teleport = prior / (same_group @ prior)
+    scores = np.full(n, 1.0) / group_sizes
+    for _ in range(MAX_ITERATIONS):
+        updated = (1 - DAMPING) * teleport + DAMPING * (transition.T @ scores)
+        if np.abs(updated - scores).sum() < TOLERANCE:
+            scores = updated
+            break
+        scores = updated
+    return scores, similarity
+
+
+def _truncate_to_tokens(text, max_tokens):
+    limit = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= limit:
+        return text
+    cut = text[:limit].rsplit(" ", 1)[0]
+    return cut.rstrip(",;:-") + "..."
+
+
+def compress_texts(texts, max_tokens=DEFAULT_MAX_TOKENS_PER_PROJECT):
+    """
+    Compress several texts at once, keeping each text's top-ranked sentences within a token cap.
+
+    Args:
+        texts: Sequence of raw texts (non-strings are treated as empty)
+        max_tokens: Token cap per text
+
+    Returns:
+        List of compressed texts, in the same order
+    """
+    per_text = [split_sentences(clean_text(text)) for text in texts]
+    sentences = [sentence for text_sentences in per_text for sentence in text_sentences]
+    groups = [i for i, text_sentences in enumerate(per_text) for _ in text_sentences]
+    scores, similarity = rank_sentences(sentences, groups)
+
+    compressed = []
+    offset = 0
+    for text_sentences in per_text:
+        block = slice(offset, offset + len(text_sentences))
+        text_scores = scores[block]
+        text_similarity = similarity[block, block]
+        offset += len(text_sentences)
+        if not text_sentences:
+            compressed.append("")
+            continue
+
+        chosen = []
+        budget = max_tokens
+        for position in np.argsort(-text_scores, kind="stable"):
+            cost = estimate_tokens(text_sentences[position]) + 1
+            if chosen and text_similarity[position, chosen].max() >= REDUNDANCY_THRESHOLD:
+                continue
+            if cost <= budget:
+                chosen.append(position)
+                budget -= cost
+        if not chosen:
+            # Even the best sentence is over the cap
+            compressed.append(_truncate_to_tokens(text_sentences[int(np.argmax(text_scores))], max_tokens))
+            continue
+        compressed.append(" ".join(text_sentences[position] for position in sorted(chosen)))
+    return compressed
+
+
+def compress_projects(projects_df, max_tokens=DEFAULT_MAX_TOKENS_PER_PROJECT):
+    """
+    Compress the text each project sends to the prompt: its preview, or its description if it has none.
+
+    Only that field is compressed and counted, matching what format_projects_for_prompt lists.
+    A preview that is all boilerplate is dropped and the description is compressed in its place.
+
+    Args:
+        projects_df: DataFrame containing project data
+        max_tokens: Token cap per project
+
+    Returns:
+        Tuple of (compressed copy of the DataFrame, estimated tokens before, estimated tokens after)
+    """
+    compressed_df = projects_df.copy()
+    originals = [None] * len(compressed_df)
+    results = [None] * len(compressed_df)
+    pending = set(range(len(compressed_df)))
+
+    for column in TEXT_COLUMNS:
+        if column not in compressed_df.columns:
+            continue
+        # Compact pulls may hold the column as a categorical, which only accepts its existing values
+        values = compressed_df[column].astype(object)
+        positions = [position for position in sorted(pending) if pd.notna(values.iloc[position])]
+        if not positions:
+            continue
+        texts = [str(values.iloc[position]) for position in positions]
+        for position, text, compressed in zip(positions, texts, compress_texts(texts, max_tokens)):
+            if originals[position] is None:
+                originals[position] = text
+            # Empty results become missing, so the prompt falls back to the next field
+            values.iloc[position] = compressed or pd.NA
+            if compressed:
+                results[position] = compressed
+                pending.discard(position)
+        compressed_df[column] = values
+
+    tokens_before = sum(estimate_tokens(text) for text in originals if text is not None)
+    tokens_after = sum(estimate_tokens(text) for text in results if text is not None)
+    return compressed_df, tokens_before, tokens_after
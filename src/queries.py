@@ -0,0 +1,406 @@
+"""
+SQLAlchemy Core definitions of the project tables and the queries run against them.
+
+Each backend's project table is described once, together with a mapping from the
+canonical column names used throughout the pipeline (id, title, description,
+githubUrl, createdAt, ...) to its own columns. Every query is built from that
+mapping, so one definition serves both SQLite and PostgreSQL and always returns
+canonical column names.
+
+Statements only take bound parameters and are built once per shape, so SQLAlchemy
+compiles each of them once per engine and serves later executions from its
+compiled-statement cache (DBConnector shares engines between connections).
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+from sqlalchemy import (
+    MetaData, Table, Column, Integer, Float, String, Text, Date, DateTime,
+    select, func, cast, case, and_, literal, literal_column, bindparam
+)
+from sqlalchemy.dialects.postgresql import TSVECTOR, aggregate_order_by
+
+# Add the parent directory to the path to import the module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Import after adding to path
+from src.schema import (
+    SQLITE_DAILY_COUNTS_TABLE, POSTGRES_DAILY_COUNTS_TABLE, SQLITE_SEARCH_TABLE, POSTGRES_SEARCH_COLUMN
+)
+
+metadata = MetaData()
+
+SQLITE_PROJECTS = Table(
+    "HackathonProjects", metadata,
+    Column("ProjectID", Integer, primary_key=True),
+    Column("ProjectName", Text),
+    Column("TeamName", Text),
+    Column("TeamMembers", Text),
+    Column("Description", Text),
+    Column("TechStack", Text),
+    Column("RepoUrl", Text),
+    Column("DemoUrl", Text),
+    Column("Track", Text),
+    Column("Prize", Text),
+    Column("JudgesScore", Float),
+    Column("HackathonName", Text),
+    # ISO 8601 text, so day bounds compare as strings
+    Column("CompletedAt", Text),
+    Column("CreatedAt", Text),
+)
+
+POSTGRES_PROJECTS = Table(
+    "Project", metadata,
+    Column("id", String, primary_key=True),
+    Column("title", Text),
+    Column("preview", Text),
+    Column("description", Text),
+    Column("githubUrl", Text),
+    Column("demoUrl", Text),
+    Column("status", String),
+    Column("createdAt", DateTime),
+    Column(POSTGRES_SEARCH_COLUMN, TSVECTOR),
+)
+
+SQLITE_DAILY_COUNTS = Table(
+    SQLITE_DAILY_COUNTS_TABLE, metadata,
+    Column("ProjectDate", Text, primary_key=True),
+    Column("ProjectCount", Integer),
+)
+
+POSTGRES_DAILY_COUNTS = Table(
+    POSTGRES_DAILY_COUNTS_TABLE, metadata,
+    Column("projectDate", Date, primary_key=True),
+    Column("projectCount", Integer),
+)
+
+# FTS5 virtual table; its rowid is the project's ProjectID
+SQLITE_SEARCH = Table(
+    SQLITE_SEARCH_TABLE, metadata,
+    Column("rowid", Integer, primary_key=True),
+)
+
+
+class ProjectSchema:
+    """
+    One backend's project tables and its mapping to the canonical column names.
+    """
+
+    def __init__(self, name, table, columns, daily_counts, daily_counts_columns):
+        """
+        Args:
+            name: Backend name ('sqlite' or 'postgresql')
+            table: Project Table
+            columns: Dictionary mapping canonical column names to the table's column names
+            daily_counts: Rollup Table of per-day project counts
+            daily_counts_columns: (date column, count column) names of the rollup table
+        """
+        self.name = name
+        self.table = table
+        self.columns = columns
+        self.daily_counts = daily_counts
+        self.daily_counts_date, self.daily_counts_count = (daily_counts.c[c] for c in daily_counts_columns)
+
+    def column(self, canonical_name):
+        """
+        Get the table column for a canonical column name.
+        """
+        return self.table.c[self.columns[canonical_name]]
+
+    def has_column(self, canonical_name):
+        """
+        Check whether the backend has a column for a canonical column name (e.g. only SQLite has 'track').
+        """
+        return canonical_name in self.columns
+
+    def canonical_columns(self):
+        """
+        Get every mapped column, labelled with its canonical name.
+        """
+        return [self.table.c[column].label(name) for name, column in self.columns.items()]
+
+    def day_start(self, date_str):
+        """
+        Get the bound value for the start of a day (YYYY-MM-DD) compared against createdAt.
+        """
+        if self.name == 'sqlite':
+            return date_str
+        return datetime.strptime(date_str, "%Y-%m-%d")
+
+    def day_end(self, date_str):
+        """
+        Get the bound value for the start of the day after a date (exclusive upper bound).
+        """
+        next_day = datetime.strptime(date_str, "%Y-%m-%d") + timedelta(days=1)
+        return next_day.strftime("%Y-%m-%d") if self.name == 'sqlite' else next_day
+
+    def rollup_day(self, date_str):
+        """
+        Get the bound value for a day compared against the rollup table's date column.
+        """
+        if self.name == 'sqlite':
+            return date_str
+        return datetime.strptime(date_str, "%Y-%m-%d").date()
+
+
+SQLITE = ProjectSchema(
+    'sqlite', SQLITE_PROJECTS,
+    {
+        'id': 'ProjectID',
+        'title': 'ProjectName',
+        'description': 'Description',
+        'githubUrl': 'RepoUrl',
+        'demoUrl': 'DemoUrl',
+        'teamName': 'TeamName',
+        'teamMembers': 'TeamMembers',
+        'techStack': 'TechStack',
+        'track': 'Track',
+        'prize': 'Prize',
+        'judgesScore': 'JudgesScore',
+        'hackathonName': 'HackathonName',
+        'createdAt': 'CompletedAt',
+    },
+    SQLITE_DAILY_COUNTS, ("ProjectDate", "ProjectCount")
+)
+
+POSTGRES = ProjectSchema(
+    'postgresql', POSTGRES_PROJECTS,
+    {
+        'id': 'id',
+        'title': 'title',
+        'preview': 'preview',
+        'description': 'description',
+        'githubUrl': 'githubUrl',
+        'demoUrl': 'demoUrl',
+        'status': 'status',
+        'createdAt': 'createdAt',
+    },
+    POSTGRES_DAILY_COUNTS, ("projectDate", "projectCount")
+)
+
+SCHEMAS = {schema.name: schema for schema in (SQLITE, POSTGRES)}
+
+
+def project_schema(db):
+    """
+    Get the ProjectSchema for a DBConnector (or AsyncDBConnector).
+    """
+    return SCHEMAS['sqlite' if getattr(db, 'db_type', 'postgresql') == 'sqlite' else 'postgresql']
+
+
+def day_params(schema, date_str):
+    """
+    Get the bound parameters selecting the projects created on a date.
+
+    Args:
+        schema: ProjectSchema of the backend
+        date_str: Validated date string in YYYY-MM-DD format
+
+    Returns:
+        Dictionary with 'day_start' and 'day_end'
+    """
+    return {'day_start': schema.day_start(date_str), 'day_end': schema.day_end(date_str)}
+
+
+@lru_cache(maxsize=None)
+def projects_by_date_statement(backend):
+    """
+    Select the projects created in [day_start, day_end), oldest first (see day_params).
+
+    Args:
+        backend: 'sqlite' or 'postgresql'
+    """
+    schema = SCHEMAS[backend]
+    created_at = schema.column('createdAt')
+    return (
+        select(*schema.canonical_columns())
+        .where(created_at >= bindparam('day_start'), created_at < bindparam('day_end'))
+        .order_by(created_at)
+    )
+
+
+@lru_cache(maxsize=None)
+def track_counts_statement(backend):
+    """
+    Select per-track counts ('track', 'project_count', 'average_score') for [day_start, day_end),
+    largest track first. Projects without a track are left out.
+
+    Only for backends with a 'track' column (see ProjectSchema.has_column).
+
+    Args:
+        backend: 'sqlite' or 'postgresql'
+    """
+    schema = SCHEMAS[backend]
+    created_at = schema.column('createdAt')
+    track = schema.column('track')
+    return (
+        select(track.label('track'), func.count().label('project_count'),
+               func.avg(schema.column('judgesScore')).label('average_score'))
+        .where(created_at >= bindparam('day_start'), created_at < bindparam('day_end'), track.is_not(None))
+        .group_by(track)
+        .order_by(func.count().desc(), track)
+    )
+
+
+def _is_prize_winner(schema):
+    prize = schema.column('prize')
+    return and_(prize.is_not(None), prize != '')
+
+
+@lru_cache(maxsize=None)
+def prize_winners_statement(backend):
+    """
+    Select the prize winners ('title', 'track', 'prize', 'judgesScore') in [day_start, day_end),
+    best score first, up to the bound 'limit'.
+
+    Only for backends with a 'prize' column (see ProjectSchema.has_column).
+
+    Args:
+        backend: 'sqlite' or 'postgresql'
+    """
+    schema = SCHEMAS[backend]
+    created_at = schema.column('createdAt')
+    columns = [schema.column(name).label(name) for name in ('title', 'track', 'prize', 'judgesScore')]
+    return (
+        select(*columns)
+        .where(created_at >= bindparam('day_start'), created_at < bindparam('day_end'), _is_prize_winner(schema))
+        .order_by(schema.column('judgesScore').desc(), created_at)
+        .limit(bindparam('limit'))
+    )
+
+
+@lru_cache(maxsize=None)
+def highlighted_projects_statement(backend):
+    """
+    Select the full rows of a period's highlighted projects in [day_start, day_end), up to the bound 'limit'.
+
+    Prize winners come first, then the highest judges' scores. Backends without prizes
+    and scores (PostgreSQL) highlight the latest projects instead.
+
+    Args:
+        backend: 'sqlite' or 'postgresql'
+    """
+    schema = SCHEMAS[backend]
+    created_at = schema.column('createdAt')
+    if schema.has_column('prize') and schema.has_column('judgesScore'):
+        order = (case((_is_prize_winner(schema), 1), else_=0).desc(), schema.column('judgesScore').desc(), created_at)
+    else:
+        order = (created_at.desc(),)
+    return (
+        select(*schema.canonical_columns())
+        .where(created_at >= bindparam('day_start'), created_at < bindparam('day_end'))
+        .order_by(*order)
+        .limit(bindparam('limit'))
+    )
+
+
+@lru_cache(maxsize=None)
+def daily_counts_statement(backend, use_rollup, has_start, has_end):
+    """
+    Select per-day project counts ('date', 'project_count'), ordered by date.
+
+    Bounds are bound as 'start_date' and 'end_date' (both inclusive): use
+    ProjectSchema.rollup_day for the rollup table, and day_start/day_end for the
+    GROUP BY over the project table.
+
+    Args:
+        backend: 'sqlite' or 'postgresql'
+        use_rollup: If True, read the rollup table instead of grouping the project table
+        has_start: Whether a 'start_date' bound is given
+        has_end: Whether an 'end_date' bound is given
+    """
+    schema = SCHEMAS[backend]
+
+    if use_rollup:
+        day = schema.daily_counts_date
+        statement = select(day.label('date'), schema.daily_counts_count.label('project_count'))
+        if has_start:
+            statement = statement.where(day >= bindparam('start_date'))
+        if has_end:
+            statement = statement.where(day <= bindparam('end_date'))
+        return statement.order_by(day)
+
+    created_at = schema.column('createdAt')
+    day = func.date(created_at)
+    statement = select(day.label('date'), func.count().label('project_count'))
+    if has_start:
+        statement = statement.where(created_at >= bindparam('start_date'))
+    if has_end:
+        statement = statement.where(created_at < bindparam('end_date'))
+    return statement.group_by(day).order_by(day)
+
+
+@lru_cache(maxsize=None)
+def fingerprint_statement(backend):
+    """
+    Select (row count, latest createdAt, checksum of every row) for [day_start, day_end).
+
+    Args:
+        backend: 'sqlite' or 'postgresql'
+    """
+    schema = SCHEMAS[backend]
+    table = schema.table
+    created_at = schema.column('createdAt')
+
+    if backend == 'sqlite':
+        # crc32 is registered on SQLite connections by DBConnector
+        row_text = None
+        for column in schema.columns.values():
+            value = func.coalesce(cast(table.c[column], String), '')
+            row_text = value if row_text is None else row_text + literal('|') + value
+        checksum = cast(func.coalesce(func.sum(func.crc32(row_text)), 0), Text)
+    else:
+        # Whole-row text, so columns outside the canonical mapping count as well
+        row_hash = func.md5(cast(table.table_valued(), Text))
+        checksum = func.md5(func.coalesce(func.string_agg(row_hash, aggregate_order_by(literal(''), table.c.id)), ''))
+
+    return (
+        select(func.count(), func.max(created_at), checksum)
+        .where(created_at >= bindparam('day_start'), created_at < bindparam('day_end'))
+    )
+
+
+@lru_cache(maxsize=None)
+def search_statement(backend, has_start, has_end):
+    """
+    Full-text search ranked by relevance (best first), with a 'rank' column.
+
+    Binds 'query' (an FTS5 MATCH expression on SQLite, web search syntax on PostgreSQL),
+    'limit' and optionally 'start_date'/'end_date' (ProjectSchema.day_start/day_end values).
+
+    Args:
+        backend: 'sqlite' or 'postgresql'
+        has_start: Whether a 'start_date' bound is given
+        has_end: Whether an 'end_date' bound is given
+    """
+    schema = SCHEMAS[backend]
+    created_at = schema.column('createdAt')
+
+    if backend == 'sqlite':
+        search_table = literal_column(SQLITE_SEARCH_TABLE)
+        # Column weights: title, description, tech stack, track
+        rank = func.bm25(search_table, 10.0, 5.0, 3.0, 1.0).label('rank')
+        statement = (
+            select(*schema.canonical_columns(), rank)
+            .select_from(SQLITE_SEARCH.join(schema.table, schema.column('id') == SQLITE_SEARCH.c.rowid))
+            .where(search_table.op('MATCH')(bindparam('query')))
+            .order_by(rank)
+        )
+    else:
+        search_vector = schema.table.c[POSTGRES_SEARCH_COLUMN]
+        ts_query = func.websearch_to_tsquery('english', bindparam('query'))
+        rank = func.ts_rank_cd(search_vector, ts_query).label('rank')
+        statement = (
+            select(*schema.canonical_columns(), rank)
+            .where(search_vector.op('@@')(ts_query))
+            .order_by(rank.desc())
+        )
+
+    if has_start:
+        statement = statement.where(created_at >= bindparam('start_date'))
+    if has_end:
+        statement = statement.where(created_at < bindparam('end_date'))
+    return statement.limit(bindparam('limit'))
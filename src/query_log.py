@@ -0,0 +1,226 @@
+"""
+Slow-query log for the database connectors.
+
+install_query_log(engine) adds cursor-execute hooks that time every statement the engine
+sends to the driver (recorded in sundai_db_statement_duration_seconds).
+Statements slower than SLOW_QUERY_SECONDS are appended to a JSONL log with their
+query plan (EXPLAIN QUERY PLAN on SQLite, EXPLAIN on PostgreSQL) and the pool's
+status. Comparing a logged statement's time with the whole fetch's
+sundai_db_query_duration_seconds shows whether a slow fetch was the query itself
+or the pool checkout, network and row transfer around it.
+
+Parameter values are never logged: each bound parameter is replaced by its type
+name and string literals in the SQL text by '?'.
+
+Settings (environment variables):
+  SLOW_QUERY_SECONDS        threshold for logging a statement (default: 0.5; negative disables the log)
+  SLOW_QUERY_LOG            log file (default: logs/slow_queries.jsonl in the repository root)
+  SLOW_QUERY_LOG_MAX_BYTES  size after which the log is rotated (default: 5 MB)
+  SLOW_QUERY_LOG_BACKUPS    number of rotated files kept (default: 3)
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import fcntl
+from datetime import datetime
+
+from sqlalchemy import event
+
+# Add the parent directory to the path to import the module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Import after adding to path
+from src.utils import PROJECT_ROOT
+from src.metrics import DB_STATEMENT_LATENCY, DB_SLOW_QUERIES
+
+SLOW_QUERY_SECONDS = float(os.getenv("SLOW_QUERY_SECONDS", 0.5))
+DEFAULT_LOG_PATH = os.getenv("SLOW_QUERY_LOG", os.path.join(PROJECT_ROOT, "logs", "slow_queries.jsonl"))
+DEFAULT_MAX_BYTES = int(os.getenv("SLOW_QUERY_LOG_MAX_BYTES", 5 * 1024 * 1024))
+DEFAULT_BACKUPS = int(os.getenv("SLOW_QUERY_LOG_BACKUPS", 3))
+MAX_STATEMENT_CHARS = 4000
+
+# Connection.info key of the start times of the statements running on a connection
+_START_TIMES = "query_log_start_times"
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_SAVEPOINT = "query_log_explain"
+
+
+class SlowQueryLog:
+    """
+    Size-rotated JSONL file shared by every process (appends are serialized with a lock file).
+    """
+
+    def __init__(self, path=DEFAULT_LOG_PATH, max_bytes=DEFAULT_MAX_BYTES, backups=DEFAULT_BACKUPS):
+        """
+        Args:
+            path: Log file; rotated files get the suffixes .1 (newest) to .<backups>
+            max_bytes: Size after which the file is rotated
+            backups: Number of rotated files kept
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+
+    def _rotate(self, incoming_bytes):
+        try:
+            size = os.path.getsize(self.path)
+        except FileNotFoundError:
+            return
+        if size + incoming_bytes <= self.max_bytes:
+            return
+        if self.backups <= 0:
+            os.remove(self.path)
+            return
+        for index in range(self.backups - 1, 0, -1):
+            if os.path.exists(f"{self.path}.{index}"):
+                os.replace(f"{self.path}.{index}", f"{self.path}.{index + 1}")
+        os.replace(self.path, f"{self.path}.1")
+
+    def append(self, entry):
+        """
+        Append one entry as a JSON line, rotating the file first if it would grow past max_bytes.
+        """
+        line = json.dumps(entry, default=str) + "\n"
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path + ".lock", "w") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    self._rotate(len(line))
+                    with open(self.path, "a") as f:
+                        f.write(line)
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+        except OSError as e:
+            print(f"Warning: Could not write slow query log {self.path}: {e}")
+
+
+# Shared by every engine in the process
+SLOW_QUERY_LOG = SlowQueryLog()
+
+
+def redact_statement(statement):
+    """
+    Collapse a statement's whitespace and replace its string literals with '?'.
+    """
+    statement = _STRING_LITERAL.sub("'?'", " ".join(statement.split()))
+    if len(statement) > MAX_STATEMENT_CHARS:
+        statement = statement[:MAX_STATEMENT_CHARS] + "..."
+    return statement
+
+
+def redact_parameters(parameters, executemany=False):
+    """
+    Replace bound parameter values with their type names.
+
+    Args:
+        parameters: DBAPI parameters (a dictionary or a sequence, or a list of them for executemany)
+        executemany: True if parameters holds one set per row
+
+    Returns:
+        The same structure with type names, or a count of parameter sets for executemany
+    """
+    if executemany:
+        return f"{len(parameters)} parameter sets"
+    if isinstance(parameters, dict):
+        return {key: "NULL" if value is None else type(value).__name__ for key, value in parameters.items()}
+    return ["NULL" if value is None else type(value).__name__ for value in parameters or ()]
+
+
+def _is_query(statement):
+    return statement.lstrip().split(None, 1)[0].upper() in ("SELECT", "WITH") if statement.strip() else False
+
+
+def explain(dbapi_connection, backend, statement, parameters):
+    """
+    Get the plan of a statement without running it again.
+
+    On PostgreSQL the EXPLAIN runs inside a savepoint, so a failure cannot abort the caller's transaction.
+
+    Args:
+        dbapi_connection: DBAPI connection the statement ran on
+        backend: SQLAlchemy dialect name ('sqlite' or 'postgresql')
+        statement: Statement text as sent to the driver
+        parameters: Parameters as sent to the driver
+
+    Returns:
+        List of plan lines
+    """
+    prefix = "EXPLAIN QUERY PLAN " if backend == 'sqlite' else "EXPLAIN "
+    use_savepoint = backend != 'sqlite'
+    cursor = dbapi_connection.cursor()
+    try:
+        if use_savepoint:
+            cursor.execute(f"SAVEPOINT {_SAVEPOINT}")
+        try:
+            if parameters:
+                cursor.execute(prefix + statement, parameters)
+            else:
+                cursor.execute(prefix + statement)
+            rows = cursor.fetchall()
+        except Exception:
+            if use_savepoint:
+                cursor.execute(f"ROLLBACK TO SAVEPOINT {_SAVEPOINT}")
+            raise
+        if use_savepoint:
+            cursor.execute(f"RELEASE SAVEPOINT {_SAVEPOINT}")
+    finally:
+        cursor.close()
+    # SQLite rows are (id, parent, notused, detail); PostgreSQL rows hold one line of text
+    return [str(row[-1]) if backend == 'sqlite' else str(row[0]) for row in rows]
+
+
+def install_query_log(engine, threshold=None, log=None):
+    """
+    Time every statement an engine runs and log the slow ones.
+
+    Args:
+        engine: SQLAlchemy Engine (for an AsyncEngine, pass its sync_engine)
+        threshold: Seconds after which a statement is logged (default: SLOW_QUERY_SECONDS;
+            negative only records the latency metric)
+        log: SlowQueryLog (default: the shared SLOW_QUERY_LOG)
+    """
+    threshold = SLOW_QUERY_SECONDS if threshold is None else threshold
+    log = log or SLOW_QUERY_LOG
+    backend = engine.dialect.name
+    database = engine.url.render_as_string(hide_password=True)
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault(_START_TIMES, []).append(time.perf_counter())
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        seconds = time.perf_counter() - conn.info[_START_TIMES].pop()
+        DB_STATEMENT_LATENCY.observe(seconds, backend=backend)
+        if threshold < 0 or seconds < threshold:
+            return
+        DB_SLOW_QUERIES.inc(backend=backend)
+
+        entry = {
+            'time': datetime.now().isoformat(timespec='seconds'),
+            'pid': os.getpid(),
+            'backend': backend,
+            'database': database,
+            'seconds': round(seconds, 4),
+            'statement': redact_statement(statement),
+            'parameters': redact_parameters(parameters, executemany),
+            'pool': engine.pool.status()
+        }
+        if not executemany and _is_query(statement):
+            try:
+                entry['plan'] = explain(conn.connection.dbapi_connection, backend, statement, parameters)
+            except Exception as e:
+                entry['plan_error'] = str(e).splitlines()[0] if str(e) else type(e).__name__
+        log.append(entry)
+
+    def handle_error(context):
+        # The failed statement never reaches after_cursor_execute
+        start_times = context.connection.info.get(_START_TIMES) if context.connection is not None else None
+        if start_times:
+            start_times.pop()
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", after_cursor_execute)
+    event.listen(engine, "handle_error", handle_error)
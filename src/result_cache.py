@@ -0,0 +1,194 @@
+"""
+Read-through cache of per-date project pulls.
+
+A past date's projects essentially never change, so its pull is kept for a long
+time; today's (and future dates') pulls expire quickly because projects are still
+being added. Entries live in a small in-process LRU and on disk as zlib-compressed
+pickles of the DataFrame, one file per date, with the least recently used files
+removed once the directory grows past its size limit. A hit on either level
+skips the database connection entirely.
+
+Callers that know the date's current data fingerprint (see
+data_pull.get_date_fingerprint) can pass it to make an entry count only if it was
+stored for the same data.
+"""
+
+import os
+import sys
+import time
+import zlib
+import pickle
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+# Add the parent directory to the path to import the module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Import after adding to path
+from src.utils import PROJECT_ROOT, write_bytes_atomic
+
+DEFAULT_CACHE_DIR = os.getenv("RESULT_CACHE_DIR", os.path.join(PROJECT_ROOT, "cache", "projects"))
+DEFAULT_MAX_BYTES = int(os.getenv("RESULT_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+DEFAULT_MAX_ENTRIES = 64
+
+# Seconds an entry stays valid: past dates are effectively immutable
+PAST_DATE_TTL = 30 * 24 * 3600
+RECENT_DATE_TTL = 300
+
+# Bump when the cached frame's shape changes (e.g. the selected columns)
+CACHE_VERSION = "1"
+
+
+def ttl_for_date(date_str, now=None):
+    """
+    Get the time to live in seconds for a date's entry: long for past dates, short otherwise.
+    """
+    today = (now or datetime.now()).strftime("%Y-%m-%d")
+    return PAST_DATE_TTL if date_str < today else RECENT_DATE_TTL
+
+
+class ResultCache:
+    """
+    Two-level (memory, then disk) LRU cache of DataFrames keyed by source and date.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES):
+        """
+        Args:
+            cache_dir: Directory of the on-disk entries, or None to cache in memory only
+            max_entries: Maximum number of entries kept in memory
+            max_bytes: Maximum total size of the on-disk entries
+        """
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(source, date_str, compact_dtypes=False):
+        """
+        Build the entry key for a date pulled from a source (e.g. the database URL without credentials).
+
+        Frames pulled with compact dtypes (see compact_frames) are kept apart from default ones,
+        so each caller gets back the dtypes it asked for.
+        """
+        mode = "compact" if compact_dtypes else "default"
+        digest = hashlib.sha1(f"{CACHE_VERSION}|{source}|{mode}".encode()).hexdigest()[:12]
+        return f"{date_str}_{digest}"
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.pkl.z")
+
+    def get(self, key, fingerprint=None):
+        """
+        Look up an entry.
+
+        Args:
+            key: Entry key from ResultCache.key
+            fingerprint: If given, only an entry stored with the same fingerprint counts
+
+        Returns:
+            A copy of the cached DataFrame, or None on a miss
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+
+        if entry is None and self.cache_dir:
+            entry = self._read(key)
+            if entry is not None:
+                self._remember(key, entry)
+
+        if entry is None or entry['expires_at'] <= now:
+            return None
+        if fingerprint is not None and entry.get('fingerprint') != fingerprint:
+            return None
+        return entry['frame'].copy()
+
+    def put(self, key, frame, ttl, fingerprint=None):
+        """
+        Store an entry in memory and on disk.
+
+        Args:
+            key: Entry key from ResultCache.key
+            frame: DataFrame to cache
+            ttl: Seconds the entry stays valid
+            fingerprint: Optional data fingerprint the frame was pulled at
+        """
+        entry = {
+            'frame': frame.copy(),
+            'fingerprint': fingerprint,
+            'stored_at': time.time(),
+            'expires_at': time.time() + ttl
+        }
+        self._remember(key, entry)
+
+        if self.cache_dir:
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                data = zlib.compress(pickle.dumps(entry, protocol=pickle.HIGHEST_PROTOCOL))
+                write_bytes_atomic(self._path(key), data)
+                self._evict_files()
+            except OSError as e:
+                print(f"Warning: Could not write result cache entry {key}: {e}")
+
+    def invalidate(self, key):
+        """
+        Drop an entry from both levels.
+        """
+        with self._lock:
+            self._memory.pop(key, None)
+        if self.cache_dir:
+            try:
+                os.remove(self._path(key))
+            except FileNotFoundError:
+                pass
+
+    def _remember(self, key, entry):
+        with self._lock:
+            self._memory[key] = entry
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def _read(self, key):
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                entry = pickle.loads(zlib.decompress(f.read()))
+            # The modification time orders files for LRU eviction
+            os.utime(path)
+            return entry
+        except FileNotFoundError:
+            return None
+        except (OSError, zlib.error, pickle.UnpicklingError, EOFError, AttributeError) as e:
+            print(f"Warning: Ignoring unreadable result cache entry {path}: {e}")
+            return None
+
+    def _evict_files(self):
+        """
+        Delete the least recently used files until the directory fits in max_bytes.
+        """
+        files = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file() and entry.name.endswith(".pkl.z"):
+                stat = entry.stat()
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except FileNotFoundError:
+                pass
+
+
+# Shared by every pull in the process
+PROJECTS_CACHE = ResultCache()
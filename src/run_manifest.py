@@ -0,0 +1,118 @@
+"""
+Per-date run manifests for skipping work when nothing has changed.
+
+A manifest records the fingerprint of everything a post depends on (the day's
+rows, the prompt template version and the model) together with the artifacts
+the run produced. When a later run computes the same fingerprint and the
+artifacts still exist, it reuses them instead of pulling data and calling the LLM.
+"""
+
+import os
+import sys
+import json
+from datetime import datetime
+
+# Add the parent directory to the path to import the module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Import after adding to path
+from src.utils import PROJECT_ROOT, write_text_atomic
+
+DEFAULT_MANIFEST_DIR = os.getenv("RUN_MANIFEST_DIR", os.path.join(PROJECT_ROOT, "manifests"))
+
+
+def build_fingerprint(data_fingerprint, prompt_version, model, **options):
+    """
+    Combine the data fingerprint with the generation settings that affect the output.
+
+    Args:
+        data_fingerprint: Dictionary from data_pull.get_date_fingerprint
+        prompt_version: Version of the prompt template
+        model: Model name, or 'mock' for mock posts
+        **options: Other settings that change the generated post (e.g. max_projects)
+
+    Returns:
+        Fingerprint dictionary
+    """
+    return {**data_fingerprint, 'prompt_version': prompt_version, 'model': model, **options}
+
+
+def manifest_path(key, manifest_dir=DEFAULT_MANIFEST_DIR):
+    """
+    Get the manifest file path for a run key (e.g. '2025_08_25').
+    """
+    return os.path.join(manifest_dir, f"{key}.json")
+
+
+def load_manifest(key, manifest_dir=DEFAULT_MANIFEST_DIR):
+    """
+    Load the manifest for a run key.
+
+    Args:
+        key: Run key, e.g. the date with underscores
+        manifest_dir: Directory containing the manifests
+
+    Returns:
+        Manifest dictionary, or None if there is no readable manifest
+    """
+    path = manifest_path(key, manifest_dir)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Error reading run manifest {path}: {e}")
+        return None
+
+
+def save_manifest(key, fingerprint, artifacts, manifest_dir=DEFAULT_MANIFEST_DIR):
+    """
+    Record the fingerprint and artifacts of a completed run.
+
+    Args:
+        key: Run key, e.g. the date with underscores
+        fingerprint: Fingerprint dictionary from build_fingerprint
+        artifacts: Dictionary mapping artifact names ('post', 'csv') to file paths
+        manifest_dir: Directory containing the manifests
+    """
+    os.makedirs(manifest_dir, exist_ok=True)
+    manifest = {
+        'fingerprint': fingerprint,
+        'artifacts': {name: os.path.abspath(path) for name, path in artifacts.items() if path},
+        'generated_at': datetime.now().isoformat(timespec='seconds')
+    }
+    write_text_atomic(manifest_path(key, manifest_dir), json.dumps(manifest, indent=2, sort_keys=True))
+
+
+def remove_manifest(key, manifest_dir=DEFAULT_MANIFEST_DIR):
+    """
+    Delete the manifest for a run key, e.g. after its artifacts were replaced by a fallback.
+
+    Args:
+        key: Run key, e.g. the date with underscores
+        manifest_dir: Directory containing the manifests
+    """
+    try:
+        os.remove(manifest_path(key, manifest_dir))
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        print(f"Error removing run manifest {manifest_path(key, manifest_dir)}: {e}")
+
+
+def is_up_to_date(manifest, fingerprint):
+    """
+    Check whether a manifest's artifacts can be reused for a fingerprint.
+
+    Args:
+        manifest: Manifest dictionary from load_manifest (or None)
+        fingerprint: Current fingerprint dictionary
+
+    Returns:
+        bool: True if the fingerprints match and every recorded artifact still exists
+    """
+    if not manifest or fingerprint is None or manifest.get('fingerprint') != fingerprint:
+        return False
+    artifacts = manifest.get('artifacts', {})
+    return 'post' in artifacts and all(os.path.exists(path) for path in artifacts.values())
@@ -0,0 +1,192 @@
+"""
+Keep today's draft post generated ahead of time so the web UI can show it immediately.
+
+Every poll the scheduler fingerprints today's projects with one aggregate query. It
+runs the main.py pipeline (in dry-run mode, so nothing is published) when the
+projects changed since the draft was generated, or when the draft is older than
+the regeneration interval. main.py writes the draft to drafts/YYYY_MM_DD.json.
+
+Usage:
+  python scheduler.py --poll 60 --interval 3600
+  python scheduler.py --once   # a single check, e.g. from cron
+"""
+
+import os
+import sys
+import time
+import argparse
+import subprocess
+from datetime import datetime
+
+from dotenv import load_dotenv
+
+# Add the parent directory to the path to import the module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Import after adding to path
+from src.data_pull import get_date_fingerprint
+from src.drafts import load_draft
+
+load_dotenv()
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+MAIN_SCRIPT = os.path.join(SRC_DIR, "main.py")
+
+
+def draft_age(draft):
+    """
+    Get the age of a draft in seconds, or None if it has no valid timestamp.
+    """
+    try:
+        return (datetime.now() - datetime.fromisoformat(draft['generated_at'])).total_seconds()
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def needs_regeneration(draft, data_fingerprint, interval):
+    """
+    Decide whether a date's draft must be regenerated.
+
+    Args:
+        draft: Draft dictionary from drafts.load_draft (or None)
+        data_fingerprint: Current dictionary from data_pull.get_date_fingerprint
+        interval: Maximum draft age in seconds, or None/0 to regenerate only on changes
+
+    Returns:
+        Reason string ('missing', 'changed' or 'stale'), or None if the draft is current
+    """
+    if draft is None:
+        return "missing"
+    if draft.get('data_fingerprint') != data_fingerprint:
+        return "changed"
+    age = draft_age(draft)
+    if interval and (age is None or age >= interval):
+        return "stale"
+    return None
+
+
+def run_pipeline(date_str, force=False, extra_args=()):
+    """
+    Generate the draft for a date by running main.py in dry-run mode.
+
+    Args:
+        date_str: Date string in YYYY-MM-DD format
+        force: If True, regenerate even if the run manifest says nothing changed
+        extra_args: Additional main.py arguments (e.g. '--mock')
+
+    Returns:
+        bool: True if the pipeline succeeded
+    """
+    command = [sys.executable, MAIN_SCRIPT, '--date', date_str, '--dry-run', *extra_args]
+    if force:
+        command.append('--force')
+    # main.py resolves its output paths relative to the src directory
+    result = subprocess.run(command, cwd=SRC_DIR, capture_output=True, text=True)
+    if result.returncode != 0:
+        print(f"Pipeline failed for {date_str} (exit code {result.returncode}):")
+        print((result.stdout + result.stderr).strip()[-2000:])
+        return False
+    return True
+
+
+def check_date(date_str, interval, extra_args=()):
+    """
+    Regenerate a date's draft if it is missing, out of date or stale.
+
+    Args:
+        date_str: Date string in YYYY-MM-DD format
+        interval: Maximum draft age in seconds, or None/0 to regenerate only on changes
+        extra_args: Additional main.py arguments
+
+    Returns:
+        bool: False if the check or the regeneration failed
+    """
+    data_fingerprint = get_date_fingerprint(date_str)
+    if data_fingerprint is None:
+        print(f"[{datetime.now():%H:%M:%S}] Could not fingerprint {date_str}; will retry.")
+        return False
+    if data_fingerprint['row_count'] == 0:
+        return True
+
+    reason = needs_regeneration(load_draft(date_str), data_fingerprint, interval)
+    if reason is None:
+        return True
+
+    print(f"[{datetime.now():%H:%M:%S}] Regenerating draft for {date_str} "
+          f"({reason}, {data_fingerprint['row_count']} projects)...")
+    start = time.monotonic()
+    # Stale drafts have unchanged inputs, so the run manifest would just reuse them
+    succeeded = run_pipeline(date_str, force=(reason == "stale"), extra_args=extra_args)
+    if succeeded:
+        print(f"[{datetime.now():%H:%M:%S}] Draft for {date_str} ready in {time.monotonic() - start:.1f}s.")
+    return succeeded
+
+
+def main():
+    """
+    Command-line interface for the draft scheduler.
+    """
+    parser = argparse.ArgumentParser(description="Pre-generate today's LinkedIn post draft")
+    parser.add_argument('--poll', type=float, default=60,
+                        help='Seconds between checks for changed projects (default: 60)')
+    parser.add_argument('--interval', type=float, default=3600,
+                        help='Regenerate drafts older than this many seconds even if nothing changed; '
+                             '0 regenerates only on changes (default: 3600)')
+    parser.add_argument('--once', action='store_true',
+                        help='Check once and exit')
+    parser.add_argument('--date', type=str, default=None,
+                        help='Keep the draft for this date (YYYY-MM-DD) instead of the current day')
+    parser.add_argument('--max-projects', type=int, default=20,
+                        help='Maximum number of projects to include in the summary (default: 20)')
+    parser.add_argument('--mock', action='store_true',
+                        help='Generate mock posts without using the OpenAI API')
+    parser.add_argument('--compress', action='store_true',
+                        help='Compress project descriptions to their key sentences to shorten the prompt')
+    parser.add_argument('--no-themes', action='store_true',
+                        help='List projects in creation order instead of grouping them by theme')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Compose posts from cached per-project blurbs, writing blurbs only for new projects')
+    parser.add_argument('--use-sqlite', action='store_true',
+                        help='Use SQLite database instead of PostgreSQL')
+    parser.add_argument('--sqlite-path', type=str, default='../hackathon_projects.db',
+                        help='Path to SQLite database file (default: ../hackathon_projects.db)')
+    args = parser.parse_args()
+
+    if args.date:
+        try:
+            datetime.strptime(args.date, "%Y-%m-%d")
+        except ValueError:
+            print(f"Error: Invalid date format '{args.date}'. Please use YYYY-MM-DD format.")
+            return 1
+
+    if args.use_sqlite:
+        # Inherited by the main.py processes as well
+        os.environ["USE_SQLITE"] = "true"
+        os.environ["SQLITE_PATH"] = os.path.abspath(args.sqlite_path)
+
+    extra_args = ['--max-projects', str(args.max_projects)]
+    if args.mock:
+        extra_args.append('--mock')
+    if args.compress:
+        extra_args.append('--compress')
+    if args.no_themes:
+        extra_args.append('--no-themes')
+    if args.incremental:
+        extra_args.append('--incremental')
+
+    if args.once:
+        return 0 if check_date(args.date or datetime.now().strftime("%Y-%m-%d"), args.interval, extra_args) else 1
+
+    print(f"Checking drafts every {args.poll:.0f}s (regenerating after {args.interval:.0f}s). Press Ctrl+C to stop.")
+    try:
+        while True:
+            # Re-evaluated every poll so the scheduler moves on at midnight
+            check_date(args.date or datetime.now().strftime("%Y-%m-%d"), args.interval, extra_args)
+            time.sleep(args.poll)
+    except KeyboardInterrupt:
+        print("\nScheduler stopped.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
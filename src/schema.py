@@ -0,0 +1,279 @@
+"""
+DDL for derived structures maintained alongside the project tables.
+
+The statements here are idempotent and can be applied by the seeding scripts
+or from the command line:
+  python schema.py --use-sqlite --sqlite-path ../hackathon_projects.db
+"""
+
+import os
+import sys
+import argparse
+
+# Add the parent directory to the path to import the module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Per-day project counts, kept up to date by triggers on the base table
+SQLITE_DAILY_COUNTS_TABLE = "HackathonProjectsDailyCounts"
+POSTGRES_DAILY_COUNTS_TABLE = "ProjectDailyCounts"
+
+SQLITE_DAILY_COUNTS_DDL = [
+    """
+    CREATE TABLE IF NOT EXISTS HackathonProjectsDailyCounts (
+        ProjectDate    TEXT    PRIMARY KEY,
+        ProjectCount   INTEGER NOT NULL DEFAULT 0
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS TR_HackathonProjects_DailyCounts_Insert
+    AFTER INSERT ON HackathonProjects
+    BEGIN
+        INSERT INTO HackathonProjectsDailyCounts (ProjectDate, ProjectCount)
+        VALUES (date(NEW.CompletedAt), 1)
+        ON CONFLICT(ProjectDate) DO UPDATE SET ProjectCount = ProjectCount + 1;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS TR_HackathonProjects_DailyCounts_Delete
+    AFTER DELETE ON HackathonProjects
+    BEGIN
+        UPDATE HackathonProjectsDailyCounts
+        SET ProjectCount = ProjectCount - 1
+        WHERE ProjectDate = date(OLD.CompletedAt);
+        DELETE FROM HackathonProjectsDailyCounts
+        WHERE ProjectDate = date(OLD.CompletedAt) AND ProjectCount <= 0;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS TR_HackathonProjects_DailyCounts_Update
+    AFTER UPDATE OF CompletedAt ON HackathonProjects
+    WHEN date(OLD.CompletedAt) IS NOT date(NEW.CompletedAt)
+    BEGIN
+        UPDATE HackathonProjectsDailyCounts
+        SET ProjectCount = ProjectCount - 1
+        WHERE ProjectDate = date(OLD.CompletedAt);
+        DELETE FROM HackathonProjectsDailyCounts
+        WHERE ProjectDate = date(OLD.CompletedAt) AND ProjectCount <= 0;
+        INSERT INTO HackathonProjectsDailyCounts (ProjectDate, ProjectCount)
+        VALUES (date(NEW.CompletedAt), 1)
+        ON CONFLICT(ProjectDate) DO UPDATE SET ProjectCount = ProjectCount + 1;
+    END
+    """,
+    # Rebuild from the base table so rows inserted before the triggers existed are counted
+    "DELETE FROM HackathonProjectsDailyCounts",
+    """
+    INSERT INTO HackathonProjectsDailyCounts (ProjectDate, ProjectCount)
+    SELECT date(CompletedAt), COUNT(*)
+    FROM HackathonProjects
+    GROUP BY date(CompletedAt)
+    """,
+]
+
+POSTGRES_DAILY_COUNTS_DDL = [
+    """
+    CREATE TABLE IF NOT EXISTS "ProjectDailyCounts" (
+        "projectDate"  date    PRIMARY KEY,
+        "projectCount" integer NOT NULL DEFAULT 0
+    )
+    """,
+    """
+    CREATE OR REPLACE FUNCTION project_daily_counts_sync() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP IN ('DELETE', 'UPDATE') THEN
+            UPDATE "ProjectDailyCounts"
+            SET "projectCount" = "projectCount" - 1
+            WHERE "projectDate" = DATE(OLD."createdAt");
+            DELETE FROM "ProjectDailyCounts"
+            WHERE "projectDate" = DATE(OLD."createdAt") AND "projectCount" <= 0;
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            INSERT INTO "ProjectDailyCounts" ("projectDate", "projectCount")
+            VALUES (DATE(NEW."createdAt"), 1)
+            ON CONFLICT ("projectDate")
+            DO UPDATE SET "projectCount" = "ProjectDailyCounts"."projectCount" + 1;
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    'DROP TRIGGER IF EXISTS project_daily_counts_sync ON "Project"',
+    """
+    CREATE TRIGGER project_daily_counts_sync
+    AFTER INSERT OR DELETE OR UPDATE OF "createdAt" ON "Project"
+    FOR EACH ROW EXECUTE FUNCTION project_daily_counts_sync()
+    """,
+    'DELETE FROM "ProjectDailyCounts"',
+    """
+    INSERT INTO "ProjectDailyCounts" ("projectDate", "projectCount")
+    SELECT DATE("createdAt"), COUNT(*)
+    FROM "Project"
+    GROUP BY DATE("createdAt")
+    """,
+]
+
+
+# Full-text search index over project text, kept in sync with the base table
+SQLITE_SEARCH_TABLE = "HackathonProjectsFTS"
+POSTGRES_SEARCH_COLUMN = "searchVector"
+
+SQLITE_SEARCH_INDEX_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS HackathonProjectsFTS USING fts5(
+        ProjectName,
+        Description,
+        TechStack,
+        Track,
+        content='HackathonProjects',
+        content_rowid='ProjectID',
+        tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS TR_HackathonProjects_FTS_Insert
+    AFTER INSERT ON HackathonProjects
+    BEGIN
+        INSERT INTO HackathonProjectsFTS (rowid, ProjectName, Description, TechStack, Track)
+        VALUES (NEW.ProjectID, NEW.ProjectName, NEW.Description, NEW.TechStack, NEW.Track);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS TR_HackathonProjects_FTS_Delete
+    AFTER DELETE ON HackathonProjects
+    BEGIN
+        INSERT INTO HackathonProjectsFTS (HackathonProjectsFTS, rowid, ProjectName, Description, TechStack, Track)
+        VALUES ('delete', OLD.ProjectID, OLD.ProjectName, OLD.Description, OLD.TechStack, OLD.Track);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS TR_HackathonProjects_FTS_Update
+    AFTER UPDATE OF ProjectName, Description, TechStack, Track ON HackathonProjects
+    BEGIN
+        INSERT INTO HackathonProjectsFTS (HackathonProjectsFTS, rowid, ProjectName, Description, TechStack, Track)
+        VALUES ('delete', OLD.ProjectID, OLD.ProjectName, OLD.Description, OLD.TechStack, OLD.Track);
+        INSERT INTO HackathonProjectsFTS (rowid, ProjectName, Description, TechStack, Track)
+        VALUES (NEW.ProjectID, NEW.ProjectName, NEW.Description, NEW.TechStack, NEW.Track);
+    END
+    """,
+    # Index rows that existed before the triggers
+    "INSERT INTO HackathonProjectsFTS (HackathonProjectsFTS) VALUES ('rebuild')",
+]
+
+POSTGRES_SEARCH_INDEX_DDL = [
+    """
+    ALTER TABLE "Project" ADD COLUMN IF NOT EXISTS "searchVector" tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce("title", '')), 'A') ||
+        setweight(to_tsvector('english', coalesce("preview", '')), 'B') ||
+        setweight(to_tsvector('english', coalesce("description", '')), 'C')
+    ) STORED
+    """,
+    'CREATE INDEX IF NOT EXISTS "Project_searchVector_idx" ON "Project" USING GIN ("searchVector")',
+]
+
+def daily_counts_table(db):
+    """
+    Get the name of the daily-count rollup table for a connector's backend.
+
+    Args:
+        db: DBConnector instance
+
+    Returns:
+        Rollup table name
+    """
+    if getattr(db, 'db_type', 'postgresql') == 'sqlite':
+        return SQLITE_DAILY_COUNTS_TABLE
+    return POSTGRES_DAILY_COUNTS_TABLE
+
+
+def ensure_daily_counts(db):
+    """
+    Create (or rebuild) the daily-count rollup table and its maintenance triggers.
+
+    Args:
+        db: Connected DBConnector instance
+
+    Returns:
+        bool: True if the rollup is in place, False otherwise
+    """
+    if getattr(db, 'db_type', 'postgresql') == 'sqlite':
+        return db.execute_statements(SQLITE_DAILY_COUNTS_DDL)
+    return db.execute_statements(POSTGRES_DAILY_COUNTS_DDL)
+
+
+def has_search_index(db):
+    """
+    Check whether the full-text search index exists for a connector's backend.
+
+    Args:
+        db: Connected DBConnector instance
+
+    Returns:
+        bool: True if search_projects can use the index
+    """
+    if getattr(db, 'db_type', 'postgresql') == 'sqlite':
+        return SQLITE_SEARCH_TABLE in db.list_tables()
+    schema_df = db.get_table_schema('Project')
+    return schema_df is not None and POSTGRES_SEARCH_COLUMN in set(schema_df['column_name'])
+
+
+def ensure_search_index(db):
+    """
+    Create the full-text search index (FTS5 on SQLite, a GIN-indexed tsvector on PostgreSQL).
+
+    Args:
+        db: Connected DBConnector instance
+
+    Returns:
+        bool: True if the index is in place, False otherwise
+    """
+    if getattr(db, 'db_type', 'postgresql') == 'sqlite':
+        return db.execute_statements(SQLITE_SEARCH_INDEX_DDL)
+    return db.execute_statements(POSTGRES_SEARCH_INDEX_DDL)
+
+
+def ensure_derived_structures(db):
+    """
+    Apply every derived structure defined in this module.
+
+    Args:
+        db: Connected DBConnector instance
+
+    Returns:
+        bool: True if all structures were created successfully
+    """
+    return ensure_daily_counts(db) and ensure_search_index(db)
+
+
+def main():
+    """
+    Command-line interface for installing the derived structures.
+    """
+    from src.data_pull import create_db_connector
+
+    parser = argparse.ArgumentParser(description='Create rollup tables and indexes used by the post generator')
+    parser.add_argument('--use-sqlite', action='store_true',
+                        help='Use SQLite database instead of PostgreSQL')
+    parser.add_argument('--sqlite-path', type=str, default='../hackathon_projects.db',
+                        help='Path to SQLite database file (default: ../hackathon_projects.db)')
+    args = parser.parse_args()
+
+    if args.use_sqlite:
+        os.environ["USE_SQLITE"] = "true"
+        os.environ["SQLITE_PATH"] = args.sqlite_path
+
+    db = create_db_connector()
+    if not db.connect():
+        return 1
+
+    try:
+        if not ensure_derived_structures(db):
+            print("Failed to create derived structures.")
+            return 1
+        print("Derived structures are up to date.")
+        return 0
+    finally:
+        db.disconnect()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,437 @@
+"""
+Local stand-ins for the external APIs the pipeline calls, for testing without credentials.
+
+Every stub server answers both APIs; run one per API so each gets its own behaviour:
+
+- POST /v1/chat/completions (OpenAI): answers with a post assembled from the project
+  titles in the prompt, plus token usage (with prompt caching emulated for repeated
+  prompt prefixes), in the OpenAI response format.
+- POST /v2/ugcPosts (LinkedIn): checks the bearer token and the body, answers 201
+  with an X-RestLi-Id header and keeps the accepted posts (GET /posts lists them).
+
+Each server can draw its latency from a distribution, fail a share of requests
+with a 500, and answer 429 + Retry-After when a key exceeds its per-second rate
+limit or at random. GET /stats reports the status codes served.
+
+Point the clients at the stubs through their base URL settings:
+  python stub_servers.py --openai-latency lognormal:1.5:0.4 --linkedin-latency uniform:0.1:0.4
+  OPENAI_BASE_URL=http://127.0.0.1:8766/v1 OPENAI_API_KEY=stub \\
+  LINKEDIN_API_BASE=http://127.0.0.1:8765 ACCESS_TOKEN=stub PERSON_URN=urn:li:person:stub \\
+  python main.py
+"""
+
+import re
+import hashlib
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_LINKEDIN_PORT = 8765
+DEFAULT_OPENAI_PORT = 8766
+PROMPT_CACHE_MIN_TOKENS = 1024
+
+# Environment variables that point the pipeline and the web API at running stubs
+STUB_CREDENTIALS = {
+    "OPENAI_API_KEY": "stub",
+    "ACCESS_TOKEN": "stub",
+    "PERSON_URN": "urn:li:person:stub",
+}
+
+_PROJECT_TITLE = re.compile(r"^\s*Project #\d+: (.+)$", re.MULTILINE)
+_OPENERS = (
+    "🚀 Another inspiring build day at Sundai!",
+    "What a day of shipping at Sundai!",
+    "The Sundai community delivered again.",
+    "Fresh projects just landed from our Sundai builders.",
+)
+_ADJECTIVES = ("clever", "ambitious", "practical", "delightful", "bold", "thoughtful", "scrappy", "polished")
+_ANGLES = ("automation", "learning", "health", "creativity", "data", "collaboration", "productivity", "community")
+
+
+def parse_latency(spec):
+    """
+    Parse a latency distribution.
+
+    Args:
+        spec: Seconds as a number ("0.2"), or "uniform:LOW:HIGH", "normal:MEAN:STDDEV"
+            or "lognormal:MEDIAN:SIGMA"
+
+    Returns:
+        Function taking a random.Random and returning a delay in seconds
+
+    Raises:
+        ValueError: If the specification is invalid
+    """
+    name, _, params = str(spec).partition(":")
+    try:
+        if not params:
+            delay = float(name)
+            return lambda rng: delay
+        values = [float(value) for value in params.split(":")]
+        if name == "uniform" and len(values) == 2:
+            low, high = values
+            return lambda rng: rng.uniform(low, high)
+        if name == "normal" and len(values) == 2:
+            mean, stddev = values
+            return lambda rng: max(0.0, rng.gauss(mean, stddev))
+        if name == "lognormal" and len(values) == 2:
+            median, sigma = values
+            return lambda rng: rng.lognormvariate(0.0, sigma) * median
+    except ValueError:
+        pass
+    raise ValueError(f"invalid latency distribution '{spec}'")
+
+
+class StubState:
+    """
+    Behaviour settings and the requests seen by a stub server.
+    """
+
+    def __init__(self, latency=0.0, error_rate=0.0, rate_limit=None, throttle_rate=0.0, retry_after=1, seed=None):
+        """
+        Args:
+            latency: Seconds to wait before answering, or a distribution (see parse_latency)
+            error_rate: Fraction of requests answered with a 500
+            rate_limit: Requests allowed per key per second window, or None for no limit
+            throttle_rate: Fraction of requests answered with a 429 regardless of the rate limit
+            retry_after: Retry-After seconds sent with 429 responses
+            seed: Optional random seed, for repeatable runs
+        """
+        self.latency = latency if callable(latency) else parse_latency(latency)
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.posts = []
+        self._prompt_prefixes = set()
+        self.request_count = 0
+        self.status_counts = Counter()
+        self._windows = {}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def random(self):
+        with self._lock:
+            return self._rng.random()
+
+    def sample_latency(self):
+        with self._lock:
+            return self.latency(self._rng)
+
+    def rate_limited(self, key):
+        """
+        Count a request for a key and check whether it exceeds the limit.
+        """
+        with self._lock:
+            self.request_count += 1
+            if self.rate_limit is None:
+                return False
+            window = int(time.monotonic())
+            start, count = self._windows.get(key, (window, 0))
+            if start != window:
+                start, count = window, 0
+            self._windows[key] = (start, count + 1)
+            return count + 1 > self.rate_limit
+
+    def record_status(self, status):
+        with self._lock:
+            self.status_counts[status] += 1
+
+    def add_post(self, post):
+        """
+        Record an accepted post and get its share URN.
+        """
+        with self._lock:
+            self.posts.append(post)
+            return f"urn:li:share:{len(self.posts)}"
+
+    def stats(self):
+        with self._lock:
+            return {
+                'requests': self.request_count,
+                'statuses': {str(status): count for status, count in sorted(self.status_counts.items())},
+                'posts': len(self.posts)
+            }
+
+    def cached_tokens(self, prompt):
+        """
+        Emulate provider prompt caching: the longest prefix of 1024+ tokens a prompt shares
+        with an earlier one is cached, in 128-token steps.
+        """
+        cached = 0
+        matching = True
+        with self._lock:
+            for tokens in range(PROMPT_CACHE_MIN_TOKENS, len(prompt) // 4 + 1, 128):
+                prefix = hashlib.sha1(prompt[:tokens * 4].encode()).digest()
+                matching = matching and prefix in self._prompt_prefixes
+                if matching:
+                    cached = tokens
+                self._prompt_prefixes.add(prefix)
+        return cached
+
+    def compose_post(self, prompt):
+        """
+        Write a plausible post about the projects named in a prompt.
+        """
+        titles = _PROJECT_TITLE.findall(prompt) or ["a new project"]
+        with self._lock:
+            rng = self._rng
+            featured = rng.sample(titles, min(len(titles), 4))
+            lines = [rng.choice(_OPENERS), ""]
+            lines += [f"• {title}: a {rng.choice(_ADJECTIVES)} take on {rng.choice(_ANGLES)}" for title in featured]
+            lines += ["", f"{len(titles)} projects in total. Explore them all through Sundai!", "",
+                      "#Sundai #AI #TechCommunity #Innovation"]
+        return "\n".join(lines)
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """
+    Request handler for the stubs; the server's `state` holds the StubState.
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def _send_json(self, status, payload, headers=None):
+        self.server.state.record_status(status)
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            # The client gave up on the request (e.g. a hedged request that lost the race)
+            self.close_connection = True
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            return json.loads(self.rfile.read(length) or b"null")
+        except ValueError:
+            return None
+
+    def _bearer_token(self):
+        authorization = self.headers.get("Authorization", "")
+        if authorization.startswith("Bearer "):
+            return authorization[len("Bearer "):].strip()
+        return ""
+
+    def _misbehave(self, error_body, throttle_body):
+        """
+        Apply the latency, rate limit and injected errors; returns True if a response was sent.
+        """
+        state = self.server.state
+        delay = state.sample_latency()
+        if delay > 0:
+            time.sleep(delay)
+
+        if state.rate_limited(self._bearer_token()) or (state.throttle_rate and state.random() < state.throttle_rate):
+            self._send_json(429, throttle_body, {"Retry-After": str(state.retry_after)})
+            return True
+        if state.error_rate and state.random() < state.error_rate:
+            self._send_json(500, error_body)
+            return True
+        return False
+
+    def do_GET(self):
+        state = self.server.state
+        if self.path == "/posts":
+            with state._lock:
+                posts = list(state.posts)
+            self._send_json(200, posts)
+        elif self.path == "/stats":
+            self._send_json(200, state.stats())
+        else:
+            self._send_json(404, {"message": "Not found"})
+
+    def do_POST(self):
+        if self.path == "/v2/ugcPosts":
+            self._ugc_posts()
+        elif self.path in ("/v1/chat/completions", "/chat/completions"):
+            self._chat_completions()
+        else:
+            self._read_json()
+            self._send_json(404, {"message": "Not found"})
+
+    def _ugc_posts(self):
+        post = self._read_json()
+        if not self._bearer_token():
+            self._send_json(401, {"message": "Empty oauth2 access token", "status": 401})
+            return
+        if self._misbehave({"message": "Internal Server Error", "status": 500},
+                           {"message": "Resource level throttle limit reached", "status": 429}):
+            return
+
+        text = None
+        if isinstance(post, dict):
+            share = post.get("specificContent", {}).get("com.linkedin.ugc.ShareContent", {})
+            text = share.get("shareCommentary", {}).get("text")
+        if not text or not post.get("author"):
+            self._send_json(422, {"message": "author and shareCommentary.text are required", "status": 422})
+            return
+
+        share_urn = self.server.state.add_post(post)
+        self._send_json(201, {"id": share_urn}, {"X-RestLi-Id": share_urn})
+
+    def _chat_completions(self):
+        request = self._read_json()
+        if not self._bearer_token():
+            self._send_json(401, {"error": {"message": "Incorrect API key provided", "type": "invalid_request_error",
+                                            "code": "invalid_api_key"}})
+            return
+        if self._misbehave({"error": {"message": "The server had an error while processing your request.",
+                                      "type": "server_error"}},
+                           {"error": {"message": "Rate limit reached for requests", "type": "requests",
+                                      "code": "rate_limit_exceeded"}}):
+            return
+        if not isinstance(request, dict) or not request.get("messages"):
+            self._send_json(400, {"error": {"message": "'messages' is a required property",
+                                            "type": "invalid_request_error"}})
+            return
+        if request.get("stream"):
+            self._send_json(400, {"error": {"message": "Streaming is not supported by the stub",
+                                            "type": "invalid_request_error"}})
+            return
+
+        prompt = "\n".join(str(message.get("content", "")) for message in request["messages"])
+        content = self.server.state.compose_post(prompt)
+        prompt_tokens = len(prompt) // 4
+        cached_tokens = self.server.state.cached_tokens(prompt)
+        completion_tokens = len(content) // 4
+        self._send_json(200, {
+            "id": f"chatcmpl-stub-{self.server.state.request_count}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "stub"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop"
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "prompt_tokens_details": {"cached_tokens": cached_tokens},
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens
+            }
+        })
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+def start_stub_server(port=0, state=None, verbose=False, name="stub"):
+    """
+    Start a stub server on a background thread.
+
+    Args:
+        port: Port to listen on (0 picks a free port)
+        state: StubState with the behaviour settings (default: answer every request at once)
+        verbose: If True, log each request
+        name: Thread name
+
+    Returns:
+        The running ThreadingHTTPServer; its base URL is http://127.0.0.1:<server.server_port>,
+        and server.shutdown() stops it
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", port), StubHandler)
+    server.daemon_threads = True
+    server.state = state or StubState()
+    server.verbose = verbose
+    threading.Thread(target=server.serve_forever, name=name, daemon=True).start()
+    return server
+
+
+def stub_environment(openai_server=None, linkedin_server=None):
+    """
+    Get the environment variables that point the OpenAI and LinkedIn clients at running stubs.
+    """
+    environment = dict(STUB_CREDENTIALS)
+    if openai_server is not None:
+        environment["OPENAI_BASE_URL"] = f"http://127.0.0.1:{openai_server.server_port}/v1"
+    if linkedin_server is not None:
+        environment["LINKEDIN_API_BASE"] = f"http://127.0.0.1:{linkedin_server.server_port}"
+    return environment
+
+
+def add_stub_arguments(parser):
+    """
+    Add the per-API behaviour options (--openai-latency, --linkedin-error-rate, ...) to a parser.
+    """
+    for api, latency in (("openai", "lognormal:1.5:0.4"), ("linkedin", "uniform:0.1:0.4")):
+        parser.add_argument(f'--{api}-latency', type=parse_latency, default=parse_latency(latency),
+                            help=f'{api} stub latency: seconds, uniform:LOW:HIGH, normal:MEAN:STDDEV '
+                                 f'or lognormal:MEDIAN:SIGMA (default: {latency})')
+        parser.add_argument(f'--{api}-error-rate', type=float, default=0.0,
+                            help=f'Fraction of {api} stub requests answered with a 500 (default: 0)')
+        parser.add_argument(f'--{api}-rate-limit', type=int, default=None,
+                            help=f'Requests per key per second before the {api} stub answers 429 (default: no limit)')
+        parser.add_argument(f'--{api}-throttle-rate', type=float, default=0.0,
+                            help=f'Fraction of {api} stub requests answered with a 429 at random (default: 0)')
+    parser.add_argument('--seed', type=int, default=None,
+                        help='Random seed for the stubs, for repeatable runs')
+
+
+def start_stubs_from_args(args, openai_port=0, linkedin_port=0, verbose=False):
+    """
+    Start the OpenAI and LinkedIn stubs configured by add_stub_arguments options.
+
+    Returns:
+        Tuple of (OpenAI stub server, LinkedIn stub server)
+    """
+    servers = []
+    for api, port in (("openai", openai_port), ("linkedin", linkedin_port)):
+        state = StubState(
+            latency=getattr(args, f"{api}_latency"),
+            error_rate=getattr(args, f"{api}_error_rate"),
+            rate_limit=getattr(args, f"{api}_rate_limit"),
+            throttle_rate=getattr(args, f"{api}_throttle_rate"),
+            seed=args.seed
+        )
+        servers.append(start_stub_server(port, state, verbose=verbose, name=f"{api}-stub"))
+    return tuple(servers)
+
+
+def main():
+    """
+    Command-line interface for running the stub servers.
+    """
+    parser = argparse.ArgumentParser(description='Run local stubs of the OpenAI chat completions and LinkedIn ugcPosts APIs')
+    parser.add_argument('--openai-port', type=int, default=DEFAULT_OPENAI_PORT,
+                        help=f'Port for the OpenAI stub (default: {DEFAULT_OPENAI_PORT})')
+    parser.add_argument('--linkedin-port', type=int, default=DEFAULT_LINKEDIN_PORT,
+                        help=f'Port for the LinkedIn stub (default: {DEFAULT_LINKEDIN_PORT})')
+    parser.add_argument('--verbose', action='store_true',
+                        help='Log every request')
+    add_stub_arguments(parser)
+    args = parser.parse_args()
+
+    openai_server, linkedin_server = start_stubs_from_args(args, args.openai_port, args.linkedin_port, args.verbose)
+    print(f"OpenAI stub listening on http://127.0.0.1:{openai_server.server_port}/v1")
+    print(f"LinkedIn stub listening on http://127.0.0.1:{linkedin_server.server_port}")
+    print("Point the pipeline and the web server at them with:")
+    for name, value in stub_environment(openai_server, linkedin_server).items():
+        print(f"  export {name}={value}")
+    print("Press Ctrl+C to stop.")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        openai_server.shutdown()
+        linkedin_server.shutdown()
+        for api, server in (("OpenAI", openai_server), ("LinkedIn", linkedin_server)):
+            print(f"{api} stub: {json.dumps(server.state.stats())}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,302 @@
+"""
+Local theme clustering of a day's projects, so posts can be organized by theme.
+
+Each project becomes a TF-IDF vector of its title, description (or preview) and
+tech stack, held in one SciPy sparse matrix. Spherical k-means (cosine similarity,
+k-means++ seeding) groups the rows; every iteration is a single sparse-dense
+product. Each cluster is named after the terms that distinguish its centroid
+from the average project.
+"""
+
+import os
+import re
+import sys
+from collections import Counter, defaultdict
+
+import numpy as np
+import scipy.sparse as sp
+
+# Add the parent directory to the path to import the module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Import after adding to path
+from src.prompt_compression import clean_text, _STOPWORDS
+
+# Text columns, in order of preference (both the PostgreSQL and the SQLite names)
+TITLE_COLUMNS = ("title", "project_name")
+DESCRIPTION_COLUMNS = ("description", "preview")
+TECH_STACK_COLUMNS = ("techStack", "tech_stack")
+
+DEFAULT_MAX_CLUSTERS = 6
+# Below this many projects a single theme list reads better than clusters
+MIN_PROJECTS = 6
+TITLE_WEIGHT = 2
+MAX_ITERATIONS = 50
+RESTARTS = 3
+NAME_TERMS = 2
+
+_TOKEN = re.compile(r"[A-Za-z][A-Za-z0-9+#]*")
+# Words that describe nearly every project and so never name a theme
+_GENERIC_WORDS = frozenset(
+    "app apps application project projects tool tools platform system built build builds help helps make makes "
+    "new based simple allows users user people way time easy easily more one get lets via like just them all "
+    "any what how then than when where while each other about over out up both very much many some such only "
+    "own same even also here there these those been being does did doing would could should may might must "
+    "after before between through during without within across under again further once most".split()
+)
+
+
+class ThemeCluster:
+    """
+    A group of similar projects.
+    """
+
+    def __init__(self, name, terms, positions):
+        """
+        Args:
+            name: Display name built from the top terms (e.g. "Agents & LangChain")
+            terms: Distinguishing terms, most distinctive first
+            positions: Row positions of the cluster's projects in the clustered DataFrame
+        """
+        self.name = name
+        self.terms = terms
+        self.positions = positions
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __repr__(self):
+        return f"ThemeCluster({self.name!r}, {len(self.positions)} projects)"
+
+
+def _first_present(project, columns):
+    for column in columns:
+        value = project.get(column)
+        if isinstance(value, str) and value.strip():
+            return value
+    return ""
+
+
+def _project_terms(project, surface_forms, nameable):
+    """
+    Get the weighted terms of one project, recording the spelling of each term and
+    which terms appear outside titles (titles are mostly brand names).
+    """
+    terms = Counter()
+    for text, weight in ((_first_present(project, TITLE_COLUMNS), TITLE_WEIGHT),
+                         (clean_text(_first_present(project, DESCRIPTION_COLUMNS)), 1)):
+        for token in _TOKEN.findall(text):
+            term = token.lower()
+            if len(term) < 3 or term in _STOPWORDS or term in _GENERIC_WORDS:
+                continue
+            terms[term] += weight
+            surface_forms[term][token] += 1
+            if weight == 1:
+                nameable.add(term)
+
+    # Tech stack entries are kept whole ("Next.js", "LangChain")
+    for item in _first_present(project, TECH_STACK_COLUMNS).split(","):
+        item = item.strip()
+        if item:
+            terms[item.lower()] += 1
+            surface_forms[item.lower()][item] += 1
+            nameable.add(item.lower())
+    return terms
+
+
+def tfidf_matrix(projects_df):
+    """
+    Build L2-normalized TF-IDF vectors for the projects.
+
+    Terms found in only one project (when there are enough projects) or in more than
+    half of them are dropped: they cannot group projects or tell groups apart.
+
+    Args:
+        projects_df: DataFrame containing project data
+
+    Returns:
+        Tuple of (CSR matrix with one row per project, list of vocabulary terms,
+        list of the display spelling of each term, boolean array marking the terms
+        that may name a theme)
+    """
+    surface_forms = defaultdict(Counter)
+    nameable = set()
+    documents = [_project_terms(project, surface_forms, nameable) for project in projects_df.to_dict('records')]
+    n = len(documents)
+
+    document_frequency = Counter(term for terms in documents for term in terms)
+    min_df = 2 if n >= 10 else 1
+    max_df = max(2, n // 2)
+    vocabulary = sorted(term for term, count in document_frequency.items() if min_df <= count <= max_df)
+    term_index = {term: i for i, term in enumerate(vocabulary)}
+
+    rows, columns, counts = [], [], []
+    for row, terms in enumerate(documents):
+        for term, count in terms.items():
+            column = term_index.get(term)
+            if column is not None:
+                rows.append(row)
+                columns.append(column)
+                counts.append(count)
+
+    matrix = sp.csr_matrix(
+        (np.asarray(counts, dtype=np.float64), (rows, columns)),
+        shape=(n, len(vocabulary))
+    )
+    # Sublinear term frequency and smoothed inverse document frequency
+    matrix.data = 1.0 + np.log(matrix.data)
+    df = np.asarray([document_frequency[term] for term in vocabulary], dtype=np.float64)
+    matrix = matrix @ sp.diags(np.log((1 + n) / (1 + df)) + 1.0)
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    matrix = sp.csr_matrix(sp.diags(1.0 / norms) @ matrix)
+
+    labels = [surface_forms[term].most_common(1)[0][0] for term in vocabulary]
+    name_mask = np.asarray([term in nameable for term in vocabulary], dtype=bool)
+    return matrix, vocabulary, labels, name_mask
+
+
+def _normalize_rows(centroids):
+    norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return centroids / norms
+
+
+def _seed_centroids(matrix, k, rng):
+    """
+    Pick k starting centroids with k-means++ over cosine distance.
+    """
+    n = matrix.shape[0]
+    chosen = [int(rng.integers(n))]
+    closest = 1.0 - (matrix @ matrix[chosen[0]].T).toarray().ravel()
+    for _ in range(1, k):
+        weights = np.clip(closest, 0.0, None) ** 2
+        total = weights.sum()
+        candidate = int(rng.choice(n, p=weights / total)) if total > 0 else int(rng.integers(n))
+        chosen.append(candidate)
+        closest = np.minimum(closest, 1.0 - (matrix @ matrix[candidate].T).toarray().ravel())
+    return matrix[chosen].toarray()
+
+
+def spherical_kmeans(matrix, k, seed=0, max_iterations=MAX_ITERATIONS, restarts=RESTARTS):
+    """
+    Cluster L2-normalized rows by cosine similarity.
+
+    Args:
+        matrix: CSR matrix with L2-normalized rows
+        k: Number of clusters
+        seed: Random seed (fixed, so the same projects always give the same clusters)
+        max_iterations: Maximum assignment/update rounds per restart
+        restarts: Number of seedings; the one with the highest total similarity is kept
+
+    Returns:
+        Tuple of (1-D array of cluster labels, k x vocabulary array of centroids)
+    """
+    n = matrix.shape[0]
+    rng = np.random.default_rng(seed)
+    best_labels, best_centroids, best_score = None, None, -np.inf
+
+    for _ in range(restarts):
+        centroids = _seed_centroids(matrix, k, rng)
+        labels = None
+        for _ in range(max_iterations):
+            similarity = np.asarray(matrix @ centroids.T)
+            new_labels = similarity.argmax(axis=1)
+            if labels is not None and np.array_equal(new_labels, labels):
+                break
+            labels = new_labels
+
+            # Sum each cluster's rows with one sparse product
+            membership = sp.csr_matrix((np.ones(n), (labels, np.arange(n))), shape=(k, n))
+            centroids = np.asarray((membership @ matrix).todense())
+            # An empty cluster restarts from the row its centroid fits worst
+            for empty in np.flatnonzero(np.bincount(labels, minlength=k) == 0):
+                worst = int(similarity.max(axis=1).argmin())
+                centroids[empty] = matrix[worst].toarray().ravel()
+                similarity[worst] = np.inf
+            centroids = _normalize_rows(centroids)
+
+        score = np.asarray(matrix @ centroids.T).max(axis=1).sum()
+        if score > best_score:
+            best_labels, best_centroids, best_score = labels, centroids, score
+
+    return best_labels, best_centroids
+
+
+def choose_cluster_count(project_count, max_clusters=DEFAULT_MAX_CLUSTERS):
+    """
+    Pick the number of themes for a number of projects (about sqrt(n / 2), at most max_clusters).
+    """
+    if project_count < MIN_PROJECTS:
+        return 1
+    return int(min(max_clusters, max(2, round(np.sqrt(project_count / 2)))))
+
+
+def cluster_projects(projects_df, max_clusters=DEFAULT_MAX_CLUSTERS, seed=0):
+    """
+    Group projects into named themes.
+
+    Args:
+        projects_df: DataFrame containing project data
+        max_clusters: Maximum number of themes
+        seed: Random seed for the k-means seeding
+
+    Returns:
+        List of ThemeCluster, largest first, whose positions cover every row;
+        empty if there are too few projects (or too little text) to cluster
+    """
+    if projects_df is None or len(projects_df) < MIN_PROJECTS:
+        return []
+
+    matrix, vocabulary, term_labels, name_mask = tfidf_matrix(projects_df)
+    k = choose_cluster_count(len(projects_df), max_clusters)
+    if not vocabulary or k < 2:
+        return []
+
+    labels, centroids = spherical_kmeans(matrix, k, seed=seed)
+
+    # Name clusters by what sets them apart from the average project
+    mean_vector = np.asarray(matrix.mean(axis=0)).ravel()
+    clusters = []
+    for cluster in range(k):
+        positions = np.flatnonzero(labels == cluster).tolist()
+        if not positions:
+            continue
+        member_mean = np.asarray(matrix[positions].mean(axis=0)).ravel()
+        distinctiveness = member_mean - mean_vector
+        if name_mask.any():
+            distinctiveness[~name_mask] = -np.inf
+        top = [i for i in np.argsort(-distinctiveness)[:NAME_TERMS * 2] if member_mean[i] > 0][:NAME_TERMS]
+        terms = [term_labels[i] for i in top]
+        name = " & ".join(term[:1].upper() + term[1:] for term in terms) or "Other projects"
+        clusters.append(ThemeCluster(name, terms, positions))
+
+    clusters.sort(key=lambda c: (-len(c), c.positions[0]))
+    return clusters
+
+
+def select_across_themes(themes, limit):
+    """
+    Pick up to `limit` projects, taking them from the themes in turn so every theme is represented.
+
+    Args:
+        themes: List of ThemeCluster
+        limit: Maximum number of projects
+
+    Returns:
+        Dictionary mapping each theme's index to its selected positions (in their original order)
+    """
+    selected = {index: [] for index in range(len(themes))}
+    remaining = limit
+    depth = 0
+    while remaining > 0:
+        progressed = False
+        for index, theme in enumerate(themes):
+            if depth < len(theme.positions) and remaining > 0:
+                selected[index].append(theme.positions[depth])
+                remaining -= 1
+                progressed = True
+        if not progressed:
+            break
+        depth += 1
+    return selected
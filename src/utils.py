@@ -1,5 +1,13 @@
+import os
 import argparse
-from datetime import datetime
+import threading
+from datetime import datetime, timedelta
+
+# Repository root, used for state files shared by main.py and src/main.py
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Digest periods (see period_range)
+PERIODS = ('week', 'month')
 
 def parse_date(date_str):
     """
@@ -18,3 +26,56 @@ def parse_date(date_str):
         return datetime.strptime(date_str, "%Y-%m-%d")
     except ValueError:
         raise argparse.ArgumentTypeError(f"Invalid date format: {date_str}. Please use YYYY-MM-DD format.")
+
+def period_range(date_str, period):
+    """
+    Get the calendar period containing a date.
+    
+    Args:
+        date_str: Date string in YYYY-MM-DD format
+        period: 'week' (Monday to Sunday) or 'month'
+        
+    Returns:
+        Tuple of (first day, last day) as YYYY-MM-DD strings, both inclusive
+    """
+    day = parse_date(date_str)
+    if period == 'week':
+        start = day - timedelta(days=day.weekday())
+        end = start + timedelta(days=6)
+    elif period == 'month':
+        start = day.replace(day=1)
+        end = (start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+    else:
+        raise ValueError(f"Unsupported period: {period}")
+    return start.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d")
+
+def write_text_atomic(path, text):
+    """
+    Write text to a file atomically, so readers never see a partially written file.
+    
+    Args:
+        path: Destination file path
+        text: Text content to write
+    """
+    _write_atomic(path, text, 'w')
+
+def write_bytes_atomic(path, data):
+    """
+    Write bytes to a file atomically (see write_text_atomic).
+    
+    Args:
+        path: Destination file path
+        data: Bytes to write
+    """
+    _write_atomic(path, data, 'wb')
+
+def _write_atomic(path, content, mode):
+    directory = os.path.dirname(os.path.abspath(path))
+    tmp_path = os.path.join(directory, f".{os.path.basename(path)}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(tmp_path, mode) as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
@@ -0,0 +1,37 @@
+"""
+Peak memory of a project pull with and without compact dtypes.
+
+Each pull runs in its own process (see benchmark_memory.measure), so the peak
+RSS of one does not hide the other's.
+"""
+
+import os
+import sys
+
+import pytest
+
+# Add the repository root to the path to import the benchmark modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Import after adding to path
+from benchmark_memory import measure
+from benchmark_sqlite import build_database
+
+ROWS = 200_000
+DAYS = 50
+
+
+@pytest.fixture(scope="module")
+def benchmark_db(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("compact") / "projects.db")
+    build_database(path, ROWS, DAYS)
+    return path
+
+
+def test_compact_pull_lowers_peak_rss(benchmark_db):
+    default = measure(benchmark_db, DAYS, compact=False)
+    compact = measure(benchmark_db, DAYS, compact=True)
+
+    assert default['rows'] == compact['rows'] == ROWS
+    assert compact['frame_mb'] < default['frame_mb']
+    assert compact['peak_rss_mb'] < default['peak_rss_mb']
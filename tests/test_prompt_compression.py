@@ -0,0 +1,53 @@
+"""
+Token reduction reported by --compress, checked against the formatted prompt.
+"""
+
+import os
+import re
+import sys
+
+import pandas as pd
+
+# Add the repository root to the path to import the module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Import after adding to path
+from src.data_pull import format_projects_for_prompt
+from src.prompt_compression import estimate_tokens
+
+LONG_DESCRIPTION = " ".join(
+    f"The {topic} module handles {topic} requests from every team member and keeps them in sync."
+    for topic in ("calendar", "billing", "search", "upload", "sharing", "review", "export", "alert")
+)
+
+
+def prompt_text_tokens(prompt):
+    """
+    Estimate the tokens of the preview/description text listed in a formatted prompt.
+    """
+    return sum(estimate_tokens(match) for match in re.findall(r"^(?:Preview|Description): (.*)$", prompt, re.MULTILINE))
+
+
+def reported_tokens(output):
+    match = re.search(r"from ~(\d+) to ~(\d+) tokens", output)
+    return int(match.group(1)), int(match.group(2))
+
+
+def test_reported_reduction_matches_prompt(capsys):
+    projects_df = pd.DataFrame({
+        'title': [f"Project {i}" for i in range(6)],
+        'preview': ["A short preview of the app."] * 3 + [None, None, "Installation"],
+        'description': [LONG_DESCRIPTION] * 6,
+        'githubUrl': [None] * 6,
+        'demoUrl': [None] * 6
+    })
+
+    original = format_projects_for_prompt(projects_df)
+    compressed = format_projects_for_prompt(projects_df, compress=True)
+    before, after = reported_tokens(capsys.readouterr().out)
+
+    assert before == prompt_text_tokens(original)
+    assert after == prompt_text_tokens(compressed)
+    assert after < before
+    # Previews are listed as they are; only the long descriptions shrink
+    assert compressed.count("Preview: A short preview of the app.") == 3